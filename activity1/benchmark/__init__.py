@@ -0,0 +1,9 @@
+"""Benchmark de escalabilidade das árvores da atividade 1.
+
+Exporta:
+- make_dataset (tabelas sintéticas de classificação)
+- dataset_grid, run_benchmark, write_results, compare
+"""
+
+from .synthetic import make_dataset
+from .runner import compare, dataset_grid, run_benchmark, write_results
@@ -0,0 +1,195 @@
+"""
+Benchmark de escalabilidade das árvores das questões 1 e 2 (ID3, C4.5 e CART), com o
+DecisionTreeClassifier do scikit-learn (como na questão 3) como referência.
+
+Gera tabelas sintéticas (synthetic.make_dataset) variando linhas, atributos,
+cardinalidade, fração de numéricos, classes e ruído. Para cada combinação e algoritmo,
+mede num processo novo o tempo de fit, predict e export e o pico de RSS, e grava tudo em
+JSON, para acompanhar regressões e melhorias entre commits.
+
+Uso:
+  python activity1/benchmark/main.py [opções]
+
+Opções (cada eixo aceita vários valores; os casos são o produto cartesiano):
+  --rows <n...> (padrão: 1000 10000)
+  --features <n...> (padrão: 10)
+  --numeric_fraction <f...> (padrão: 0.5)
+  --cardinality <n...> (padrão: 5)
+  --classes <n...> (padrão: 3)
+  --noise <f...> (padrão: 0.1)
+  --algorithms <a...> (padrão: id3 c4.5 cart cart_hist sklearn)
+  --repeat <n> (processos por caso; tempos = medianas), --test_fraction <f>,
+    --timeout <s> (por processo), --seed <n>
+  --out <caminho.json> (padrão: activity1/benchmark/out/bench_<commit>.json)
+  --compare <antigo.json> (mostra a razão novo/antigo de cada caso; < 1 = melhorou)
+
+Requisitos: pandas, numpy, scikit-learn
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+
+try:
+    from activity1.benchmark.runner import (
+        ALGORITHMS,
+        compare,
+        dataset_grid,
+        run_benchmark,
+        write_results,
+    )
+except Exception:
+    import sys as _sys, os as _os
+
+    _sys.path.append(
+        _os.path.abspath(_os.path.join(_os.path.dirname(__file__), "..", ".."))
+    )
+    from activity1.benchmark.runner import (
+        ALGORITHMS,
+        compare,
+        dataset_grid,
+        run_benchmark,
+        write_results,
+    )
+
+
+def _fmt_ratio(r) -> str:
+    return "-" if r is None else f"{r:.2f}x"
+
+
+def _fmt_case(res) -> str:
+    ds = res["dataset"]
+    return (
+        f"{res['algorithm']:<9} linhas={ds['n_rows']} atributos={ds['n_features']} "
+        f"num={ds['numeric_fraction']:g} card={ds['cardinality']} "
+        f"classes={ds['n_classes']} ruído={ds['noise']:g}"
+    )
+
+
+def _print_case(res) -> None:
+    head = _fmt_case(res)
+    if "error" in res:
+        print(f"{head} | erro: {res['error']}")
+        return
+    rss = res["peak_rss_mb"]["export"]
+    print(
+        f"{head} | fit={res['fit_s']:.3f}s predict={res['predict_s']:.3f}s "
+        f"export={res['export_s']:.3f}s pico RSS="
+        + ("-" if rss is None else f"{rss:.0f}MB")
+        + f" nós={res['n_nodes']} acurácia={res['accuracy']:.4f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de escalabilidade de ID3, C4.5 e CART (e scikit-learn)"
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--features", type=int, nargs="+", default=[10])
+    parser.add_argument(
+        "--numeric_fraction",
+        type=float,
+        nargs="+",
+        default=[0.5],
+        help="Fração dos atributos que são numéricos (o resto é categórico)",
+    )
+    parser.add_argument(
+        "--cardinality",
+        type=int,
+        nargs="+",
+        default=[5],
+        help="Categorias por atributo categórico",
+    )
+    parser.add_argument("--classes", type=int, nargs="+", default=[3])
+    parser.add_argument(
+        "--noise",
+        type=float,
+        nargs="+",
+        default=[0.1],
+        help="Fração de rótulos trocados por uma classe sorteada",
+    )
+    parser.add_argument(
+        "--algorithms",
+        nargs="+",
+        choices=ALGORITHMS,
+        default=list(ALGORITHMS),
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Execuções (processos) por caso; os tempos gravados são as medianas",
+    )
+    parser.add_argument(
+        "--test_fraction",
+        type=float,
+        default=0.25,
+        help="Linhas de teste (predict) como fração das linhas de treino",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Encerra o processo de um caso após este número de segundos",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Semente das tabelas")
+    parser.add_argument(
+        "--out",
+        default=None,
+        help="Arquivo JSON de saída (padrão: out/bench_<commit>.json nesta pasta)",
+    )
+    parser.add_argument(
+        "--compare",
+        default=None,
+        help="JSON de uma execução anterior para comparar (razão novo/antigo)",
+    )
+    args = parser.parse_args()
+
+    datasets = dataset_grid(
+        n_rows=args.rows,
+        n_features=args.features,
+        numeric_fraction=args.numeric_fraction,
+        cardinality=args.cardinality,
+        n_classes=args.classes,
+        noise=args.noise,
+        random_state=[args.seed],
+    )
+    print(f"{len(datasets)} tabela(s) × {len(args.algorithms)} algoritmo(s)")
+    doc = run_benchmark(
+        datasets,
+        args.algorithms,
+        repeat=args.repeat,
+        test_fraction=args.test_fraction,
+        timeout=args.timeout,
+        progress=_print_case,
+    )
+
+    out_path = args.out
+    if out_path is None:
+        commit = (doc["environment"]["commit"] or "local")[:12]
+        out_path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "out", f"bench_{commit}.json"
+        )
+    write_results(doc, out_path)
+    print(f"\nResultados salvos em: {out_path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        rows = compare(old, doc)
+        print(f"\nComparação com {args.compare} (novo/antigo; < 1 = melhorou):")
+        for r in rows:
+            print(
+                f"{_fmt_case(r)} | fit={_fmt_ratio(r['fit_s'])} "
+                f"predict={_fmt_ratio(r['predict_s'])} "
+                f"export={_fmt_ratio(r['export_s'])} "
+                f"pico RSS={_fmt_ratio(r['peak_rss_mb'])}"
+            )
+        if not rows:
+            print("(nenhum caso em comum)")
+
+
+if __name__ == "__main__":
+    main()
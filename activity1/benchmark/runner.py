@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import importlib.util
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from activity1.common import get_repo_root
+from activity1.benchmark.synthetic import make_dataset
+
+# Execução do benchmark: cada caso (algoritmo × configuração da tabela) roda num
+# processo novo (spawn), que gera a tabela, prepara os dados e mede, em sequência:
+# - fit: treino sobre as linhas de treino;
+# - predict: predição das linhas de teste;
+# - export: DOT + base de regras (sklearn: export_graphviz + export_text) num diretório
+#   temporário.
+# O pico de RSS (getrusage) é lido antes do fit e após cada fase; como o processo é
+# novo, o valor é só do caso. A preparação (discretização do ID3, one-hot do sklearn)
+# é medida à parte e fica fora do fit.
+
+ALGORITHMS = ("id3", "c4.5", "cart", "cart_hist", "sklearn")
+PHASES = ("fit", "predict", "export")
+# Faixas (quantis do treino) dos atributos numéricos entregues ao ID3, que só trata
+# atributos categóricos
+ID3_BINS = 10
+
+_QUESTION_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "question1&2"
+)
+# algoritmo -> (pasta do script, classe, parâmetros)
+_TREES = {
+    "id3": ("id3", "ID3DecisionTree", {"engine": "codes"}),
+    "c4.5": ("c4.5", "C45DecisionTree", {}),
+    "cart": ("cart", "CARTDecisionTree", {}),
+    "cart_hist": ("cart", "CARTDecisionTree", {"splitter": "hist"}),
+}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pico de memória residente do processo (MB); None sem o módulo resource."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes no macOS, KB no Linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _load_class(folder: str, name: str) -> type:
+    path = os.path.join(_QUESTION_DIR, folder, "main.py")
+    module = f"_bench_{folder.replace('.', '')}"
+    mod = sys.modules.get(module)
+    if mod is None:
+        spec = importlib.util.spec_from_file_location(module, path)
+        mod = importlib.util.module_from_spec(spec)
+        sys.modules[module] = mod
+        spec.loader.exec_module(mod)
+    return getattr(mod, name)
+
+
+def _discretize(train: pd.DataFrame, test: pd.DataFrame, attrs: List[str]):
+    """Numéricos em faixas "b0".. pelos quantis do treino (entrada do ID3)."""
+    train, test = train.copy(), test.copy()
+    q = np.linspace(0, 1, ID3_BINS + 1)[1:-1]
+    for a in attrs:
+        cuts = np.unique(np.quantile(train[a].to_numpy(dtype=np.float64), q))
+        labels = np.array([f"b{i}" for i in range(len(cuts) + 1)], dtype=object)
+        for df in (train, test):
+            df[a] = labels[np.searchsorted(cuts, df[a].to_numpy(), side="left")]
+    return train, test
+
+
+class _TreeModel:
+    """Árvore das questões 1 e 2 (ID3, C4.5 ou CART) carregada do script."""
+
+    def __init__(self, algorithm: str, target: str):
+        folder, name, params = _TREES[algorithm]
+        self.algorithm = algorithm
+        self.target = target
+        self.tree = _load_class(folder, name)(target=target, **params)
+
+    def prepare(self, train: pd.DataFrame, test: pd.DataFrame, numeric: List[str]):
+        if self.algorithm == "id3" and numeric:
+            return _discretize(train, test, numeric)
+        return train, test
+
+    def fit(self, train: pd.DataFrame, features: List[str]) -> None:
+        self.tree.fit(train, features)
+
+    def predict(self, test: pd.DataFrame) -> np.ndarray:
+        return self.tree.predict(test)
+
+    def export(self, out_dir: str) -> None:
+        self.tree.write_dot(os.path.join(out_dir, "tree.dot"))
+        self.tree.export_rules_txt(os.path.join(out_dir, "rules.txt"))
+
+    def n_nodes(self) -> int:
+        return len(self.tree.compile().kind)
+
+
+class _SklearnModel:
+    """DecisionTreeClassifier (gini, sem limite de profundidade) como referência; os
+    categóricos entram em one-hot (pd.get_dummies), como exige o scikit-learn."""
+
+    def __init__(self, target: str):
+        from sklearn.tree import DecisionTreeClassifier
+
+        self.target = target
+        self.clf = DecisionTreeClassifier(criterion="gini", random_state=0)
+        self.columns: List[str] = []
+
+    def prepare(self, train: pd.DataFrame, test: pd.DataFrame, numeric: List[str]):
+        y_train, y_test = train[self.target], test[self.target]
+        x_train = pd.get_dummies(train.drop(columns=[self.target]), dtype=np.float32)
+        x_test = pd.get_dummies(test.drop(columns=[self.target]), dtype=np.float32)
+        x_test = x_test.reindex(columns=x_train.columns, fill_value=0.0)
+        self.columns = [str(c) for c in x_train.columns]
+        return x_train.assign(**{self.target: y_train}), x_test.assign(
+            **{self.target: y_test}
+        )
+
+    def fit(self, train: pd.DataFrame, features: List[str]) -> None:
+        self.clf.fit(train[self.columns], train[self.target])
+
+    def predict(self, test: pd.DataFrame) -> np.ndarray:
+        return self.clf.predict(test[self.columns])
+
+    def export(self, out_dir: str) -> None:
+        from sklearn.tree import export_graphviz, export_text
+
+        dot_path = os.path.join(out_dir, "tree.dot")
+        export_graphviz(self.clf, out_file=dot_path, feature_names=self.columns)
+        with open(os.path.join(out_dir, "rules.txt"), "w", encoding="utf-8") as f:
+            f.write(export_text(self.clf, feature_names=self.columns))
+
+    def n_nodes(self) -> int:
+        return int(self.clf.tree_.node_count)
+
+
+def make_model(algorithm: str, target: str):
+    if algorithm == "sklearn":
+        return _SklearnModel(target)
+    if algorithm not in _TREES:
+        raise ValueError(f"algoritmo inválido: {algorithm!r} (use um de {ALGORITHMS})")
+    return _TreeModel(algorithm, target)
+
+
+def run_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Mede um caso no processo corrente: {"algorithm", "dataset", "test_rows"}."""
+    ds = case["dataset"]
+    target = "Target"
+    n_test = case["test_rows"]
+    df = make_dataset(ds["n_rows"] + n_test, target=target, **_dataset_params(ds))
+    train, test = df.iloc[: ds["n_rows"]], df.iloc[ds["n_rows"] :]
+    numeric = [c for c in df.columns if c.startswith("num_")]
+    features = [c for c in df.columns if c != target]
+    model = make_model(case["algorithm"], target)
+
+    t0 = time.perf_counter()
+    train, test = model.prepare(train, test, numeric)
+    out: Dict[str, Any] = {"prepare_s": time.perf_counter() - t0}
+    rss: Dict[str, Optional[float]] = {"start": peak_rss_mb()}
+
+    t0 = time.perf_counter()
+    model.fit(train, features)
+    out["fit_s"] = time.perf_counter() - t0
+    rss["fit"] = peak_rss_mb()
+
+    t0 = time.perf_counter()
+    pred = model.predict(test)
+    out["predict_s"] = time.perf_counter() - t0
+    rss["predict"] = peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        t0 = time.perf_counter()
+        model.export(out_dir)
+        out["export_s"] = time.perf_counter() - t0
+    rss["export"] = peak_rss_mb()
+
+    y = test[target].astype(str).to_numpy()
+    out["accuracy"] = float(np.mean(np.asarray(pred).astype(str) == y))
+    out["n_nodes"] = model.n_nodes()
+    out["peak_rss_mb"] = rss
+    return out
+
+
+def _dataset_params(ds: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in ds.items() if k != "n_rows"}
+
+
+def _child(conn, case: Dict[str, Any]) -> None:
+    try:
+        conn.send(run_case(case))
+    except BaseException as e:  # o erro vira um campo do resultado
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_isolated(
+    case: Dict[str, Any], timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """run_case num processo novo (spawn), encerrado após `timeout` segundos."""
+    ctx = multiprocessing.get_context("spawn")
+    recv, send = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_child, args=(send, case))
+    proc.start()
+    send.close()
+    try:
+        if recv.poll(timeout):
+            return recv.recv()
+        return {"error": f"timeout ({timeout:g}s)"}
+    except EOFError:
+        return {"error": f"processo encerrado (código {proc.exitcode})"}
+    finally:
+        if proc.is_alive():
+            proc.terminate()
+        proc.join()
+
+
+def dataset_grid(**axes: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Produto cartesiano dos eixos (n_rows=[...], n_features=[...], ...)."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+def run_benchmark(
+    datasets: List[Dict[str, Any]],
+    algorithms: Sequence[str] = ALGORITHMS,
+    repeat: int = 1,
+    test_fraction: float = 0.25,
+    timeout: Optional[float] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Roda todos os casos e devolve o documento de resultados (ver write_results).
+
+    Cada caso roda `repeat` vezes, cada vez num processo novo; os tempos do caso são as
+    medianas e o pico de RSS é o maior entre as repetições.
+    """
+    for a in algorithms:
+        if a not in ALGORITHMS:
+            raise ValueError(f"algoritmo inválido: {a!r} (use um de {ALGORITHMS})")
+    if repeat < 1:
+        raise ValueError(f"repeat deve ser >= 1: {repeat!r}")
+    results = []
+    for ds in datasets:
+        n_test = max(1, math.ceil(ds["n_rows"] * test_fraction))
+        for algorithm in algorithms:
+            case = {"algorithm": algorithm, "dataset": ds, "test_rows": n_test}
+            runs = [run_isolated(case, timeout) for _ in range(repeat)]
+            res = dict(case, **summarize(runs))
+            results.append(res)
+            if progress is not None:
+                progress(res)
+    return {
+        "environment": environment(),
+        "config": {
+            "algorithms": list(algorithms),
+            "repeat": repeat,
+            "test_fraction": test_fraction,
+            "timeout_s": timeout,
+            "id3_bins": ID3_BINS,
+        },
+        "results": results,
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Medianas dos tempos e maior pico de RSS das repetições sem erro."""
+    ok = [r for r in runs if "error" not in r]
+    out: Dict[str, Any] = {"runs": runs}
+    if not ok:
+        out["error"] = runs[0]["error"]
+        return out
+    for key in ("prepare_s", "fit_s", "predict_s", "export_s"):
+        out[key] = statistics.median(r[key] for r in ok)
+    out["accuracy"] = ok[0]["accuracy"]
+    out["n_nodes"] = ok[0]["n_nodes"]
+    rss = {}
+    for k in ("start",) + PHASES:
+        peaks = [r["peak_rss_mb"][k] for r in ok]
+        rss[k] = None if None in peaks else max(peaks)
+    out["peak_rss_mb"] = rss
+    return out
+
+
+def write_results(doc: Dict[str, Any], path: str) -> None:
+    """Grava o documento em JSON: {"environment", "config", "results": [caso, ...]},
+    com cada caso = algoritmo, dataset (parâmetros de make_dataset), tempos (s) de
+    prepare/fit/predict/export, accuracy, n_nodes, peak_rss_mb por fase e as "runs"."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        res = subprocess.run(
+            ["git", *args],
+            cwd=get_repo_root(__file__),
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return res.stdout.strip() if res.returncode == 0 else None
+
+
+def environment() -> Dict[str, Any]:
+    """Commit, máquina e versões, para comparar resultados entre commits."""
+    import sklearn
+
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": None if status is None else bool(status),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def case_key(res: Dict[str, Any]) -> tuple:
+    return (res["algorithm"],) + tuple(sorted(res["dataset"].items()))
+
+
+def _ratio(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    return b / a if a and b is not None else None
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Razão novo/antigo dos tempos e do pico de RSS dos casos presentes nos dois
+    documentos (< 1 = melhorou)."""
+    before = {case_key(r): r for r in old["results"] if "error" not in r}
+    rows = []
+    for r in new["results"]:
+        o = before.get(case_key(r))
+        if o is None or "error" in r:
+            continue
+        row = {"algorithm": r["algorithm"], "dataset": r["dataset"]}
+        for key in ("fit_s", "predict_s", "export_s"):
+            row[key] = _ratio(o[key], r[key])
+        row["peak_rss_mb"] = _ratio(
+            o["peak_rss_mb"]["export"], r["peak_rss_mb"]["export"]
+        )
+        rows.append(row)
+    return rows
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# Gerador de tabelas sintéticas de classificação para o benchmark das árvores.
+# Cada classe tem um protótipo:
+# - atributos numéricos: uma média por atributo, sorteada de N(0, separation²); as
+#   linhas da classe saem de N(média, 1);
+# - atributos categóricos: uma distribuição de Dirichlet(1) sobre as `cardinality`
+#   categorias; as linhas da classe sorteiam a categoria dessa distribuição.
+# Depois, uma fração `noise` dos rótulos é trocada por uma classe sorteada (ruído de
+# rótulo), o que limita a acurácia alcançável e faz as árvores crescerem.
+
+
+def make_dataset(
+    n_rows: int,
+    n_features: int = 10,
+    numeric_fraction: float = 0.5,
+    cardinality: int = 5,
+    n_classes: int = 3,
+    noise: float = 0.1,
+    separation: float = 1.0,
+    random_state: int = 0,
+    target: str = "Target",
+) -> pd.DataFrame:
+    """DataFrame com `n_rows` linhas: colunas num_0.. (float), cat_0.. (str "v0"..) e o
+    alvo (str "c0".."c{n_classes-1}"). Mesma semente -> mesma tabela."""
+    if n_rows < 1:
+        raise ValueError(f"n_rows deve ser >= 1: {n_rows!r}")
+    if n_features < 1:
+        raise ValueError(f"n_features deve ser >= 1: {n_features!r}")
+    if not 0.0 <= numeric_fraction <= 1.0:
+        raise ValueError(f"numeric_fraction deve estar em [0, 1]: {numeric_fraction!r}")
+    if cardinality < 2:
+        raise ValueError(f"cardinality deve ser >= 2: {cardinality!r}")
+    if n_classes < 2:
+        raise ValueError(f"n_classes deve ser >= 2: {n_classes!r}")
+    if not 0.0 <= noise <= 1.0:
+        raise ValueError(f"noise deve estar em [0, 1]: {noise!r}")
+
+    rng = np.random.default_rng(random_state)
+    n_numeric = int(round(n_features * numeric_fraction))
+    y = rng.integers(n_classes, size=n_rows)
+    columns = {}
+
+    means = rng.normal(0.0, separation, size=(n_classes, n_numeric))
+    for j in range(n_numeric):
+        columns[f"num_{j}"] = means[y, j] + rng.standard_normal(n_rows)
+
+    values = np.array([f"v{v}" for v in range(cardinality)], dtype=object)
+    for j in range(n_features - n_numeric):
+        cum = np.cumsum(rng.dirichlet(np.ones(cardinality), size=n_classes), axis=1)
+        u = rng.random(n_rows)
+        # categoria = primeira faixa acumulada do protótipo da classe que passa de u
+        codes = (u[:, None] > cum[y]).sum(axis=1)
+        columns[f"cat_{j}"] = values[np.minimum(codes, cardinality - 1)]
+
+    flip = rng.random(n_rows) < noise
+    y = np.where(flip, rng.integers(n_classes, size=n_rows), y)
+    classes = np.array([f"c{c}" for c in range(n_classes)], dtype=object)
+    columns[target] = classes[y]
+    return pd.DataFrame(columns)
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Registro colunar dos candidatos avaliados durante o fit (auditoria dos splits).
+#
+# Cada linha é um candidato de um nó:
+# - node: id do nó (ordem de criação; guardado em `node_id` nos nós);
+# - attr / value: índices em `attrs` / `values` (value = -1 para limiares numéricos);
+# - kind: índice em KINDS — "branch" (um ramo de um split multiway do ID3/C4.5; a
+#   coluna left guarda as contagens do ramo e right fica zerada), "le" (attr <= limiar),
+#   "eq" (attr == valor) ou "in" (attr ∈ subconjunto);
+# - threshold: limiar numérico (NaN nos categóricos);
+# - score: IG (ID3/C4.5) ou redução de Gini (CART);
+# - split_info: SplitInfo do C4.5 (NaN nos demais);
+# - n_left / n_right: tamanhos (ou pesos) de cada lado.
+# As contagens por classe de cada lado ficam em duas matrizes à parte (linhas × classes),
+# porque o número de classes pode crescer (partial_fit). Dicts só são montados em report().
+
+KINDS = ("branch", "le", "eq", "in")
+
+AUDIT_DTYPE = np.dtype(
+    [
+        ("node", np.int32),
+        ("attr", np.int32),
+        ("kind", np.uint8),
+        ("value", np.int32),
+        ("threshold", np.float64),
+        ("score", np.float64),
+        ("split_info", np.float64),
+        ("n_left", np.float64),
+        ("n_right", np.float64),
+    ]
+)
+
+
+class SplitAudit:
+    """Armazena os candidatos de todos os nós em blocos de arrays estruturados."""
+
+    def __init__(self):
+        self.attrs: List[str] = []
+        self.values: List[Any] = []
+        self.classes: List[Any] = []
+        self._attr_code: Dict[str, int] = {}
+        self._value_code: Dict[Any, int] = {}
+        self._class_code: Dict[Any, int] = {}
+        self._chunks: List[np.ndarray] = []
+        self._left: List[np.ndarray] = []
+        self._right: List[np.ndarray] = []
+        self._n_nodes = 0
+        self._cache = None
+
+    def __len__(self) -> int:
+        return sum(len(c) for c in self._chunks)
+
+    def new_node(self) -> int:
+        self._n_nodes += 1
+        return self._n_nodes - 1
+
+    # -------------------
+    # Códigos
+    # -------------------
+    @staticmethod
+    def _code(table: Dict[Any, int], items: List[Any], key: Any) -> int:
+        c = table.get(key)
+        if c is None:
+            c = table[key] = len(items)
+            items.append(key)
+        return c
+
+    def _value(self, value: Any) -> int:
+        # chave com o tipo: 1, 1.0 e True são valores distintos de categoria
+        c = self._value_code.get((type(value), value))
+        if c is None:
+            c = self._value_code[(type(value), value)] = len(self.values)
+            self.values.append(value)
+        return c
+
+    def _class_columns(self, classes: Sequence[Any]) -> np.ndarray:
+        return np.array(
+            [self._code(self._class_code, self.classes, c) for c in classes],
+            dtype=np.int64,
+        )
+
+    def _counts_matrix(self, counts: Optional[Dict[Any, float]]) -> np.ndarray:
+        if not counts:
+            return np.zeros((1, 0))
+        cols = self._class_columns(list(counts))
+        out = np.zeros((1, cols.max() + 1))
+        out[0, cols] = list(counts.values())
+        return out
+
+    # -------------------
+    # Registro
+    # -------------------
+    def add(
+        self,
+        node: int,
+        attr: str,
+        kind: str,
+        score: float,
+        value: Any = None,
+        threshold: float = np.nan,
+        split_info: float = np.nan,
+        n_left: float = np.nan,
+        n_right: float = np.nan,
+        left: Optional[Dict[Any, float]] = None,
+        right: Optional[Dict[Any, float]] = None,
+    ) -> None:
+        """Um candidato; left/right são dicts classe -> contagem."""
+        rec = np.zeros(1, dtype=AUDIT_DTYPE)
+        rec["node"] = node
+        rec["attr"] = self._code(self._attr_code, self.attrs, attr)
+        rec["kind"] = KINDS.index(kind)
+        rec["value"] = -1 if value is None else self._value(value)
+        rec["threshold"] = threshold
+        rec["score"] = score
+        rec["split_info"] = split_info
+        rec["n_left"] = n_left
+        rec["n_right"] = n_right
+        self._append(rec, self._counts_matrix(left), self._counts_matrix(right))
+
+    def add_branches(
+        self,
+        node: int,
+        attr: str,
+        score: float,
+        details: Dict[Any, Dict[str, Any]],
+        split_info: float = np.nan,
+        threshold: Optional[float] = None,
+    ) -> None:
+        """Atributo avaliado pelo ID3/C4.5 a partir dos detalhes por ramo
+        ({ramo: {"n", "class_counts", ...}}): uma linha "le" para um limiar numérico
+        (ramos "<=" e ">"), senão uma linha "branch" por ramo."""
+        if threshold is not None:
+            le, gt = details.get("<=", {}), details.get(">", {})
+            self.add(
+                node,
+                attr,
+                "le",
+                score,
+                threshold=threshold,
+                split_info=split_info,
+                n_left=le.get("n", 0),
+                n_right=gt.get("n", 0),
+                left=le.get("class_counts"),
+                right=gt.get("class_counts"),
+            )
+            return
+        for v, d in details.items():
+            self.add(
+                node,
+                attr,
+                "branch",
+                score,
+                value=v,
+                split_info=split_info,
+                n_left=d["n"],
+                left=d["class_counts"],
+            )
+
+    def add_many(
+        self,
+        node: int,
+        attr: str,
+        kind: str,
+        scores: np.ndarray,
+        classes: Sequence[Any],
+        left: np.ndarray,
+        right: np.ndarray,
+        n_left: np.ndarray,
+        n_right: np.ndarray,
+        thresholds: Optional[np.ndarray] = None,
+        values: Optional[Sequence[Any]] = None,
+    ) -> None:
+        """Vários candidatos de um mesmo atributo (ex.: todos os limiares de uma
+        varredura); left/right são matrizes (candidatos × classes) na ordem de `classes`."""
+        m = len(scores)
+        rec = np.zeros(m, dtype=AUDIT_DTYPE)
+        rec["node"] = node
+        rec["attr"] = self._code(self._attr_code, self.attrs, attr)
+        rec["kind"] = KINDS.index(kind)
+        rec["value"] = -1 if values is None else [self._value(v) for v in values]
+        rec["threshold"] = np.nan if thresholds is None else thresholds
+        rec["score"] = scores
+        rec["split_info"] = np.nan
+        rec["n_left"] = n_left
+        rec["n_right"] = n_right
+        cols = self._class_columns(classes)
+        width = int(cols.max()) + 1 if len(cols) else 0
+        lm = np.zeros((m, width))
+        rm = np.zeros((m, width))
+        lm[:, cols] = left
+        rm[:, cols] = right
+        self._append(rec, lm, rm)
+
+    def _append(self, rec: np.ndarray, left: np.ndarray, right: np.ndarray) -> None:
+        self._chunks.append(rec)
+        self._left.append(left)
+        self._right.append(right)
+        self._cache = None
+
+    # -------------------
+    # Consulta
+    # -------------------
+    def _arrays(self):
+        if self._cache is None:
+            k = len(self.classes)
+
+            def stack(mats: List[np.ndarray]) -> np.ndarray:
+                if not mats:
+                    return np.zeros((0, k))
+                return np.concatenate(
+                    [np.pad(m, ((0, 0), (0, k - m.shape[1]))) for m in mats]
+                )
+
+            records = (
+                np.concatenate(self._chunks)
+                if self._chunks
+                else np.zeros(0, dtype=AUDIT_DTYPE)
+            )
+            self._chunks = [records] if len(records) else []
+            left, right = stack(self._left), stack(self._right)
+            self._left = [left] if len(records) else []
+            self._right = [right] if len(records) else []
+            self._cache = (records, left, right)
+        return self._cache
+
+    @property
+    def records(self) -> np.ndarray:
+        """Todas as linhas (array estruturado AUDIT_DTYPE)."""
+        return self._arrays()[0]
+
+    @property
+    def left_counts(self) -> np.ndarray:
+        """Contagens por classe do lado esquerdo/ramo (linhas × `classes`)."""
+        return self._arrays()[1]
+
+    @property
+    def right_counts(self) -> np.ndarray:
+        return self._arrays()[2]
+
+    @property
+    def nbytes(self) -> int:
+        records, left, right = self._arrays()
+        return records.nbytes + left.nbytes + right.nbytes
+
+    def report(self, node: int) -> List[Dict[str, Any]]:
+        """Candidatos do nó como dicts legíveis (montados só aqui)."""
+        records, left, right = self._arrays()
+        out: List[Dict[str, Any]] = []
+        for i in np.flatnonzero(records["node"] == node):
+            r = records[i]
+            kind = KINDS[r["kind"]]
+            row: Dict[str, Any] = {
+                "attr": self.attrs[r["attr"]],
+                "kind": kind,
+                "score": float(r["score"]),
+            }
+            if r["value"] >= 0:
+                row["value"] = self.values[r["value"]]
+            if not np.isnan(r["threshold"]):
+                row["threshold"] = float(r["threshold"])
+            if not np.isnan(r["split_info"]):
+                row["split_info"] = float(r["split_info"])
+            row["n_left"] = float(r["n_left"])
+            row["left_counts"] = _counts_dict(left[i], self.classes)
+            if kind != "branch":
+                row["n_right"] = float(r["n_right"])
+                row["right_counts"] = _counts_dict(right[i], self.classes)
+            out.append(row)
+        return out
+
+
+def _counts_dict(row: np.ndarray, classes: List[Any]) -> Dict[Any, float]:
+    """Contagens não nulas, da maior para a menor (empates na ordem de `classes`)."""
+    order = np.argsort(-row, kind="stable")
+    return {
+        classes[j]: (int(row[j]) if float(row[j]).is_integer() else float(row[j]))
+        for j in order
+        if row[j] > 0
+    }
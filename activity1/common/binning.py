@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+# Código reservado para valores ausentes na matriz quantizada (uint8)
+MISSING_BIN = 255
+MAX_BINS = 255
+
+
+def quantize(x: np.ndarray, max_bins: int = MAX_BINS) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantiza uma coluna numérica em no máximo `max_bins` faixas (códigos uint8).
+
+    Devolve (códigos, cortes): a linha com valor v recebe o número de cortes < v, de modo
+    que `v <= cortes[b]` equivale a `código <= b`. Os cortes são pontos médios entre
+    valores distintos vizinhos — todos eles, se couberem; senão os mais próximos dos
+    quantis, para faixas com números parecidos de linhas. Ausentes (NaN) recebem
+    MISSING_BIN.
+    """
+    if not 2 <= max_bins <= MAX_BINS:
+        raise ValueError(f"max_bins deve estar entre 2 e {MAX_BINS}: {max_bins!r}")
+    x = np.asarray(x, dtype=np.float64)
+    known = ~np.isnan(x)
+    uniq = np.unique(x[known])
+    if len(uniq) <= max_bins:
+        idx = np.arange(1, len(uniq))
+    else:
+        q = np.quantile(x[known], np.linspace(0, 1, max_bins + 1)[1:-1])
+        idx = np.unique(np.clip(np.searchsorted(uniq, q, side="right"), 1, len(uniq) - 1))
+    cuts = (uniq[idx - 1] + uniq[idx]) / 2.0
+    codes = np.full(len(x), MISSING_BIN, dtype=np.uint8)
+    codes[known] = np.searchsorted(cuts, x[known], side="left")
+    return codes, cuts
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+
+# Conjuntos de linhas como bitsets compactos: o bit i da palavra i // 64 marca a linha i.
+# Interseção = AND palavra a palavra; tamanho = popcount. Substitui filtros de DataFrame
+# quando o mesmo conjunto de linhas é combinado muitas vezes (ex.: simplificação de regras).
+
+if hasattr(np, "bitwise_count"):
+
+    def popcount(bits: np.ndarray) -> int:
+        return int(np.bitwise_count(bits).sum())
+
+else:  # numpy < 2.0
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(bits: np.ndarray) -> int:
+        return int(_POP8[bits.view(np.uint8)].sum(dtype=np.int64))
+
+
+def pack(mask: np.ndarray) -> np.ndarray:
+    """Máscara booleana (n,) -> bitset uint64 com ceil(n / 64) palavras."""
+    raw = np.packbits(np.asarray(mask, dtype=bool), bitorder="little")
+    pad = (-len(raw)) % 8
+    if pad:
+        raw = np.concatenate([raw, np.zeros(pad, dtype=np.uint8)])
+    return raw.view("<u8")
+
+
+def unpack(bits: np.ndarray, n: int) -> np.ndarray:
+    """Bitset -> máscara booleana com as n primeiras linhas."""
+    return np.unpackbits(bits.view(np.uint8), count=n, bitorder="little").astype(bool)
+
+
+def full(n: int) -> np.ndarray:
+    """Bitset com as n linhas marcadas."""
+    return pack(np.ones(n, dtype=bool))
+
+
+def and_all(sets: Iterable[np.ndarray], n: int) -> np.ndarray:
+    """Interseção de vários bitsets (todas as n linhas se a lista for vazia)."""
+    out = full(n)
+    for s in sets:
+        out = out & s
+    return out
+
+
+def pack_rows(masks: np.ndarray) -> np.ndarray:
+    """Matriz booleana (m, n) -> m bitsets (m, ceil(n / 64)), um por linha."""
+    masks = np.asarray(masks, dtype=bool)
+    raw = np.packbits(masks, axis=1, bitorder="little")
+    pad = (-raw.shape[1]) % 8
+    if pad or raw.shape[1] == 0:
+        raw = np.pad(raw, ((0, 0), (0, pad if raw.shape[1] else 8)))
+    return np.ascontiguousarray(raw).view("<u8")
+
+
+def first_set(bits: np.ndarray) -> np.ndarray:
+    """Índice do menor bit ligado de cada bitset (linhas de uma matriz); -1 se vazio."""
+    nonzero = bits != 0
+    w = nonzero.argmax(axis=1)
+    word = bits[np.arange(len(bits)), w]
+    low = word & (~word + np.uint64(1))
+    pos = np.log2(np.maximum(low, 1).astype(np.float64)).astype(np.int64)
+    return np.where(nonzero.any(axis=1), w * 64 + pos, -1)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import marshal
+import math
+import os
+import sys
+import stat
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .tree import EQ, LE, LEAF, MULTI, TreeArrays
+
+# Compilador árvore -> código Python: gera uma função `predict_row(row)` especializada
+# para uma TreeArrays, com os testes escritos por extenso (sem percorrer vetores nem
+# consultar atributos de nós a cada linha).
+#
+# - LE (CART/C4.5 numérico): `if v <= limiar:`; o ramo esquerdo sempre retorna, então
+#   o direito segue no mesmo nível de indentação;
+# - EQ / IN (CART categórico): `if v == categoria:` / `if v in frozenset(...)`;
+# - MULTI (ID3/C4.5): filhos que são folhas vão para um dict de despacho
+#   (categoria -> classe); os demais viram uma cadeia de `if v == categoria:`.
+#
+# A semântica é a de TreeArrays.predict: valor ausente (None/NaN) ou categoria sem ramo
+# para no nó e devolve a sua classe. Com split_missing=True (C4.5), ausente devolve
+# MISSING, para o chamador cair na predição com pesos. Subárvores muito profundas viram
+# funções auxiliares (limite de indentação do Python).
+#
+# O código compilado fica em cache no disco (marshal + o fonte .py, para inspeção),
+# com o nome dado por um hash dos vetores da árvore. O cache é executado ao ser lido,
+# então só é usado num diretório do próprio usuário sem escrita para grupo/outros
+# (padrão: ~/.cache/cc-ia-codegen, criado com modo 0o700).
+
+CODEGEN_VERSION = 1
+# Níveis de indentação por função antes de abrir uma função auxiliar
+_MAX_INDENT = 40
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+# Devolvido pela função gerada (split_missing=True) quando falta um valor testado
+MISSING = _Missing()
+
+_LOADED: Dict[str, Callable[[Mapping[str, Any]], Any]] = {}
+
+
+def _lit(v: Any) -> str:
+    """Literal Python de um valor de categoria/classe/limiar."""
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float):
+        if math.isnan(v):
+            raise ValueError("NaN não pode ser categoria nem limiar")
+        return repr(v) if math.isfinite(v) else f"float({repr(v)!r})"
+    if isinstance(v, (str, int, bool)):
+        return repr(v)
+    raise ValueError(f"valor sem literal Python: {v!r}")
+
+
+def generate_source(
+    tree: TreeArrays, split_missing: bool = False, name: str = "predict_row"
+) -> str:
+    """Fonte Python de `name(row)`; row mapeia atributo -> valor (ex.: um dict)."""
+    header = [
+        f"# Gerado por activity1.common.codegen (versão {CODEGEN_VERSION})",
+        f"_C = ({''.join(_lit(c) + ', ' for c in tree.classes)})",
+    ]
+    funcs: List[str] = []
+    pending: List[Tuple[str, int]] = [(name, 0)]
+    while pending:
+        fname, root = pending.pop(0)
+        out = [f"def {fname}(row):"]
+        # pilha LIFO de (nó, indentação) ou (None, linha pronta)
+        stack: List[Tuple[Optional[int], Any]] = [(root, 1)]
+        while stack:
+            i, arg = stack.pop()
+            if i is None:
+                out.append(arg)
+                continue
+            pad = "    " * arg
+            cls = f"_C[{int(tree.node_class[i])}]"
+            label = "return " + cls
+            k = tree.kind[i]
+            if k == LEAF:
+                out.append(pad + label)
+                continue
+            if arg >= _MAX_INDENT:
+                pending.append((f"_n{i}", i))
+                out.append(pad + f"return _n{i}(row)")
+                continue
+            j = int(tree.feature[i])
+            cats = tree.categories[j]
+            off = int(tree.child_offset[i])
+            kids = tree.child_table[off : off + int(tree.n_children[i])].tolist()
+            out.append(pad + f"v = row[{tree.features[j]!r}]")
+            if k in (LE, MULTI):
+                out.append(pad + "if v is None or v != v:")
+                stop = "return _MISSING" if split_missing else label
+                out.append(pad + "    " + stop)
+            if k != MULTI:
+                if k == LE:
+                    cond = f"v <= {_lit(float(tree.threshold[i]))}"
+                elif k == EQ:
+                    cond = f"v == {_lit(cats[tree.split_code[i]])}"
+                else:
+                    s = int(tree.split_code[i])
+                    members = cats[tree.member[s : s + len(cats)]]
+                    items = "".join(_lit(c) + ", " for c in members)
+                    header.append(f"_S{i} = frozenset(({items}))")
+                    cond = f"v in _S{i}"
+                out.append(pad + f"if {cond}:")
+                # o ramo esquerdo sempre retorna: o direito segue no mesmo nível
+                stack.append((kids[1], arg))
+                stack.append((kids[0], arg + 1))
+                continue
+            branches = [(c, ch) for c, ch in zip(cats, kids) if ch >= 0]
+            leaves = [(c, ch) for c, ch in branches if tree.kind[ch] == LEAF]
+            inner = [(c, ch) for c, ch in branches if tree.kind[ch] != LEAF]
+            if leaves:
+                table = ", ".join(
+                    f"{_lit(c)}: _C[{int(tree.node_class[ch])}]" for c, ch in leaves
+                )
+                header.append(f"_D{i} = {{{table}}}")
+                if not inner:
+                    out.append(pad + f"return _D{i}.get(v, {cls})")
+                    continue
+                out.append(pad + f"y = _D{i}.get(v)")
+                out.append(pad + "if y is not None:")
+                out.append(pad + "    return y")
+            # categoria sem ramo: para no nó
+            stack.append((None, pad + label))
+            for c, ch in reversed(inner):
+                stack.append((ch, arg + 1))
+                stack.append((None, pad + f"if v == {_lit(c)}:"))
+        funcs.append("\n".join(out))
+    return "\n".join(header) + "\n\n\n" + "\n\n\n".join(funcs) + "\n"
+
+
+def tree_hash(tree: TreeArrays, split_missing: bool = False) -> str:
+    """Hash dos vetores que definem a predição (e da versão do gerador)."""
+    h = hashlib.sha256()
+    meta = {
+        "version": CODEGEN_VERSION,
+        "split_missing": split_missing,
+        "features": list(tree.features),
+        "classes": [repr(c) for c in tree.classes],
+        "categories": [[repr(c) for c in cats] for cats in tree.categories],
+    }
+    h.update(json.dumps(meta).encode("utf-8"))
+    for a in (
+        tree.feature,
+        tree.kind,
+        tree.threshold,
+        tree.split_code,
+        tree.child_offset,
+        tree.n_children,
+        tree.child_table,
+        tree.member,
+        tree.node_class,
+    ):
+        h.update(np.ascontiguousarray(a).tobytes())
+    return h.hexdigest()
+
+
+def default_cache_dir() -> str:
+    """$CCIA_CODEGEN_CACHE, ou cc-ia-codegen no cache do usuário ($XDG_CACHE_HOME ou
+    ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.environ.get("CCIA_CODEGEN_CACHE") or os.path.join(base, "cc-ia-codegen")
+
+
+def _private_dir(path: str) -> bool:
+    """Cria `path` (modo 0o700) se preciso e diz se ele é seguro para o cache: do
+    usuário corrente e sem escrita para grupo/outros. Sem os.getuid (Windows), só
+    confere que é um diretório."""
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode):
+        return False
+    if not hasattr(os, "getuid"):
+        return True
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _write(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build_predictor(
+    tree: TreeArrays,
+    split_missing: bool = False,
+    cache_dir: Optional[str] = None,
+) -> Callable[[Mapping[str, Any]], Any]:
+    """Função predict_row(row) da árvore: do cache em memória, do cache em disco
+    (código já compilado) ou gerada e compilada agora. Falhas de escrita no cache são
+    ignoradas (a função é devolvida do mesmo jeito); um diretório de cache de outro
+    usuário, ou com escrita para grupo/outros, não é lido nem escrito."""
+    key = tree_hash(tree, split_missing)
+    fn = _LOADED.get(key)
+    if fn is not None:
+        return fn
+    cache_dir = cache_dir or default_cache_dir()
+    src_path = os.path.join(cache_dir, f"{key}.py")
+    bin_path = os.path.join(cache_dir, f"{key}.{sys.implementation.cache_tag}.bin")
+    use_disk = _private_dir(cache_dir)
+    code = None
+    if use_disk:
+        try:
+            with open(bin_path, "rb") as f:
+                code = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+    if code is None:
+        source = generate_source(tree, split_missing)
+        code = compile(source, src_path, "exec")
+        if use_disk:
+            try:
+                _write(src_path, source.encode("utf-8"))
+                _write(bin_path, marshal.dumps(code))
+            except OSError:
+                pass
+    namespace: Dict[str, Any] = {"_MISSING": MISSING}
+    exec(code, namespace)
+    fn = _LOADED[key] = namespace["predict_row"]
+    return fn
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class EncodedFrame:
+    """Tabela categórica codificada uma única vez em inteiros pequenos.
+
+    - X: matriz (n_linhas, n_atributos) com o código de cada valor (-1 = ausente);
+    - y: vetor (n_linhas,) com o código da classe;
+    - categories[j]: valores originais do atributo j, na ordem dos códigos (ordenados,
+      como no groupby do pandas);
+    - classes: rótulos das classes (str), na ordem dos códigos.
+    """
+
+    X: np.ndarray
+    y: np.ndarray
+    features: List[str]
+    categories: List[np.ndarray]
+    classes: np.ndarray
+
+    @property
+    def n_classes(self) -> int:
+        return len(self.classes)
+
+    def n_values(self, j: int) -> int:
+        return len(self.categories[j])
+
+
+def encode_frame(df: pd.DataFrame, features: List[str], target: str) -> EncodedFrame:
+    """Codifica atributos categóricos e alvo com pd.factorize(sort=True)."""
+    n = len(df)
+    X = np.empty((n, len(features)), dtype=np.int32)
+    categories: List[np.ndarray] = []
+    for j, attr in enumerate(features):
+        codes, uniques = pd.factorize(df[attr], sort=True)
+        X[:, j] = codes
+        categories.append(np.asarray(uniques, dtype=object))
+    # Mesma convenção de class_distribution: rótulos como str
+    y_codes, classes = pd.factorize(df[target].astype(str), sort=True)
+    return EncodedFrame(
+        X=X,
+        y=y_codes.astype(np.int32),
+        features=list(features),
+        categories=categories,
+        classes=np.asarray(classes, dtype=object),
+    )
+
+
+def contingency_tables(
+    enc: EncodedFrame, rows: np.ndarray, cols: List[int]
+) -> List[np.ndarray]:
+    """Tabelas (valor × classe) de todos os atributos `cols` com um único np.bincount.
+
+    Cada atributo ocupa uma faixa própria de bins (deslocamentos acumulados), de modo que
+    uma só contagem sobre as linhas `rows` produz todas as tabelas do nó. Valores ausentes
+    (código -1) são ignorados, como no groupby.
+    """
+    k = enc.n_classes
+    sizes = np.array([enc.n_values(j) * k for j in cols], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(sizes)))
+    total = int(offsets[-1])
+    if total == 0 or len(rows) == 0:
+        return [np.zeros((enc.n_values(j), k), dtype=np.int64) for j in cols]
+    sub = enc.X[np.ix_(rows, cols)].astype(np.int64)
+    yk = enc.y[rows].astype(np.int64)
+    flat = sub * k + yk[:, None] + offsets[:-1][None, :]
+    flat = flat[sub >= 0]
+    counts = np.bincount(flat, minlength=total)
+    return [
+        counts[offsets[i] : offsets[i + 1]].reshape(enc.n_values(j), k)
+        for i, j in enumerate(cols)
+    ]
+
+
+def first_occurrence(
+    enc: EncodedFrame, rows: np.ndarray, cols: List[int]
+) -> List[np.ndarray]:
+    """Posição (em `rows`) da primeira ocorrência de cada par (valor, classe), por atributo.
+
+    Usada apenas para reproduzir a ordem de desempate de value_counts (contagem
+    decrescente, depois ordem de aparição).
+    """
+    k = enc.n_classes
+    n = len(rows)
+    sub = enc.X[np.ix_(rows, cols)].astype(np.int64)
+    yk = enc.y[rows].astype(np.int64)
+    pos = np.arange(n, dtype=np.int64)
+    out: List[np.ndarray] = []
+    for i, j in enumerate(cols):
+        first = np.full(enc.n_values(j) * k, n, dtype=np.int64)
+        valid = sub[:, i] >= 0
+        np.minimum.at(first, sub[valid, i] * k + yk[valid], pos[valid])
+        out.append(first.reshape(enc.n_values(j), k))
+    return out
+
+
+def ordered_class_counts(
+    counts: np.ndarray, first: np.ndarray, classes: np.ndarray
+) -> Dict[str, int]:
+    """Converte um vetor de contagens por classe no dict ordenado de value_counts.
+
+    Contagens inteiras viram int; contagens ponderadas (float) são mantidas como float.
+    """
+    present = np.flatnonzero(counts > 0)
+    order = present[np.lexsort((first[present], -counts[present]))]
+    cast = float if np.issubdtype(counts.dtype, np.floating) else int
+    return {str(classes[c]): cast(counts[c]) for c in order}
+
+
+def class_first_occurrence(y: np.ndarray, n_classes: int) -> np.ndarray:
+    """Primeira posição de cada classe em `y` (len(y) se ausente)."""
+    n = len(y)
+    first = np.full(n_classes, n, dtype=np.int64)
+    np.minimum.at(first, y.astype(np.int64), np.arange(n, dtype=np.int64))
+    return first
+
+
+def decode_value(enc: EncodedFrame, j: int, code: int) -> Any:
+    return enc.categories[j][code]
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+from .traversal import Edges, iter_paths, node_edges
+
+# Exportadores em streaming (DOT e base de regras) das árvores ID3, C4.5 e CART: geram
+# as linhas uma a uma, para serem escritas direto no arquivo, sem montar o documento
+# inteiro em memória.
+# - dot_lines: a pilha guarda só a fronteira da DFS e as linhas de aresta pendentes (os
+#   ids dos nós viajam na pilha, sem dicionário id(nó) -> id);
+# - iter_rules: caminhos raiz→folha com o prefixo de condições compartilhado
+#   (traversal.iter_paths); copy=False entrega a própria lista do prefixo, para quem
+#   consome a regra na hora (rule_lines).
+
+
+def dot_escape(s: Any) -> str:
+    return str(s).replace("\n", "\\n").replace('"', '\\"')
+
+
+def dot_lines(
+    root: Any,
+    name: str,
+    node_label: Callable[[Any], str],
+    edge_label: Callable[[Any, Any], str],
+    edges: Edges = node_edges,
+) -> Iterator[str]:
+    """Linhas do DOT: cada nó ao ser visitado (pré-ordem) e cada aresta ao terminar a
+    subárvore do filho — a ordem de walk_dfs. Rótulos já escapados pelo chamador."""
+    yield f"digraph {name} {{"
+    yield "  node [shape=box, style=rounded, fontsize=10];"
+    next_id = 0
+    # (id do pai, rótulo, nó) a visitar ou a linha pronta de uma aresta
+    stack: List[Any] = [(0, None, root)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+            continue
+        parent_id, lbl, n = item
+        next_id += 1
+        nid = next_id
+        yield f'  n{nid} [label="{node_label(n)}"];'
+        if parent_id:
+            stack.append(f'  n{parent_id} -> n{nid} [label="{lbl}"];')
+        for key, ch in reversed(list(edges(n))):
+            stack.append((nid, edge_label(n, key), ch))
+    yield "}"
+
+
+def leaf_rule(conditions: List[Any], leaf: Any, n_total: int) -> Dict[str, Any]:
+    """Regra de uma folha (formato de extract_rules) com as condições dadas."""
+    n = leaf.samples
+    cc = leaf.class_counts
+    y = leaf.predicted_class or (max(cc, key=lambda k: cc[k]) if cc else "?")
+    hits = cc.get(y, 0) if cc else 0
+    return {
+        "conditions": conditions,
+        "predicted_class": y,
+        "n": n,
+        "class_counts": cc,
+        "support": (n / n_total) if n_total > 0 else 0.0,
+        "confidence": (hits / n) if n > 0 else 0.0,
+        "hits": hits,
+    }
+
+
+def iter_rules(
+    root: Any, step: Callable[[Any, Any], Tuple[str, str, Any]], copy: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """Regras SE-ENTÃO dos caminhos raiz→folha; step(nó, rótulo) -> (attr, op, valor).
+
+    Com copy=False, "conditions" é o prefixo compartilhado: vale só até a próxima regra.
+    """
+    n_total = max(1, root.samples)
+    for prefix, leaf in iter_paths(root, step):
+        yield leaf_rule(list(prefix) if copy else prefix, leaf, n_total)
+
+
+def rule_lines(
+    rules: Iterable[Dict[str, Any]],
+    title: str,
+    target: str,
+    total: Any,
+    fmt_value: Callable[[Any], str] = str,
+    fmt_count: Callable[[Any], str] = str,
+) -> Iterator[str]:
+    """Linhas do arquivo de regras: cabeçalho e uma linha "Regra i: SE ... ENTÃO ..."."""
+    yield f"# {title} — alvo: {target}"
+    yield f"# Total de amostras de treino: {fmt_count(total)}"
+    for i, r in enumerate(rules, start=1):
+        conds = (
+            " E ".join(f"{a} {op} {fmt_value(v)}" for (a, op, v) in r["conditions"])
+            or "(sempre)"
+        )
+        sup = r["support"] * 100.0
+        conf = r["confidence"] * 100.0
+        dist = ", ".join(f"{k}:{fmt_count(v)}" for k, v in r["class_counts"].items())
+        yield (
+            f"Regra {i}: SE {conds} ENTÃO {target} = {r['predicted_class']} "
+            f"(n={fmt_count(r['n'])}, suporte={sup:.2f}%, confiança={conf:.2f}%, "
+            f"dist=[{dist}])"
+        )
+
+
+def write_lines(f: TextIO, lines: Iterable[str], end: str = "\n") -> None:
+    """Escreve as linhas separadas por quebra de linha e `end` após a última."""
+    first = True
+    for line in lines:
+        if not first:
+            f.write("\n")
+        f.write(line)
+        first = False
+    if not first:
+        f.write(end)
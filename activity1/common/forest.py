@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import importlib.util
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .tree import TreeArrays, _sorted_values, encode_matrix
+
+# Floresta aleatória sobre os builders escritos à mão (ID3, C4.5, CART):
+# - cada árvore é treinada numa amostra bootstrap das linhas e, em cada nó, avalia só um
+#   subconjunto sorteado dos atributos (FeatureSampler, parâmetro max_features das
+#   árvores);
+# - as árvores rodam num pool de processos. A tabela de treino é codificada uma vez numa
+#   matriz float (categóricos como códigos, numéricos como estão, alvo na última coluna)
+#   em multiprocessing.shared_memory; cada worker só recebe o nome do bloco e os
+#   dicionários (no initializer) e remonta o DataFrame das suas linhas bootstrap;
+# - cada worker devolve a árvore emitida no núcleo (TreeArrays). No processo principal
+#   todas são recodificadas (TreeArrays.recode) para os mesmos dicionários de categorias
+#   e classes: a predição codifica a tabela uma única vez e soma as distribuições das
+#   folhas de cada árvore, coluna a coluna, sem alinhar classes por linha.
+#
+# A predição usa a semântica do núcleo: no C4.5, valor ausente para no nó (não é
+# dividido entre os ramos com pesos, como em C45DecisionTree.predict).
+
+MAX_FEATURES = ("sqrt", "log2")
+
+
+class FeatureSampler:
+    """Sorteia, a cada nó, os atributos avaliados.
+
+    max_features: "sqrt", "log2", inteiro >= 1 (quantidade) ou fração em (0, 1], sobre
+    os atributos ainda disponíveis no nó. O subconjunto mantém a ordem original (os
+    desempates entre atributos continuam os mesmos).
+    """
+
+    def __init__(self, max_features: Any, random_state: Any = None):
+        if isinstance(max_features, str):
+            if max_features not in MAX_FEATURES:
+                raise ValueError(
+                    f"max_features inválido: {max_features!r} (use {list(MAX_FEATURES)}, "
+                    "um inteiro >= 1 ou uma fração em (0, 1])"
+                )
+        elif isinstance(max_features, (int, np.integer)) and not isinstance(
+            max_features, bool
+        ):
+            if max_features < 1:
+                raise ValueError(f"max_features deve ser >= 1: {max_features!r}")
+        elif isinstance(max_features, float):
+            if not 0.0 < max_features <= 1.0:
+                raise ValueError(
+                    f"max_features fracionário deve estar em (0, 1]: {max_features!r}"
+                )
+        else:
+            raise ValueError(f"max_features inválido: {max_features!r}")
+        self.max_features = max_features
+        self.random_state = random_state
+        self.reset()
+
+    def reset(self) -> None:
+        """Reinicia o gerador (cada fit sorteia a mesma sequência)."""
+        self._rng = np.random.default_rng(self.random_state)
+
+    def size(self, n: int) -> int:
+        m = self.max_features
+        if m == "sqrt":
+            k = int(math.sqrt(n))
+        elif m == "log2":
+            k = int(math.log2(n)) if n else 0
+        elif isinstance(m, float):
+            k = int(m * n)
+        else:
+            k = int(m)
+        return min(n, max(1, k))
+
+    def __call__(self, features: List[str]) -> List[str]:
+        k = self.size(len(features))
+        if k >= len(features):
+            return features
+        keep = np.sort(self._rng.choice(len(features), k, replace=False))
+        return [features[i] for i in keep]
+
+
+# ---------------------------
+# Workers
+# ---------------------------
+
+# Estado de cada processo do pool (preenchido pelo initializer)
+_STATE: Optional[Dict[str, Any]] = None
+
+
+def _estimator_class(module: str, path: Optional[str], name: str) -> type:
+    """Classe do estimador no worker: do módulo já carregado (fork, ou o __main__
+    reimportado no spawn) ou carregada do arquivo do script."""
+    mod = sys.modules.get(module)
+    if mod is None or not hasattr(mod, name):
+        if path is None:
+            mod = importlib.import_module(module)
+        else:
+            spec = importlib.util.spec_from_file_location(f"_forest_{name}", path)
+            mod = importlib.util.module_from_spec(spec)
+            sys.modules[spec.name] = mod
+            spec.loader.exec_module(mod)
+    return getattr(mod, name)
+
+
+def _init_worker(spec: Dict[str, Any]) -> None:
+    global _STATE
+    shm = shared_memory.SharedMemory(name=spec["shm"])
+    state = dict(spec)
+    state["_shm"] = shm  # mantém o bloco mapeado enquanto o worker viver
+    state["X"] = np.ndarray(spec["shape"], dtype=np.float64, buffer=shm.buf)
+    state["cls"] = _estimator_class(*spec["estimator"])
+    _STATE = state
+
+
+def _bootstrap_rows(seed: int, n: int, bootstrap: bool) -> np.ndarray:
+    if not bootstrap:
+        return np.arange(n)
+    # em ordem crescente: a ordem das linhas decide desempates por primeira aparição
+    return np.sort(np.random.default_rng(seed).integers(0, n, n))
+
+
+def _frame(state: Dict[str, Any], rows: np.ndarray) -> pd.DataFrame:
+    """DataFrame das linhas `rows` remontado a partir da matriz compartilhada."""
+    X = state["X"]
+    data: Dict[str, Any] = {}
+    for j, attr in enumerate(state["features"]):
+        col = X[rows, j]
+        values = state["values"][j]
+        if values is not None:
+            # código -1 (ausente) cai no último item, NaN
+            data[attr] = values[col.astype(np.int64)]
+        elif state["dtypes"][j] != np.float64 and not np.isnan(col).any():
+            data[attr] = pd.Series(col).astype(state["dtypes"][j])
+        else:
+            data[attr] = col
+    data[state["target"]] = state["classes"][X[rows, -1].astype(np.int64)]
+    return pd.DataFrame(data)
+
+
+def _fit_tree(seeds: np.ndarray) -> TreeArrays:
+    """Uma árvore da floresta: seeds = (semente do sorteio de atributos, do bootstrap)."""
+    state = _STATE
+    assert state is not None
+    rows = _bootstrap_rows(int(seeds[1]), state["shape"][0], state["bootstrap"])
+    model = state["cls"](
+        state["target"],
+        max_features=state["max_features"],
+        random_state=int(seeds[0]),
+        **state["params"],
+    )
+    model.fit(_frame(state, rows), list(state["features"]))
+    return model.compile()
+
+
+# ---------------------------
+# Floresta
+# ---------------------------
+
+
+class RandomForest:
+    """Floresta aleatória de ID3DecisionTree, C45DecisionTree ou CARTDecisionTree.
+
+    estimator: a classe da árvore; `params` vão para o construtor de cada árvore (ex.:
+    engine="codes" no ID3, splitter="hist" no CART). n_jobs: processos do pool (None =
+    todos os núcleos; 1 = em série, sem pool). Com oob_score=True, `oob_score_` guarda a
+    acurácia out-of-bag (cada linha avaliada só pelas árvores que não a sortearam).
+    """
+
+    def __init__(
+        self,
+        estimator: type,
+        target: str,
+        n_estimators: int = 100,
+        max_features: Any = "sqrt",
+        bootstrap: bool = True,
+        oob_score: bool = False,
+        n_jobs: Optional[int] = None,
+        random_state: int = 0,
+        **params: Any,
+    ):
+        if n_estimators < 1:
+            raise ValueError(f"n_estimators deve ser >= 1: {n_estimators!r}")
+        if oob_score and not bootstrap:
+            raise ValueError("oob_score exige bootstrap=True")
+        if max_features is not None:
+            FeatureSampler(max_features)
+        self.estimator = estimator
+        self.target = target
+        self.n_estimators = n_estimators
+        self.max_features = max_features
+        self.bootstrap = bootstrap
+        self.oob_score = oob_score
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.params = params
+        self.features: List[str] = []
+        self.estimators_: List[TreeArrays] = []
+        self.classes_: np.ndarray = np.empty(0, dtype=object)
+        self.categories_: List[np.ndarray] = []
+        self.numeric_: np.ndarray = np.empty(0, dtype=bool)
+        # sementes (atributos, bootstrap) de cada árvore, para refazer as amostras
+        self.seeds_: np.ndarray = np.empty((0, 2), dtype=np.int64)
+        self.oob_score_: Optional[float] = None
+
+    def _spec(self, df: pd.DataFrame) -> Tuple[Dict[str, Any], np.ndarray]:
+        """Dicionários da tabela codificada (sem a matriz) e a própria matriz."""
+        n, m = len(df), len(self.features)
+        X = np.empty((n, m + 1), dtype=np.float64)
+        values: List[Optional[np.ndarray]] = []
+        dtypes: List[Any] = []
+        for j, attr in enumerate(self.features):
+            col = df[attr]
+            dtypes.append(col.dtype)
+            if pd.api.types.is_numeric_dtype(col):
+                X[:, j] = col.to_numpy(dtype=np.float64, na_value=np.nan)
+                values.append(None)
+            else:
+                codes, uniques = pd.factorize(col)
+                X[:, j] = codes
+                values.append(np.append(np.asarray(uniques, dtype=object), np.nan))
+        y_codes, classes = pd.factorize(df[self.target])
+        X[:, m] = y_codes
+        cls = self.estimator
+        module = sys.modules.get(cls.__module__)
+        spec = {
+            "shape": X.shape,
+            "features": self.features,
+            "values": values,
+            "dtypes": dtypes,
+            "target": self.target,
+            "classes": np.asarray(classes, dtype=object),
+            "bootstrap": self.bootstrap,
+            "max_features": self.max_features,
+            "params": self.params,
+            "estimator": (
+                cls.__module__,
+                getattr(module, "__file__", None),
+                cls.__qualname__,
+            ),
+        }
+        return spec, X
+
+    def fit(self, df: pd.DataFrame, features: List[str]) -> "RandomForest":
+        global _STATE
+        if not len(df):
+            raise ValueError("fit exige ao menos uma linha")
+        self.features = list(features)
+        seq = np.random.default_rng(self.random_state)
+        self.seeds_ = seq.integers(0, 2**31 - 1, size=(self.n_estimators, 2))
+        spec, X = self._spec(df)
+        workers = min(self.n_estimators, self.n_jobs or os.cpu_count() or 1)
+        if workers > 1:
+            trees = self._fit_pool(spec, X, workers)
+        else:
+            _STATE = dict(spec, X=X, cls=self.estimator)
+            try:
+                trees = [_fit_tree(s) for s in self.seeds_]
+            finally:
+                _STATE = None
+        self._align(trees)
+        if self.oob_score:
+            self.oob_score_ = self._oob(df)
+        return self
+
+    def _fit_pool(
+        self, spec: Dict[str, Any], X: np.ndarray, workers: int
+    ) -> List[TreeArrays]:
+        shm = shared_memory.SharedMemory(create=True, size=max(1, X.nbytes))
+        try:
+            np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)[:] = X
+            del X
+            spec = dict(spec, shm=shm.name)
+            chunk = max(1, self.n_estimators // (workers * 4))
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(spec,)
+            ) as pool:
+                return list(pool.map(_fit_tree, self.seeds_, chunksize=chunk))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _align(self, trees: Sequence[TreeArrays]) -> None:
+        """Recodifica todas as árvores para a união das categorias e classes."""
+        m = len(self.features)
+        self.categories_ = [
+            np.asarray(
+                _sorted_values({v for t in trees for v in t.categories[j]}), dtype=object
+            )
+            for j in range(m)
+        ]
+        self.numeric_ = np.array(
+            [any(t.numeric[j] for t in trees) for j in range(m)], dtype=bool
+        )
+        self.classes_ = np.asarray(
+            _sorted_values({c for t in trees for c in t.classes}), dtype=object
+        )
+        self.estimators_ = [
+            t.recode(self.categories_, self.classes_, self.numeric_) for t in trees
+        ]
+
+    def _encode(self, df: pd.DataFrame) -> np.ndarray:
+        return encode_matrix(df, self.features, self.categories_, self.numeric_)
+
+    def _oob(self, df: pd.DataFrame) -> Optional[float]:
+        n = len(df)
+        X = self._encode(df)
+        votes = np.zeros((n, len(self.classes_)))
+        for t, seeds in zip(self.estimators_, self.seeds_):
+            oob = np.ones(n, dtype=bool)
+            oob[_bootstrap_rows(int(seeds[1]), n, True)] = False
+            votes[oob] += t.predict_proba(X[oob])
+        seen = votes.sum(axis=1) > 0
+        if not seen.any():
+            return None
+        pred = self.classes_[votes[seen].argmax(axis=1)].astype(str)
+        y = df[self.target].astype(str).to_numpy()[seen]
+        return float(np.mean(pred == y))
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """Média das distribuições das folhas (colunas na ordem de `classes_`)."""
+        X = self._encode(df)
+        proba = np.zeros((len(df), len(self.classes_)))
+        for t in self.estimators_:
+            proba += t.predict_proba(X)
+        return proba / len(self.estimators_)
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        return self.classes_[self.predict_proba(df).argmax(axis=1)]
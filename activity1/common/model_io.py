@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .tree import TreeArrays
+
+# Formato binário das árvores treinadas (um arquivo, mapeável em memória):
+#
+#   MAGIC (8 bytes) | versão (uint32 LE) | tamanho do cabeçalho (uint32 LE) |
+#   cabeçalho JSON (UTF-8) | vetores brutos, cada um alinhado em ALIGN bytes
+#
+# O cabeçalho guarda os metadados do modelo (algoritmo, alvo, parâmetros), atributos,
+# classes, dicionários de categorias e, para cada vetor, dtype, shape e offset no
+# arquivo. load_tree abre os vetores com np.memmap: nada é copiado nem interpretado, e
+# processos que carregam o mesmo arquivo compartilham as páginas do cache do sistema.
+
+MAGIC = b"CCIATREE"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+_ARRAYS = (
+    "feature",
+    "kind",
+    "threshold",
+    "split_code",
+    "child_offset",
+    "n_children",
+    "child_table",
+    "member",
+    "value",
+    "count_order",
+    "node_class",
+    "depth",
+    "samples",
+    "impurity",
+)
+
+
+def _plain(v: Any) -> Any:
+    """Escalar NumPy -> tipo Python (para o JSON)."""
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def _json_list(values) -> List[Any]:
+    out = [_plain(v) for v in values]
+    for v in out:
+        if not isinstance(v, (str, int, float, bool)):
+            raise ValueError(f"valor não serializável no modelo: {v!r}")
+    return out
+
+
+def save_tree(tree: TreeArrays, path: str, meta: Dict[str, Any]) -> None:
+    """Grava a árvore em `path`; `meta` (JSON) deve ter ao menos "algorithm"."""
+    arrays = {name: np.ascontiguousarray(getattr(tree, name)) for name in _ARRAYS}
+    for name, col in tree.stats.items():
+        arrays[f"stats.{name}"] = np.ascontiguousarray(col)
+
+    layout: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for name, a in arrays.items():
+        offset = -(-offset // ALIGN) * ALIGN
+        layout[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset += a.nbytes
+
+    header = {
+        "meta": meta,
+        "features": list(tree.features),
+        "classes": _json_list(tree.classes),
+        "categories": [_json_list(c) for c in tree.categories],
+        "numeric": [bool(b) for b in tree.numeric],
+        "binary_labels": list(tree.binary_labels),
+        "arrays": layout,
+    }
+    raw = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    start = -(-(len(MAGIC) + 8 + len(raw)) // ALIGN) * ALIGN
+    raw += b" " * (start - len(MAGIC) - 8 - len(raw))
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array([FORMAT_VERSION, len(raw)], dtype="<u4").tobytes())
+        f.write(raw)
+        for name, a in arrays.items():
+            f.seek(start + layout[name]["offset"])
+            f.write(a.tobytes())
+        f.truncate(start + offset)
+
+
+def read_header(path: str) -> Tuple[Dict[str, Any], int]:
+    """(cabeçalho, início da área de vetores) de um arquivo de modelo."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: não é um arquivo de modelo de árvore")
+        version, size = np.frombuffer(f.read(8), dtype="<u4")
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                f"{path}: formato versão {version} (suportado até {FORMAT_VERSION})"
+            )
+        header = json.loads(f.read(int(size)).decode("utf-8"))
+    return header, len(MAGIC) + 8 + int(size)
+
+
+def load_tree(
+    path: str, mmap: bool = True, algorithm: Optional[str] = None
+) -> Tuple[TreeArrays, Dict[str, Any]]:
+    """Abre um modelo salvo por save_tree; devolve (árvore, metadados).
+
+    mmap=True mapeia os vetores (somente leitura); mmap=False lê cópias em memória.
+    Com `algorithm`, recusa (ValueError) modelos de outro algoritmo.
+    """
+    header, start = read_header(path)
+    found = header["meta"].get("algorithm")
+    if algorithm is not None and found != algorithm:
+        raise ValueError(f"{path}: modelo {found!r}, esperado {algorithm!r}")
+    arrays: Dict[str, np.ndarray] = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        count = int(np.prod(shape))
+        offset = start + spec["offset"]
+        if count == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+        elif mmap:
+            arrays[name] = np.memmap(
+                path, dtype=dtype, mode="r", offset=offset, shape=shape
+            )
+        else:
+            arrays[name] = np.fromfile(
+                path, dtype=dtype, count=count, offset=offset
+            ).reshape(shape)
+
+    tree = TreeArrays(
+        **{name: arrays[name] for name in _ARRAYS},
+        classes=np.asarray(header["classes"], dtype=object),
+        features=list(header["features"]),
+        categories=[np.asarray(c, dtype=object) for c in header["categories"]],
+        numeric=np.asarray(header["numeric"], dtype=bool),
+        stats={
+            name[len("stats.") :]: a
+            for name, a in arrays.items()
+            if name.startswith("stats.")
+        },
+        binary_labels=tuple(header["binary_labels"]),
+    )
+    return tree, header["meta"]
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Avaliação concorrente dos atributos candidatos de um nó (opcional; ID3/C4.5/CART).
+# Cada ponto de chamada declara o tipo do seu trabalho:
+# - "thread": núcleos NumPy sobre vetores grandes (argsort, cumsum, bincount) que
+#   liberam o GIL; as threads leem os mesmos vetores, sem cópia;
+# - "process": código preso ao GIL (groupby do pandas); os argumentos vão por pickle a
+#   cada tarefa, então a função precisa ser de nível de módulo.
+# Nós com menos de `min_rows` linhas, ou com um só candidato, ficam em série:
+# despachar as tarefas custaria mais que o cálculo. Os resultados voltam na ordem dos
+# candidatos e a escolha do split (desempates, trace, auditoria) continua em série, de
+# modo que a árvore é a mesma do fit serial.
+
+BACKENDS = ("auto", "thread", "process")
+# Linhas mínimas de um nó para avaliar os candidatos em paralelo
+MIN_ROWS = 20000
+
+
+def _call(task: Tuple[Callable[..., Any], Tuple]) -> Any:
+    fn, args = task
+    return fn(*args)
+
+
+def split_chunks(items: Sequence[Any], n: int) -> List[Sequence[Any]]:
+    """Divide `items` em até n fatias contíguas de tamanhos quase iguais."""
+    n = max(1, min(n, len(items)))
+    size, extra = divmod(len(items), n)
+    out = []
+    start = 0
+    for i in range(n):
+        stop = start + size + (i < extra)
+        out.append(items[start:stop])
+        start = stop
+    return out
+
+
+class NodeExecutor:
+    """Executor dos candidatos de um nó, passado às árvores no parâmetro `executor`.
+
+    n_jobs: trabalhadores (None = os.cpu_count()); backend: "auto" (o tipo declarado por
+    cada ponto de chamada), "thread" ou "process"; min_rows: tamanho mínimo do nó para
+    paralelizar. Os pools são criados na primeira tarefa e reaproveitados entre nós e
+    fits; close() (ou o bloco with) os encerra.
+    """
+
+    def __init__(
+        self,
+        n_jobs: Optional[int] = None,
+        backend: str = "auto",
+        min_rows: int = MIN_ROWS,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend inválido: {backend!r} (use um de {BACKENDS})")
+        if n_jobs is not None and n_jobs < 1:
+            raise ValueError(f"n_jobs deve ser >= 1: {n_jobs!r}")
+        if min_rows < 0:
+            raise ValueError(f"min_rows deve ser >= 0: {min_rows!r}")
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.min_rows = min_rows
+        self._pools: Dict[str, Executor] = {}
+
+    @property
+    def workers(self) -> int:
+        return self.n_jobs or os.cpu_count() or 1
+
+    def parallel(self, rows: int, n_tasks: int) -> bool:
+        """Se um nó com `rows` linhas e `n_tasks` tarefas vale a pena dividir."""
+        return self.workers > 1 and n_tasks > 1 and rows >= self.min_rows
+
+    def map(
+        self,
+        fn: Callable[..., Any],
+        tasks: Sequence[Tuple],
+        rows: int,
+        kind: str = "thread",
+    ) -> List[Any]:
+        """[fn(*args) for args in tasks], em paralelo se o nó passar do limiar."""
+        if not self.parallel(rows, len(tasks)):
+            return [fn(*args) for args in tasks]
+        pool = self._pool(kind if self.backend == "auto" else self.backend)
+        return list(pool.map(_call, [(fn, args) for args in tasks]))
+
+    def _pool(self, kind: str) -> Executor:
+        pool = self._pools.get(kind)
+        if pool is None:
+            cls = ThreadPoolExecutor if kind == "thread" else ProcessPoolExecutor
+            pool = self._pools[kind] = cls(max_workers=self.workers)
+        return pool
+
+    def close(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown()
+        self._pools.clear()
+
+    def __enter__(self) -> "NodeExecutor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # pools não vão por pickle (ex.: árvores enviadas aos processos da floresta)
+        state = self.__dict__.copy()
+        state["_pools"] = {}
+        return state
+
+
+def map_tasks(
+    executor: Optional[NodeExecutor],
+    fn: Callable[..., Any],
+    tasks: Sequence[Tuple],
+    rows: int,
+    kind: str = "thread",
+) -> List[Any]:
+    """executor.map, ou em série sem executor."""
+    if executor is None:
+        return [fn(*args) for args in tasks]
+    return executor.map(fn, tasks, rows, kind)
+
+
+def is_parallel(executor: Optional[NodeExecutor], rows: int, n_tasks: int) -> bool:
+    return executor is not None and executor.parallel(rows, n_tasks)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from html import escape
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+from .traversal import iter_edges, iter_preorder, leaf_counts, subtree_positions
+
+# Desenho das árvores (ID3, C4.5 e CART) a partir de um layout calculado uma vez:
+# larguras das subárvores em uma passada pós-ordem (leaf_counts), posições em uma
+# pré-ordem (subtree_positions) e textos/segmentos guardados em listas e vetores.
+# - draw_png: todas as arestas em um único LineCollection (um artista só); os textos
+#   continuam um artista por nó, com a caixa arredondada, e a rasterização deles
+#   (FreeType, glifo a glifo) domina o tempo;
+# - write_svg: escreve o SVG direto no arquivo, linha a linha (arestas num único
+#   <path>), sem matplotlib — para árvores grandes demais para um PNG.
+
+# Maior dimensão (pixels) do PNG: o limite do Agg é 2^16, mas a codificação de uma
+# imagem desse tamanho sozinha leva vários segundos
+_MAX_PIXELS = 32768
+# Menor dpi aceito ao encolher árvores largas: abaixo disso o texto de 8 pt fica
+# ilegível (e, com poucos pixels por em, o FreeType recusa a fonte). Árvores que não
+# cabem em _MAX_PIXELS com este dpi (~540 folhas) levantam PngTooLargeError.
+_MIN_DPI = 50
+# Acima disso, margens fixas em vez de tight_layout (que desenha a figura uma vez a mais)
+_TIGHT_LAYOUT_MAX_NODES = 300
+_LEAF_COLOR = "#E8F5E9"
+_BORDER_COLOR = "#90A4AE"
+
+
+class PngTooLargeError(ValueError):
+    """A árvore não cabe num PNG legível; use write_svg (plot_svg das árvores)."""
+
+
+@dataclass
+class TreeDrawing:
+    """Layout pronto para desenhar: nós em pré-ordem e arestas em iter_edges."""
+
+    xy: np.ndarray  # (nós, 2)
+    texts: List[str]
+    leaf: np.ndarray  # (nós,) bool
+    edges: np.ndarray  # (arestas, 2): índices (pai, filho) em xy
+    edge_texts: List[str]
+    width: int  # folhas da árvore
+    depth: int
+    y_gap: float
+
+
+def layout_tree(
+    root: Any,
+    annotate: Callable[[Any], str],
+    edge_label: Callable[[Any, Any], str],
+    y_gap: float = 1.5,
+) -> TreeDrawing:
+    """annotate(nó) -> texto da caixa; edge_label(pai, chave) -> rótulo da aresta."""
+    widths = leaf_counts(root)
+    positions = subtree_positions(root, x_gap=1.0, y_gap=y_gap, widths=widths)
+    nodes = list(iter_preorder(root))
+    index = {id(n): i for i, n in enumerate(nodes)}
+    edges = []
+    edge_texts = []
+    for parent, key, ch in iter_edges(root):
+        edges.append((index[id(parent)], index[id(ch)]))
+        edge_texts.append(edge_label(parent, key))
+    return TreeDrawing(
+        xy=np.array([positions[id(n)] for n in nodes], dtype=np.float64),
+        texts=[annotate(n) for n in nodes],
+        leaf=np.array([n.is_leaf() for n in nodes], dtype=bool),
+        edges=np.array(edges, dtype=np.int64).reshape(-1, 2),
+        edge_texts=edge_texts,
+        width=widths[id(root)],
+        depth=max(n.depth for n in nodes),
+        y_gap=y_gap,
+    )
+
+
+def draw_png(
+    d: TreeDrawing,
+    out_path: str,
+    internal_color: str,
+    edge_color: Optional[str] = "#555",
+    dpi: int = 160,
+) -> None:
+    """PNG da árvore; edge_color=None alterna as cores do ciclo padrão por aresta.
+
+    Levanta PngTooLargeError (antes de desenhar) se a árvore não couber em _MAX_PIXELS
+    com pelo menos _MIN_DPI.
+    """
+    fig_h = max(3, (d.depth + 1) * 1.8)
+    fig_w = max(6, d.width * 1.2)
+    # árvores largas: reduz o dpi para caber no limite do backend
+    dpi = min(dpi, int(_MAX_PIXELS / max(fig_w, fig_h)))
+    if dpi < _MIN_DPI:
+        raise PngTooLargeError(
+            f"árvore grande demais para PNG ({len(d.texts)} nós, {d.width} folhas); "
+            "use o SVG"
+        )
+
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    fig, ax = plt.subplots(figsize=(fig_w, fig_h))
+    ax.axis("off")
+
+    # segmentos da base do pai ao topo do filho
+    segments = d.xy[d.edges]
+    segments[:, 0, 1] -= 0.1
+    segments[:, 1, 1] += 0.1
+    if edge_color is None:
+        colors = [c["color"] for c in plt.rcParams["axes.prop_cycle"]]
+    else:
+        colors = [edge_color]
+    ax.add_collection(LineCollection(segments, colors=colors, linewidths=1))
+    if not len(segments):
+        ax.update_datalim(d.xy)
+    ax.autoscale_view()
+    mids = segments.mean(axis=1)
+    label_box = dict(fc="white", ec="none", alpha=0.7)
+    for (mx, my), text in zip(mids, d.edge_texts):
+        ax.text(mx, my, text, fontsize=8, ha="center", va="center", bbox=label_box)
+
+    boxes = [
+        dict(boxstyle="round,pad=0.3", fc=c, ec=_BORDER_COLOR)
+        for c in (internal_color, _LEAF_COLOR)
+    ]
+    for (x, y), text, is_leaf in zip(d.xy, d.texts, d.leaf):
+        ax.text(
+            x, y, text, fontsize=8, ha="center", va="center", bbox=boxes[int(is_leaf)]
+        )
+    if len(d.texts) <= _TIGHT_LAYOUT_MAX_NODES:
+        plt.tight_layout()
+    else:
+        fig.subplots_adjust(left=0.01, right=0.99, bottom=0.01, top=0.99)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    fig.savefig(out_path, dpi=dpi)
+    plt.close(fig)
+
+
+def write_svg(
+    d: TreeDrawing,
+    out_path: str,
+    internal_color: str,
+    edge_color: Optional[str] = "#555",
+    font_size: float = 10.0,
+) -> None:
+    """SVG escrito em streaming; a largura das caixas vem do maior texto da árvore."""
+    char_w, line_h, pad = 0.6 * font_size, 1.25 * font_size, 6.0
+    lines = [t.split("\n") for t in d.texts]
+    box_w = max(max(len(s) for s in ls) for ls in lines) * char_w + 2 * pad
+    box_h = np.array([len(ls) for ls in lines]) * line_h + 2 * pad
+    # coordenadas em pixels: uma folha por coluna, um nível por linha
+    cx = (d.xy[:, 0] - d.xy[:, 0].min()) * (box_w + 20.0) + box_w / 2 + 10
+    cy = -d.xy[:, 1] / d.y_gap * (box_h.max() + 50.0) + box_h.max() / 2 + 10
+    total_w = cx.max() + box_w / 2 + 10
+    total_h = cy.max() + box_h.max() / 2 + 10
+    p, c = d.edges[:, 0], d.edges[:, 1]
+    x0, y0 = cx[p], cy[p] + box_h[p] / 2
+    x1, y1 = cx[c], cy[c] - box_h[c] / 2
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{total_w:.0f}" '
+            f'height="{total_h:.0f}" font-family="monospace" font-size="{font_size:g}">\n'
+        )
+        # todas as arestas num único <path>
+        f.write(f'<path fill="none" stroke="{edge_color or "#555"}" d="')
+        for e in range(len(p)):
+            f.write(f"M{x0[e]:.1f} {y0[e]:.1f}L{x1[e]:.1f} {y1[e]:.1f}")
+        f.write('"/>\n')
+        for e, text in enumerate(d.edge_texts):
+            f.write(
+                f'<text x="{(x0[e] + x1[e]) / 2:.1f}" y="{(y0[e] + y1[e]) / 2:.1f}" '
+                'text-anchor="middle" paint-order="stroke" stroke="white" '
+                f'stroke-width="3">{escape(text)}</text>\n'
+            )
+        fills = (internal_color, _LEAF_COLOR)
+        for i, ls in enumerate(lines):
+            top = cy[i] - box_h[i] / 2
+            f.write(
+                f'<g><rect x="{cx[i] - box_w / 2:.1f}" y="{top:.1f}" '
+                f'width="{box_w:.1f}" height="{box_h[i]:.1f}" rx="5" '
+                f'fill="{fills[int(d.leaf[i])]}" stroke="{_BORDER_COLOR}"/>'
+                f'<text y="{top + pad + font_size:.1f}" text-anchor="middle">'
+            )
+            for k, s in enumerate(ls):
+                dy = "0" if k == 0 else f"{line_h:.1f}"
+                f.write(f'<tspan x="{cx[i]:.1f}" dy="{dy}">{escape(s)}</tspan>')
+            f.write("</text></g>\n")
+        f.write("</svg>\n")
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import bitset
+
+# Índice de uma base de regras SE-ENTÃO (extract_rules / simplify_rules) para pontuação
+# em lote. As regras viram bits de bitsets (common.bitset) e, por atributo:
+# - condições de igualdade ("=", "!=", "∈", "∉") viram uma tabela valor -> regras
+#   compatíveis com o valor (as que o exigem, mais as que não restringem o atributo,
+#   menos as que o proíbem);
+# - condições numéricas ("<=", ">") viram intervalos (lo, hi] por regra; os limiares
+#   ordenados dividem a reta em faixas elementares, cada uma com o bitset das regras
+#   cujo intervalo a contém.
+# Pontuar um lote = para cada atributo indexado, localizar a chave/faixa de cada linha
+# (get_indexer / searchsorted) e fazer AND dos bitsets; vale a primeira regra que
+# sobrar (regras em ordem, como no C4.5rules). Valor ausente ou desconhecido só
+# satisfaz as condições de negação ("!=", "∉"), como na descida da árvore do CART.
+# As linhas são pontuadas em blocos de ~_BLOCK_BYTES de bitsets, com o número de linhas
+# do bloco derivado do número de regras: o AND é feito no lugar, em dois buffers
+# reaproveitados entre atributos e blocos, que cabem no cache.
+
+_EQ_OPS = ("=", "!=", "∈", "∉")
+_NUM_OPS = ("<=", ">")
+_BLOCK_BYTES = 1 << 21
+
+
+class _Constraint:
+    """Restrições de uma regra sobre um atributo."""
+
+    __slots__ = ("allowed", "forbidden", "lo", "hi")
+
+    def __init__(self):
+        self.allowed: Optional[Set[Any]] = None
+        self.forbidden: Set[Any] = set()
+        self.lo = -np.inf
+        self.hi = np.inf
+
+    def add(self, op: str, value: Any) -> None:
+        if op == "=":
+            self._allow({value})
+        elif op == "∈":
+            self._allow(set(value))
+        elif op == "!=":
+            self.forbidden.add(value)
+        elif op == "∉":
+            self.forbidden.update(value)
+        elif op == "<=":
+            self.hi = min(self.hi, float(value))
+        else:
+            self.lo = max(self.lo, float(value))
+
+    def _allow(self, values: Set[Any]) -> None:
+        self.allowed = values if self.allowed is None else self.allowed & values
+
+    @property
+    def categorical(self) -> bool:
+        return self.allowed is not None or bool(self.forbidden)
+
+    @property
+    def numeric(self) -> bool:
+        return self.lo > -np.inf or self.hi < np.inf
+
+
+class RuleIndex:
+    """Base de regras indexada; `rules` no formato de extract_rules (conditions,
+    predicted_class, ...). `default` é a classe das linhas que nenhuma regra cobre."""
+
+    def __init__(self, rules: Sequence[Dict[str, Any]], default: Any = None):
+        self.rules = list(rules)
+        self.default = default
+        self.classes = np.asarray(
+            [r.get("predicted_class") for r in self.rules] + [default], dtype=object
+        )
+        n = len(self.rules)
+        per_attr: Dict[str, Dict[int, _Constraint]] = {}
+        for i, r in enumerate(self.rules):
+            for attr, op, value in r.get("conditions", []):
+                if op not in _EQ_OPS + _NUM_OPS:
+                    raise ValueError(f"operador de condição não suportado: {op!r}")
+                per_attr.setdefault(attr, {}).setdefault(i, _Constraint()).add(op, value)
+
+        # (atributo, chaves, tabela) e (atributo, limiares, tabela); a última linha de
+        # cada tabela vale para valores ausentes/desconhecidos (índice -1)
+        self._eq: List[Tuple[str, pd.Index, np.ndarray]] = []
+        self._num: List[Tuple[str, np.ndarray, np.ndarray]] = []
+        for attr, cons in per_attr.items():
+            cat = {i: c for i, c in cons.items() if c.categorical}
+            if cat:
+                self._eq.append((attr, *self._eq_table(cat, n)))
+            num = {i: c for i, c in cons.items() if c.numeric}
+            if num:
+                self._num.append((attr, *self._num_table(num, n)))
+
+    @staticmethod
+    def _eq_table(cons: Dict[int, _Constraint], n: int) -> Tuple[pd.Index, np.ndarray]:
+        keys: List[Any] = []
+        seen: Set[Any] = set()
+        for c in cons.values():
+            for v in (c.allowed or set()) | c.forbidden:
+                if v not in seen:
+                    seen.add(v)
+                    keys.append(v)
+        code = {v: k for k, v in enumerate(keys)}
+        mask = np.ones((len(keys) + 1, n), dtype=bool)
+        for i, c in cons.items():
+            if c.allowed is not None:
+                mask[:, i] = False
+                mask[[code[v] for v in c.allowed], i] = True
+            mask[[code[v] for v in c.forbidden], i] = False
+        return pd.Index(keys, dtype=object), bitset.pack_rows(mask)
+
+    @staticmethod
+    def _num_table(
+        cons: Dict[int, _Constraint], n: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        bounds = np.unique(
+            [b for c in cons.values() for b in (c.lo, c.hi) if np.isfinite(b)]
+        )
+        rules = np.fromiter(cons, dtype=np.int64, count=len(cons))
+        lo = np.array([c.lo for c in cons.values()])
+        hi = np.array([c.hi for c in cons.values()])
+        # faixa s = valores em (bounds[s-1], bounds[s]]; a regra cobre s se
+        # lo <= bounds[s-1] e hi >= bounds[s]
+        lo_idx = np.where(np.isfinite(lo), np.searchsorted(bounds, lo), -1)
+        hi_idx = np.where(np.isfinite(hi), np.searchsorted(bounds, hi), len(bounds))
+        s = np.arange(len(bounds) + 1)[:, None]
+        mask = np.ones((len(bounds) + 2, n), dtype=bool)
+        mask[:-1, rules] = (s > lo_idx) & (s <= hi_idx)
+        mask[-1, rules] = False
+        return bounds, bitset.pack_rows(mask)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(t.nbytes for _, _, t in self._eq) + sum(
+            b.nbytes + t.nbytes for _, b, t in self._num
+        )
+
+    def match(self, df: pd.DataFrame) -> np.ndarray:
+        """Índice da primeira regra que cobre cada linha (-1 = nenhuma)."""
+        lookups = []
+        for attr, keys, table in self._eq:
+            lookups.append((keys.get_indexer(df[attr].to_numpy(dtype=object)), table))
+        for attr, bounds, table in self._num:
+            x = pd.to_numeric(df[attr], errors="coerce").to_numpy(
+                dtype=np.float64, na_value=np.nan
+            )
+            idx = np.searchsorted(bounds, x, side="left")
+            lookups.append((np.where(np.isnan(x), -1, idx), table))
+        out = np.full(len(df), -1, dtype=np.int64)
+        if not self.rules:
+            return out
+        every = bitset.full(len(self.rules))
+        if not lookups:
+            out[:] = bitset.first_set(every[None, :])[0]
+            return out
+        block = max(1, _BLOCK_BYTES // every.nbytes)
+        cand = np.empty((min(block, len(df)), len(every)), dtype=every.dtype)
+        tmp = np.empty_like(cand)
+        for start in range(0, len(df), block):
+            stop = min(start + block, len(df))
+            c, t = cand[: stop - start], tmp[: stop - start]
+            # mode="wrap": o índice -1 (ausente/desconhecido) é a última linha da tabela
+            idx, table = lookups[0]
+            np.take(table, idx[start:stop], axis=0, out=c, mode="wrap")
+            for idx, table in lookups[1:]:
+                np.take(table, idx[start:stop], axis=0, out=t, mode="wrap")
+                np.bitwise_and(c, t, out=c)
+            out[start:stop] = bitset.first_set(c)
+        return out
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """Classe da primeira regra que cobre cada linha (`default` se nenhuma)."""
+        return self.classes[self.match(df)]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import sys
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+# Formatadores do renderizador de terminal: tipo de evento -> função(campos) -> texto
+Formats = Dict[str, Callable[[Dict[str, Any]], str]]
+
+
+class NullTrace:
+    """Trace desligado. Os builders testam `trace.enabled` antes de montar qualquer
+    registro, então um fit sem trace não formata nem aloca nada."""
+
+    enabled = False
+
+    def emit(self, kind: str, **fields: Any) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+NULL_TRACE = NullTrace()
+
+
+class TerminalTrace:
+    """Renderiza eventos no terminal (saída didática dos scripts).
+
+    Cada algoritmo fornece seus próprios formatadores; eventos sem formatador são ignorados.
+    """
+
+    enabled = True
+
+    def __init__(self, formats: Formats, stream: Optional[TextIO] = None):
+        self.formats = formats
+        self.stream = stream
+
+    def emit(self, kind: str, **fields: Any) -> None:
+        fmt = self.formats.get(kind)
+        if fmt is not None:
+            print(fmt(fields), file=self.stream or sys.stdout)
+
+    def close(self) -> None:
+        pass
+
+
+def _jsonable(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {str(k): _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, (str, int, float, bool)) or obj is None:
+        return obj
+    if hasattr(obj, "item"):
+        # escalares numpy
+        return obj.item()
+    return str(obj)
+
+
+class JsonlTrace:
+    """Acumula registros compactos em memória e grava em lotes, um JSON por linha.
+
+    Cada linha tem o campo "kind" (tipo do evento) e os campos do evento, sem formatação.
+    """
+
+    enabled = True
+
+    def __init__(self, path_or_file: Any, buffer_size: int = 4096):
+        if isinstance(path_or_file, str):
+            self._fh: TextIO = open(path_or_file, "w", encoding="utf-8")
+            self._owns = True
+        else:
+            self._fh = path_or_file
+            self._owns = False
+        self.buffer_size = buffer_size
+        self._buf: List[Tuple[str, Dict[str, Any]]] = []
+
+    def emit(self, kind: str, **fields: Any) -> None:
+        self._buf.append((kind, fields))
+        if len(self._buf) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buf:
+            return
+        self._fh.write(
+            "".join(
+                json.dumps({"kind": k, **_jsonable(f)}, ensure_ascii=False) + "\n"
+                for k, f in self._buf
+            )
+        )
+        self._buf.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self._owns:
+            self._fh.close()
+
+    def __enter__(self) -> "JsonlTrace":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def make_trace(formats: Formats, quiet: bool = False, jsonl_path: Optional[str] = None):
+    """Escolhe o sink a partir das opções de linha de comando dos scripts."""
+    if jsonl_path:
+        return JsonlTrace(jsonl_path)
+    if quiet:
+        return NULL_TRACE
+    return TerminalTrace(formats)
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import heapq
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# edges(nó) -> [(rótulo_da_aresta, filho), ...] na ordem de exibição
+Edges = Callable[[Any], Iterable[Tuple[Any, Any]]]
+
+ORDERS = ("depth", "breadth")
+
+
+def node_edges(node: Any) -> Iterable[Tuple[Any, Any]]:
+    """Arestas padrão: os nós das árvores expõem `edges()`."""
+    return node.edges()
+
+
+def node_is_leaf(node: Any) -> bool:
+    return node.is_leaf()
+
+
+# ---------------------------
+# Construção por fila de trabalho
+# ---------------------------
+
+
+class WorkList:
+    """Fila de nós pendentes de expansão.
+
+    - "depth": pilha explícita; filhos empilhados em ordem reversa, de modo que a expansão
+      segue a mesma pré-ordem da recursão (logs idênticos);
+    - "breadth": fila FIFO; expande a árvore nível a nível.
+    """
+
+    def __init__(self, order: str = "depth"):
+        if order not in ORDERS:
+            raise ValueError(f"order inválido: {order!r} (use um de {list(ORDERS)})")
+        self.order = order
+        self._items: Any = [] if order == "depth" else deque()
+
+    def push(self, item: Any) -> None:
+        self._items.append(item)
+
+    def push_children(self, items: List[Any]) -> None:
+        if self.order == "depth":
+            self._items.extend(reversed(items))
+        else:
+            self._items.extend(items)
+
+    def pop(self) -> Any:
+        if self.order == "depth":
+            return self._items.pop()
+        return self._items.popleft()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def grow(
+    root_task: Any,
+    expand: Callable[[Any], Tuple[Any, List[Tuple[Any, Any]]]],
+    attach: Callable[[Any, Any, Any], None],
+    order: str = "depth",
+) -> Any:
+    """Constrói uma árvore sem recursão.
+
+    expand(tarefa) -> (nó, [(chave, tarefa_filho), ...]) cria o nó e devolve as tarefas dos
+    filhos; attach(pai, chave, filho) liga o filho já criado ao pai. Os filhos de um mesmo
+    pai são sempre ligados na ordem em que foram devolvidos.
+    """
+    work = WorkList(order)
+    work.push((None, None, root_task))
+    root = None
+    while work:
+        parent, key, task = work.pop()
+        node, child_tasks = expand(task)
+        if parent is None:
+            root = node
+        else:
+            attach(parent, key, node)
+        if child_tasks:
+            work.push_children([(node, k, t) for k, t in child_tasks])
+    return root
+
+
+def grow_best_first(
+    root_task: Any,
+    expand: Callable[[Any], Tuple[Any, List[Tuple[Any, Any]]]],
+    attach: Callable[[Any, Any, Any], None],
+    priority: Callable[[Any], float],
+    max_leaves: Optional[int] = None,
+    min_priority: float = 0.0,
+    time_budget: Optional[float] = None,
+) -> Tuple[Any, List[Any], Optional[str]]:
+    """Constrói uma árvore expandindo sempre a folha de maior `priority(nó)`.
+
+    Como em `grow`, expand(tarefa) cria o nó e devolve as tarefas dos filhos, mas os
+    filhos só são criados quando o nó sai do heap. Para ao atingir `max_leaves` folhas,
+    quando a melhor prioridade restante é < `min_priority` ou após `time_budget`
+    segundos. Devolve (raiz, nós com filhos pendentes — o chamador decide como
+    transformá-los em folhas —, motivo da parada ou None se a árvore ficou completa).
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    heap: List[Tuple[float, int, Any, List[Tuple[Any, Any]]]] = []
+    counter = 0
+
+    def push(node: Any, child_tasks: List[Tuple[Any, Any]]) -> None:
+        nonlocal counter
+        if child_tasks:
+            heapq.heappush(heap, (-priority(node), counter, node, child_tasks))
+            counter += 1
+
+    root, child_tasks = expand(root_task)
+    push(root, child_tasks)
+    leaves = 1
+    stop = None
+    while heap:
+        if max_leaves is not None and leaves >= max_leaves:
+            stop = "max_leaves"
+            break
+        if -heap[0][0] < min_priority:
+            stop = "min_impurity_decrease"
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            stop = "time_budget"
+            break
+        _, _, node, child_tasks = heapq.heappop(heap)
+        for key, task in child_tasks:
+            child, grandchildren = expand(task)
+            attach(node, key, child)
+            push(child, grandchildren)
+        leaves += len(child_tasks) - 1
+    return root, [item[2] for item in heap], stop
+
+
+# ---------------------------
+# Percursos iterativos
+# ---------------------------
+
+
+def iter_preorder(root: Any, edges: Edges = node_edges) -> Iterator[Any]:
+    stack = [root]
+    while stack:
+        n = stack.pop()
+        yield n
+        stack.extend(reversed([ch for _, ch in edges(n)]))
+
+
+def iter_postorder(root: Any, edges: Edges = node_edges) -> Iterator[Any]:
+    stack: List[Tuple[Any, bool]] = [(root, False)]
+    while stack:
+        n, done = stack.pop()
+        if done:
+            yield n
+            continue
+        stack.append((n, True))
+        stack.extend((ch, False) for _, ch in reversed(list(edges(n))))
+
+
+def iter_levels(root: Any, edges: Edges = node_edges) -> Iterator[List[Any]]:
+    """Percorre a árvore nível a nível, devolvendo a lista de nós de cada nível."""
+    level = [root]
+    while level:
+        yield level
+        level = [ch for n in level for _, ch in edges(n)]
+
+
+def iter_edges(
+    root: Any, edges: Edges = node_edges
+) -> Iterator[Tuple[Any, Any, Any]]:
+    """(pai, rótulo, filho) em pré-ordem dos filhos."""
+    stack: List[Tuple[Any, Any, Any]] = [
+        (root, lbl, ch) for lbl, ch in reversed(list(edges(root)))
+    ]
+    while stack:
+        parent, lbl, ch = stack.pop()
+        yield parent, lbl, ch
+        stack.extend((ch, l2, c2) for l2, c2 in reversed(list(edges(ch))))
+
+
+def walk_dfs(root: Any, edges: Edges = node_edges) -> Iterator[Tuple]:
+    """Eventos de uma DFS: ("enter", nó) ao visitar e ("exit", pai, rótulo, filho) ao
+    terminar a subárvore de cada filho — a mesma sequência de uma função recursiva que
+    processa o nó, desce em cada filho e então trata a aresta."""
+    stack: List[Tuple] = [("enter", root)]
+    while stack:
+        ev = stack.pop()
+        yield ev
+        if ev[0] != "enter":
+            continue
+        n = ev[1]
+        for lbl, ch in reversed(list(edges(n))):
+            stack.append(("exit", n, lbl, ch))
+            stack.append(("enter", ch))
+
+
+def leaf_counts(root: Any, edges: Edges = node_edges) -> Dict[int, int]:
+    """Número de folhas de cada subárvore (chave: id(nó)) em uma única passada pós-ordem."""
+    counts: Dict[int, int] = {}
+    for n in iter_postorder(root, edges):
+        kids = [ch for _, ch in edges(n)]
+        counts[id(n)] = sum(counts[id(ch)] for ch in kids) if kids else 1
+    return counts
+
+
+def subtree_positions(
+    root: Any,
+    edges: Edges = node_edges,
+    x_gap: float = 1.0,
+    y_gap: float = 1.5,
+    widths: Optional[Dict[int, int]] = None,
+) -> Dict[int, Tuple[float, float]]:
+    """Posições (x, y) por id(nó): cada nó fica centrado sobre as folhas de sua subárvore.
+
+    Equivale ao antigo assign_pos recursivo, mas com as larguras calculadas uma só vez.
+    """
+    widths = widths if widths is not None else leaf_counts(root, edges)
+    positions: Dict[int, Tuple[float, float]] = {}
+    stack: List[Tuple[Any, int, float]] = [(root, 0, 0.0)]
+    while stack:
+        n, depth, x_start = stack.pop()
+        width = widths[id(n)]
+        positions[id(n)] = (x_start + (width - 1) * x_gap / 2.0, -depth * y_gap)
+        cur_x = x_start
+        for _, ch in edges(n):
+            stack.append((ch, depth + 1, cur_x))
+            cur_x += widths[id(ch)] * x_gap
+    return positions
+
+
+def iter_paths(
+    root: Any,
+    step: Callable[[Any, Any], Any],
+    edges: Edges = node_edges,
+    is_leaf: Callable[[Any], bool] = node_is_leaf,
+) -> Iterator[Tuple[List[Any], Any]]:
+    """(prefixo, folha) para cada caminho raiz→folha, em pré-ordem.
+
+    O prefixo é uma única lista [step(pai, rótulo), ...] compartilhada por todos os
+    caminhos: cada passo é empilhado ao descer e descartado ao subir, sem copiar o
+    caminho a cada nível. A lista só vale até o próximo item — copie se for guardá-la.
+    """
+    prefix: List[Any] = []
+    # (profundidade, passo do pai até o nó, nó)
+    stack: List[Tuple[int, Any, Any]] = [(0, None, root)]
+    while stack:
+        depth, s, n = stack.pop()
+        if depth:
+            del prefix[depth - 1 :]
+            prefix.append(s)
+        if is_leaf(n):
+            yield prefix, n
+            continue
+        stack.extend(
+            (depth + 1, step(n, lbl), ch) for lbl, ch in reversed(list(edges(n)))
+        )
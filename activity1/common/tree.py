@@ -0,0 +1,605 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .traversal import iter_preorder
+
+# Núcleo comum das árvores treinadas (ID3, C4.5 e CART): nós em vetores NumPy paralelos.
+#
+# Tipos de nó (kind):
+# - LEAF;
+# - MULTI: um ramo por categoria (ID3/C4.5); child_table[child_offset[i] + código];
+# - LE: x <= threshold vai para o 1º filho, x > threshold para o 2º (ausente para no nó);
+# - EQ: código == split_code vai para o 1º filho, o resto (inclusive ausente) para o 2º;
+# - IN: member[split_code + código] decide o 1º filho; o resto vai para o 2º.
+LEAF, MULTI, LE, EQ, IN = range(5)
+KIND_NAMES = ("leaf", "multi", "le", "eq", "in")
+
+
+def _sorted_values(values: set) -> List[Any]:
+    try:
+        return sorted(values)
+    except TypeError:  # tipos misturados
+        return sorted(values, key=lambda v: (type(v).__name__, str(v)))
+
+
+def encode_matrix(
+    df: pd.DataFrame,
+    features: Sequence[str],
+    categories: Sequence[np.ndarray],
+    numeric: np.ndarray,
+) -> np.ndarray:
+    """Matriz float das linhas de `df` no espaço de códigos de uma TreeArrays."""
+    X = np.empty((len(df), len(features)), dtype=np.float64)
+    for j, attr in enumerate(features):
+        if numeric[j]:
+            X[:, j] = pd.to_numeric(df[attr], errors="coerce").to_numpy(
+                dtype=np.float64, na_value=np.nan
+            )
+        else:
+            X[:, j] = pd.Categorical(df[attr], categories=categories[j]).codes
+    return X
+
+
+@dataclass
+class TreeArrays:
+    """Árvore treinada achatada em vetores NumPy.
+
+    Para o nó i:
+    - feature[i]: índice do atributo testado (-1 = folha); kind[i]: tipo do nó;
+    - threshold[i]: limiar (LE); split_code[i]: código da categoria (EQ) ou início do
+      subconjunto em `member` (IN);
+    - child_table[child_offset[i]:][:n_children[i]]: filhos (-1 = código sem ramo);
+    - value[i]: contagens por classe (ordem de `classes`); node_class[i]: classe prevista;
+    - count_order[i]: colunas de value[i] na ordem do class_counts do nó (-1 = sobra),
+      para que as vistas reproduzam os dicts originais, inclusive nos empates;
+    - depth[i], samples[i], impurity[i]: como nos nós do builder.
+
+    `categories[j]` lista as categorias do atributo j (vazia para atributos numéricos).
+    `stats` guarda colunas extras por nó vindas do builder (ex.: split_ig, split_gini;
+    NaN nas folhas). `binary_labels` são os rótulos das arestas dos splits binários
+    ("L"/"R" no CART; "<="/">" no C4.5). Para inspeção, `root` / `node(i)` devolvem
+    vistas leves (NodeView) com a mesma interface de leitura dos nós dos builders.
+    """
+
+    feature: np.ndarray
+    kind: np.ndarray
+    threshold: np.ndarray
+    split_code: np.ndarray
+    child_offset: np.ndarray
+    n_children: np.ndarray
+    child_table: np.ndarray
+    member: np.ndarray
+    value: np.ndarray
+    count_order: np.ndarray
+    node_class: np.ndarray
+    depth: np.ndarray
+    samples: np.ndarray
+    impurity: np.ndarray
+    classes: np.ndarray
+    features: List[str]
+    categories: List[np.ndarray]
+    numeric: np.ndarray
+    stats: Dict[str, np.ndarray] = field(default_factory=dict)
+    binary_labels: Tuple[str, str] = ("L", "R")
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (
+            self.feature,
+            self.kind,
+            self.threshold,
+            self.split_code,
+            self.child_offset,
+            self.n_children,
+            self.child_table,
+            self.member,
+            self.value,
+            self.count_order,
+            self.node_class,
+            self.depth,
+            self.samples,
+            self.impurity,
+            *self.stats.values(),
+        )
+        return sum(a.nbytes for a in arrays)
+
+    @property
+    def root(self) -> "NodeView":
+        return NodeView(self, 0)
+
+    def node(self, i: int) -> "NodeView":
+        return NodeView(self, i)
+
+    # -------------------
+    # Predição em lote
+    # -------------------
+    def encode(self, df: pd.DataFrame) -> np.ndarray:
+        """Matriz float: atributos numéricos como estão; categóricos como códigos das
+        categorias aprendidas (valores desconhecidos/ausentes viram -1)."""
+        return encode_matrix(df, self.features, self.categories, self.numeric)
+
+    def recode(
+        self,
+        categories: Sequence[np.ndarray],
+        classes: np.ndarray,
+        numeric: Optional[np.ndarray] = None,
+    ) -> "TreeArrays":
+        """A mesma árvore sobre outros dicionários de categorias e classes, que contêm
+        os desta: códigos, tabelas de filhos (MULTI), subconjuntos (IN) e colunas de
+        `value` são reindexados. Árvores recodificadas para os mesmos dicionários
+        aceitam a mesma matriz de encode e devolvem probabilidades nas mesmas colunas.
+        """
+        pos = []
+        for j, cats in enumerate(categories):
+            p = pd.Index(cats, dtype=object).get_indexer(self.categories[j])
+            if (p < 0).any():
+                raise ValueError(
+                    f"categorias de {self.features[j]!r} não contêm as da árvore"
+                )
+            pos.append(p)
+        cpos = pd.Index(classes, dtype=object).get_indexer(self.classes)
+        if (cpos < 0).any():
+            raise ValueError("classes não contêm as da árvore")
+
+        n = self.n_nodes
+        split_code = self.split_code.copy()
+        child_offset = np.zeros(n, dtype=np.int64)
+        n_children = self.n_children.copy()
+        table: List[np.ndarray] = []
+        member: List[np.ndarray] = []
+        size = msize = 0
+        for i in np.flatnonzero(self.kind != LEAF):
+            j = self.feature[i]
+            off = self.child_offset[i]
+            seg = self.child_table[off : off + self.n_children[i]]
+            child_offset[i] = size
+            if self.kind[i] == MULTI:
+                seg, old = np.full(len(categories[j]), -1, dtype=np.int64), seg
+                seg[pos[j]] = old
+                n_children[i] = len(seg)
+            elif self.kind[i] == EQ:
+                split_code[i] = pos[j][self.split_code[i]]
+            elif self.kind[i] == IN:
+                s = self.split_code[i]
+                inside = np.zeros(len(categories[j]), dtype=bool)
+                inside[pos[j]] = self.member[s : s + len(self.categories[j])]
+                member.append(inside)
+                split_code[i] = msize
+                msize += len(inside)
+            table.append(seg)
+            size += len(seg)
+
+        value = np.zeros((n, len(classes)), dtype=np.float64)
+        value[:, cpos] = self.value
+        count_order = np.full((n, len(classes)), -1, dtype=np.int16)
+        width = self.count_order.shape[1]
+        count_order[:, :width] = np.where(
+            self.count_order >= 0, cpos[self.count_order], -1
+        )
+        return replace(
+            self,
+            split_code=split_code,
+            child_offset=child_offset,
+            n_children=n_children,
+            child_table=np.concatenate(table) if table else np.zeros(0, np.int64),
+            member=np.concatenate(member) if member else np.zeros(0, bool),
+            value=value,
+            count_order=count_order,
+            node_class=cpos[self.node_class],
+            classes=np.asarray(classes, dtype=object),
+            categories=[np.asarray(c, dtype=object) for c in categories],
+            numeric=self.numeric if numeric is None else np.asarray(numeric, bool),
+        )
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Nó final de cada linha, descendo todas as linhas nível a nível.
+
+        Uma linha para no nó interno quando não há ramo para o seu valor (categoria sem
+        ramo ou numérico ausente); a predição usa então a distribuição desse nó.
+        """
+        n = X.shape[0]
+        node = np.zeros(n, dtype=np.int64)
+        active = np.arange(n)
+        while active.size:
+            nd = node[active]
+            kind = self.kind[nd]
+            internal = kind != LEAF
+            active, nd, kind = active[internal], nd[internal], kind[internal]
+            if not active.size:
+                break
+            x = X[active, self.feature[nd]]
+            nxt = np.full(active.size, -1, dtype=np.int64)
+            off = self.child_offset[nd]
+
+            m = kind == MULTI
+            codes = np.where(m & ~np.isnan(x), x, -1).astype(np.int64)
+            ok = m & (codes >= 0) & (codes < self.n_children[nd])
+            nxt[ok] = self.child_table[off[ok] + codes[ok]]
+
+            m = (kind == LE) & ~np.isnan(x)
+            side = (x[m] > self.threshold[nd[m]]).astype(np.int64)
+            nxt[m] = self.child_table[off[m] + side]
+
+            m = kind == EQ
+            side = (x[m] != self.split_code[nd[m]]).astype(np.int64)
+            nxt[m] = self.child_table[off[m] + side]
+
+            m = kind == IN
+            codes = np.where(np.isnan(x[m]), -1, x[m]).astype(np.int64)
+            inside = np.zeros(codes.size, dtype=bool)
+            known = codes >= 0
+            inside[known] = self.member[self.split_code[nd[m]][known] + codes[known]]
+            nxt[m] = self.child_table[off[m] + (~inside).astype(np.int64)]
+
+            moved = nxt >= 0
+            node[active[moved]] = nxt[moved]
+            active = active[moved]
+        return node
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        v = self.value[self.apply(X)]
+        tot = v.sum(axis=1, keepdims=True)
+        return np.divide(v, tot, out=np.zeros_like(v), where=tot > 0)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes[self.node_class[self.apply(X)]]
+
+
+class NodeView:
+    """Vista somente leitura do nó i de uma TreeArrays (sem dicts por nó).
+
+    Expõe os mesmos campos de leitura dos nós dos builders (depth, samples,
+    class_counts, gini/entropy, split_attr, split_type, split_value, predicted_class,
+    is_leaf(), edges(), children, left/right e as colunas de `stats`). class_counts é
+    montado na hora, na ordem guardada em count_order.
+    """
+
+    __slots__ = ("tree", "i")
+
+    def __init__(self, tree: TreeArrays, i: int):
+        self.tree = tree
+        self.i = i
+
+    def __repr__(self) -> str:
+        return f"NodeView({self.i}, {KIND_NAMES[self.tree.kind[self.i]]})"
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, NodeView) and other.tree is self.tree and other.i == self.i
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.i))
+
+    def __getattr__(self, name: str) -> Any:
+        stats = self.tree.stats
+        if name in stats:
+            v = float(stats[name][self.i])
+            return 0.0 if np.isnan(v) else v
+        raise AttributeError(name)
+
+    @property
+    def depth(self) -> int:
+        return int(self.tree.depth[self.i])
+
+    @property
+    def samples(self) -> float:
+        s = float(self.tree.samples[self.i])
+        return int(s) if s.is_integer() else s
+
+    @property
+    def impurity(self) -> float:
+        return float(self.tree.impurity[self.i])
+
+    gini = entropy = impurity
+
+    @property
+    def class_counts(self) -> Dict[Any, Any]:
+        row = self.tree.value[self.i]
+        classes = self.tree.classes
+        return {
+            classes[k]: (int(row[k]) if float(row[k]).is_integer() else float(row[k]))
+            for k in self.tree.count_order[self.i]
+            if k >= 0
+        }
+
+    @property
+    def kind(self) -> str:
+        return KIND_NAMES[self.tree.kind[self.i]]
+
+    def is_leaf(self) -> bool:
+        return self.tree.kind[self.i] == LEAF
+
+    @property
+    def predicted_class(self) -> Optional[Any]:
+        if not self.is_leaf():
+            return None
+        return self.tree.classes[self.tree.node_class[self.i]]
+
+    @property
+    def split_attr(self) -> Optional[str]:
+        f = self.tree.feature[self.i]
+        return None if f < 0 else self.tree.features[f]
+
+    @property
+    def split_type(self) -> Optional[str]:
+        k = self.tree.kind[self.i]
+        return None if k == LEAF else ("eq" if k == MULTI else KIND_NAMES[k])
+
+    @property
+    def split_value(self) -> Any:
+        t, i = self.tree, self.i
+        k = t.kind[i]
+        if k == LE:
+            return float(t.threshold[i])
+        cats = t.categories[t.feature[i]] if k in (EQ, IN) else None
+        if k == EQ:
+            return cats[t.split_code[i]]
+        if k == IN:
+            start = t.split_code[i]
+            mask = t.member[start : start + len(cats)]
+            return tuple(cats[mask].tolist())
+        return None
+
+    def _child(self, j: int) -> Optional["NodeView"]:
+        c = self.tree.child_table[self.tree.child_offset[self.i] + j]
+        return None if c < 0 else NodeView(self.tree, int(c))
+
+    @property
+    def children(self) -> Dict[Any, "NodeView"]:
+        """Filhos por categoria (MULTI) ou pelos `binary_labels` (splits binários)."""
+        return dict(self.edges())
+
+    @property
+    def left(self) -> Optional["NodeView"]:
+        return None if self.tree.kind[self.i] in (LEAF, MULTI) else self._child(0)
+
+    @property
+    def right(self) -> Optional["NodeView"]:
+        return None if self.tree.kind[self.i] in (LEAF, MULTI) else self._child(1)
+
+    def edges(self) -> List[Tuple[Any, "NodeView"]]:
+        t, i = self.tree, self.i
+        k = t.kind[i]
+        if k == LEAF:
+            return []
+        if k == MULTI:
+            cats = t.categories[t.feature[i]]
+            out = []
+            for code in range(t.n_children[i]):
+                ch = self._child(code)
+                if ch is not None:
+                    out.append((cats[code], ch))
+            return out
+        lbl_left, lbl_right = t.binary_labels
+        pairs = ((lbl_left, self._child(0)), (lbl_right, self._child(1)))
+        return [(lbl, ch) for lbl, ch in pairs if ch is not None]
+
+    # Rótulos de ramos de árvores multiway/limiar (mesmo formato do Node do C4.5)
+    def branch(self, key: Any) -> Tuple[str, str, Any]:
+        if self.split_type == "le":
+            return (self.split_attr or "?", key, self.split_value)
+        return (self.split_attr or "?", "=", key)
+
+    def branch_label(self, key: Any) -> str:
+        if self.split_type == "le":
+            return f"{key} {self.split_value:g}"
+        return str(key)
+
+    def split_label(self) -> str:
+        if self.split_type == "le":
+            return f"{self.split_attr} <= {self.split_value:g}"
+        return str(self.split_attr)
+
+
+# ---------------------------
+# Emissão pelos builders
+# ---------------------------
+
+
+class TreeBuilder:
+    """Recebe os nós de uma árvore (em qualquer ordem, com índices já atribuídos pelo
+    chamador) e monta a TreeArrays.
+
+    Uso: add_node() para cada nó (o primeiro é a raiz), depois split_multi() ou
+    split_binary() para os nós internos, com os índices dos filhos; build() no fim.
+    """
+
+    def __init__(
+        self,
+        features: Sequence[str],
+        stats: Sequence[str] = (),
+        binary_labels: Tuple[str, str] = ("L", "R"),
+    ):
+        self.features = list(features)
+        self.binary_labels = binary_labels
+        self._col = {a: j for j, a in enumerate(self.features)}
+        self._nodes: List[Tuple[int, float, float, Dict[Any, Any], Any]] = []
+        self._splits: Dict[int, Tuple[str, int, Any, List[Tuple[Any, int]]]] = {}
+        self._stats: Dict[str, List[float]] = {name: [] for name in stats}
+
+    def add_node(
+        self,
+        depth: int,
+        samples: float,
+        impurity: float,
+        class_counts: Dict[Any, Any],
+        predicted_class: Any = None,
+        **stats: Optional[float],
+    ) -> int:
+        """Registra um nó e devolve seu índice; predicted_class None = maioria.
+        `stats` preenche as colunas extras declaradas no construtor (None = NaN)."""
+        self._nodes.append((depth, samples, impurity, class_counts, predicted_class))
+        for name, col in self._stats.items():
+            v = stats.get(name)
+            col.append(np.nan if v is None else float(v))
+        return len(self._nodes) - 1
+
+    def split_multi(self, i: int, attr: str, children: Dict[Any, int]) -> None:
+        self._splits[i] = ("multi", self._col[attr], None, list(children.items()))
+
+    def split_binary(
+        self, i: int, attr: str, kind: str, value: Any, left: int, right: int
+    ) -> None:
+        """kind: "le" (value = limiar), "eq" (categoria) ou "in" (tupla de categorias)."""
+        self._splits[i] = (kind, self._col[attr], value, [("L", left), ("R", right)])
+
+    def build(self) -> TreeArrays:
+        n = len(self._nodes)
+        nf = len(self.features)
+        seen: List[set] = [set() for _ in range(nf)]
+        numeric = np.zeros(nf, dtype=bool)
+        labels: set = set()
+        for _, _, _, cc, y in self._nodes:
+            labels.update(cc)
+            if y is not None:
+                labels.add(y)
+        for kind, j, value, kids in self._splits.values():
+            if kind == "le":
+                numeric[j] = True
+            elif kind == "eq":
+                seen[j].add(value)
+            elif kind == "in":
+                seen[j].update(value)
+            else:
+                seen[j].update(k for k, _ in kids)
+        categories = [np.asarray(_sorted_values(v), dtype=object) for v in seen]
+        code_of = [{v: c for c, v in enumerate(cats)} for cats in categories]
+        classes = np.asarray(_sorted_values(labels), dtype=object)
+        class_idx = {c: k for k, c in enumerate(classes)}
+
+        feature = np.full(n, -1, dtype=np.int32)
+        kind_arr = np.full(n, LEAF, dtype=np.uint8)
+        threshold = np.full(n, np.nan)
+        split_code = np.full(n, -1, dtype=np.int64)
+        child_offset = np.zeros(n, dtype=np.int64)
+        n_children = np.zeros(n, dtype=np.int64)
+        value = np.zeros((n, len(classes)), dtype=np.float64)
+        count_order = np.full((n, len(classes)), -1, dtype=np.int16)
+        node_class = np.zeros(n, dtype=np.int64)
+        depth = np.zeros(n, dtype=np.int32)
+        samples = np.zeros(n, dtype=np.float64)
+        impurity = np.zeros(n, dtype=np.float64)
+        table: List[int] = []
+        member: List[bool] = []
+        for i, (d, s, imp, cc, y) in enumerate(self._nodes):
+            depth[i], samples[i], impurity[i] = d, s, imp
+            for pos, (c, k) in enumerate(cc.items()):
+                value[i, class_idx[c]] = k
+                count_order[i, pos] = class_idx[c]
+            if y is None and cc:
+                y = max(cc.items(), key=lambda kv: kv[1])[0]
+            node_class[i] = class_idx[y] if y in class_idx else 0
+            if i not in self._splits:
+                continue
+            kind, j, val, kids = self._splits[i]
+            feature[i] = j
+            child_offset[i] = len(table)
+            if kind == "multi":
+                kind_arr[i] = MULTI
+                row = [-1] * len(categories[j])
+                for v, ch in kids:
+                    row[code_of[j][v]] = ch
+                table.extend(row)
+                n_children[i] = len(row)
+                continue
+            table.extend(ch for _, ch in kids)
+            n_children[i] = 2
+            if kind == "le":
+                kind_arr[i] = LE
+                threshold[i] = val
+            elif kind == "eq":
+                kind_arr[i] = EQ
+                split_code[i] = code_of[j][val]
+            else:
+                kind_arr[i] = IN
+                split_code[i] = len(member)
+                inside = set(val)
+                member.extend(c in inside for c in categories[j])
+
+        return TreeArrays(
+            feature=feature,
+            kind=kind_arr,
+            threshold=threshold,
+            split_code=split_code,
+            child_offset=child_offset,
+            n_children=n_children,
+            child_table=np.asarray(table, dtype=np.int64),
+            member=np.asarray(member, dtype=bool),
+            value=value,
+            count_order=count_order,
+            node_class=node_class,
+            depth=depth,
+            samples=samples,
+            impurity=impurity,
+            classes=classes,
+            features=self.features,
+            categories=categories,
+            numeric=numeric,
+            stats={k: np.asarray(v, dtype=np.float64) for k, v in self._stats.items()},
+            binary_labels=self.binary_labels,
+        )
+
+
+def compile_nodes(
+    root: Any, features: Sequence[str], impurity: str, stats: Sequence[str] = ()
+) -> TreeArrays:
+    """Emite um grafo de nós de builder (ID3Node, Node do C4.5, CARTNode) na TreeArrays.
+
+    Nós com `children` viram MULTI (ou LE, no C4.5, com os ramos "<=" e ">"); nós com
+    `left`/`right` usam o split_type do nó. `impurity` é o nome do campo de impureza
+    ("entropy" ou "gini"); `stats`, campos numéricos dos nós copiados para tree.stats.
+    """
+    nodes = list(iter_preorder(root))
+    index = {id(n): i for i, n in enumerate(nodes)}
+    index[id(None)] = -1
+    labels = ("<=", ">") if hasattr(root, "children") else ("L", "R")
+    b = TreeBuilder(features, stats=stats, binary_labels=labels)
+    for n in nodes:
+        b.add_node(
+            n.depth,
+            n.samples,
+            getattr(n, impurity),
+            n.class_counts,
+            n.predicted_class if n.is_leaf() else None,
+            **{name: (None if n.is_leaf() else getattr(n, name)) for name in stats},
+        )
+    for n in nodes:
+        i = index[id(n)]
+        if n.is_leaf() or n.split_attr is None:
+            continue
+        if hasattr(n, "children"):
+            if not n.children:
+                continue
+            if getattr(n, "split_type", None) == "le":
+                b.split_binary(
+                    i,
+                    n.split_attr,
+                    "le",
+                    n.split_value,
+                    index[id(n.children.get("<="))],
+                    index[id(n.children.get(">"))],
+                )
+            else:
+                b.split_multi(
+                    i, n.split_attr, {v: index[id(ch)] for v, ch in n.children.items()}
+                )
+        elif n.left is not None and n.right is not None:
+            b.split_binary(
+                i,
+                n.split_attr,
+                n.split_type,
+                n.split_value,
+                index[id(n.left)],
+                index[id(n.right)],
+            )
+    return b.build()
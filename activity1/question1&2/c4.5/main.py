@@ -3,17 +3,35 @@
 
 O script:
 - Lê data/dataset1.csv (classe: 'Risco', ignora coluna 'ID');
-- Constrói a árvore usando Gain Ratio (C4.5) para atributos categóricos;
+- Constrói a árvore usando Gain Ratio (C4.5) para atributos categóricos e numéricos
+  (numéricos: split binário atributo <= limiar, com o limiar escolhido em uma única
+  varredura sobre índices pré-ordenados);
+- Trata valores ausentes como no C4.5: ganho calculado sobre os casos conhecidos e
+  linhas sem valor descendo por todos os ramos com pesos fracionários;
 - Exibe no terminal os cálculos por nó: entropia do nó, IG, SplitInfo e GainRatio por atributo;
-- Gera DOT (tree_c45.dot) e PNG (tree_c45.png) com os valores no label dos nós.
+- Gera DOT (tree_c45.dot) e PNG (tree_c45.png; tree_c45.svg se a árvore for larga
+  demais para um PNG legível) com os valores no label dos nós.
 
 Execução:
   python activity1/question1/c4.5/main.py
 
 Parâmetros opcionais:
   --data <caminho_csv> (padrão: data/dataset1.csv)
+  --target <coluna> (padrão: Risco; ex.: Target para data/dataset2.csv)
   --no_png  (não salvar PNG)
   --no_dot  (não salvar DOT)
+  --quiet   (não exibir os cálculos por nó)
+  --trace_jsonl <caminho> (grava os eventos do build em JSONL em vez de imprimir)
+  --save_model <caminho> (grava a árvore no formato binário mapeável; ver load())
+  --window <tam> (windowing do C4.5: janela inicial como fração, ex.: 0.3 ou 1.0, ou
+    nº de linhas, ex.: 500)
+  --window_increment <n> (máximo de linhas erradas adicionadas à janela por iteração)
+  --simplify_rules (gera rules_c45rules.txt com as regras simplificadas, estilo C4.5rules)
+  --cf <fator>  (poda por erro pessimista com esse fator de confiança; ex.: 0.25)
+  --raising (com --cf: também considera elevar a maior subárvore — subtree raising)
+  --forest <n> [--n_jobs <n>] (floresta aleatória de n árvores em paralelo; mostra a
+    acurácia out-of-bag)
+  --node_jobs <n> (avalia os atributos candidatos dos nós grandes em paralelo)
 """
 
 from __future__ import annotations
@@ -22,13 +40,38 @@ import argparse
 import math
 import os
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
 try:
     from activity1.common import get_repo_root, get_data_path
+    from activity1.common import bitset
+    from activity1.common.audit import SplitAudit
+    from activity1.common.encoding import class_first_occurrence, ordered_class_counts
+    from activity1.common.codegen import MISSING, build_predictor
+    from activity1.common.export import (
+        dot_escape,
+        dot_lines,
+        iter_rules,
+        rule_lines,
+        write_lines,
+    )
+    from activity1.common.forest import FeatureSampler, RandomForest
+    from activity1.common.model_io import load_tree, save_tree
+    from activity1.common.parallel import NodeExecutor, map_tasks
+    from activity1.common.render import (
+        PngTooLargeError,
+        TreeDrawing,
+        draw_png,
+        layout_tree,
+        write_svg,
+    )
+    from activity1.common.rule_index import RuleIndex
+    from activity1.common.tree import TreeArrays, compile_nodes
+    from activity1.common.trace import NULL_TRACE, make_trace
+    from activity1.common.traversal import grow, iter_preorder
 except Exception:
     import sys as _sys, os as _os
 
@@ -36,6 +79,31 @@ except Exception:
         _os.path.abspath(_os.path.join(_os.path.dirname(__file__), "..", "..", ".."))
     )
     from activity1.common import get_repo_root, get_data_path
+    from activity1.common import bitset
+    from activity1.common.audit import SplitAudit
+    from activity1.common.encoding import class_first_occurrence, ordered_class_counts
+    from activity1.common.codegen import MISSING, build_predictor
+    from activity1.common.export import (
+        dot_escape,
+        dot_lines,
+        iter_rules,
+        rule_lines,
+        write_lines,
+    )
+    from activity1.common.forest import FeatureSampler, RandomForest
+    from activity1.common.model_io import load_tree, save_tree
+    from activity1.common.parallel import NodeExecutor, map_tasks
+    from activity1.common.render import (
+        PngTooLargeError,
+        TreeDrawing,
+        draw_png,
+        layout_tree,
+        write_svg,
+    )
+    from activity1.common.rule_index import RuleIndex
+    from activity1.common.tree import TreeArrays, compile_nodes
+    from activity1.common.trace import NULL_TRACE, make_trace
+    from activity1.common.traversal import grow, iter_preorder
 
 
 DEFAULT_DATASET_PATH = get_data_path("dataset1.csv")
@@ -89,6 +157,421 @@ def info_gain_and_splitinfo(
     return ig, split_info, details
 
 
+def _gain_details(
+    branches, h_before: float, n_total: int
+) -> Tuple[float, float, Dict[Any, Dict[str, Any]]]:
+    """IG, SplitInfo e detalhes a partir de [(ramo, class_counts), ...] (mesmas contas de
+    info_gain_and_splitinfo, na mesma ordem)."""
+    details: Dict[Any, Dict[str, Any]] = {}
+    h_after = 0.0
+    split_info = 0.0
+    for v, cc in branches:
+        n_v = sum(cc.values())
+        h_v = entropy(cc)
+        w = n_v / n_total
+        details[v] = {"n": n_v, "class_counts": cc, "entropy": h_v, "weight": w}
+        h_after += w * h_v
+        if w > 0:
+            split_info -= w * math.log2(w)
+    return h_before - h_after, split_info, details
+
+
+# Desvios normais (z) tabelados do C4.5 para interpolar o fator de confiança
+_CF_VALUES = (0.0, 0.001, 0.005, 0.01, 0.05, 0.10, 0.20, 0.40, 1.00)
+_CF_DEVS = (4.0, 3.09, 2.58, 2.33, 1.65, 1.28, 0.84, 0.25, 0.00)
+
+
+def _cf_coeff(cf: float) -> float:
+    """z² correspondente ao fator de confiança `cf` (interpolação linear, como no C4.5)."""
+    i = 1
+    while cf > _CF_VALUES[i]:
+        i += 1
+    lo, hi = _CF_VALUES[i - 1], _CF_VALUES[i]
+    z = _CF_DEVS[i - 1] + (_CF_DEVS[i] - _CF_DEVS[i - 1]) * (cf - lo) / (hi - lo)
+    return z * z
+
+
+def pessimistic_errors(n: float, e: float, cf: float = 0.25) -> float:
+    """Erros estimados (e + extra) de uma folha com n casos e e erros.
+
+    Limite superior da binomial com confiança `cf` (AddErrs do C4.5): usa apenas as
+    contagens, sem reler os dados.
+    """
+    if n <= 0:
+        return 0.0
+    if e < 1e-6:
+        return n * (1 - math.exp(math.log(cf) / n))
+    if e < 0.9999:
+        v0 = n * (1 - math.exp(math.log(cf) / n))
+        return e + v0 + e * (pessimistic_errors(n, 1.0, cf) - 1.0 - v0)
+    if e + 0.5 >= n:
+        return e + 0.67 * (n - e)
+    coeff = _cf_coeff(cf)
+    pr = (
+        e
+        + 0.5
+        + coeff / 2
+        + math.sqrt(coeff * ((e + 0.5) * (1 - (e + 0.5) / n) + coeff / 4))
+    ) / (n + coeff)
+    return n * pr
+
+
+def _node_errors(node: "Node") -> float:
+    """Erros de treino do nó se ele fosse folha da classe majoritária."""
+    cc = node.class_counts
+    return node.samples - (max(cc.values()) if cc else 0)
+
+
+def _entropy_rows(counts: np.ndarray) -> np.ndarray:
+    """Entropia (bits) de cada linha de uma matriz de contagens por classe."""
+    n = counts.sum(axis=1, keepdims=True)
+    p = np.divide(counts, n, out=np.zeros(counts.shape), where=n > 0)
+    logp = np.log2(p, out=np.zeros_like(p), where=p > 0)
+    return -(p * logp).sum(axis=1)
+
+
+@dataclass
+class _Rows:
+    """Dados de um nó: índices das linhas (ordem original), pesos e, para cada atributo
+    numérico, as mesmas linhas ordenadas pelo valor (sem ausentes).
+
+    w é None enquanto todas as linhas têm peso 1; passa a ser um vetor alinhado a `rows`
+    quando alguma linha com valor ausente foi dividida entre os ramos (instâncias
+    fracionárias do C4.5).
+    """
+
+    rows: np.ndarray
+    sorted: Dict[str, np.ndarray]
+    w: Optional[np.ndarray] = None
+
+
+class _C45Backend:
+    """Contagens do C4.5 sobre índices de linhas.
+
+    - categóricos: códigos inteiros e tabelas (valor × classe) via np.bincount;
+    - numéricos: cada coluna é ordenada uma única vez na raiz; as listas ordenadas são
+      filtradas (sem reordenar) a cada partição, e todos os limiares candidatos são
+      avaliados em uma varredura de contagens acumuladas — O(n) por atributo e nó;
+    - valores ausentes: o ganho é calculado sobre os casos conhecidos e multiplicado pela
+      fração conhecida; na partição, cada linha com valor ausente desce por todos os
+      ramos com peso proporcional ao peso conhecido de cada ramo. Só os índices e os
+      pesos são replicados, nunca as linhas.
+
+    Os dicts de contagem seguem a ordem de value_counts (contagem decrescente, depois
+    ordem de aparição), como no cálculo original com pandas.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        features: List[str],
+        target: str,
+        executor: Optional[NodeExecutor] = None,
+    ):
+        n = len(df)
+        self.executor = executor
+        self.numeric = {
+            a
+            for a in features
+            if pd.api.types.is_numeric_dtype(df[a])
+            and not pd.api.types.is_bool_dtype(df[a])
+        }
+        self.codes: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, np.ndarray] = {}
+        self.x: Dict[str, np.ndarray] = {}
+        presorted: Dict[str, np.ndarray] = {}
+        for a in features:
+            if a in self.numeric:
+                x = df[a].to_numpy(dtype=np.float64)
+                order = np.argsort(x, kind="stable")
+                self.x[a] = x
+                presorted[a] = order[~np.isnan(x[order])]
+            else:
+                codes, uniques = pd.factorize(df[a], sort=True)
+                self.codes[a] = codes.astype(np.int64)
+                self.categories[a] = np.asarray(uniques, dtype=object)
+        y_codes, classes = pd.factorize(df[target].astype(str), sort=True)
+        self.y = y_codes.astype(np.int64)
+        self.classes = np.asarray(classes, dtype=object)
+        self.k = len(self.classes)
+        self.data = _Rows(np.arange(n, dtype=np.int64), presorted)
+        # rascunhos por linha, reaproveitados entre nós: rótulo do filho (volta a -1),
+        # marca de valor ausente (volta a False) e peso da linha no nó corrente
+        self._lab = np.full(n, -1, dtype=np.int64)
+        self._miss = np.zeros(n, dtype=bool)
+        self._wrow = np.ones(n, dtype=np.float64)
+
+    def size(self, data: _Rows) -> Any:
+        return len(data.rows) if data.w is None else float(data.w.sum())
+
+    def _counts(self, rows: np.ndarray, w: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        y = self.y[rows]
+        counts = np.bincount(y, weights=w, minlength=self.k)
+        return ordered_class_counts(
+            counts, class_first_occurrence(y, self.k), self.classes
+        )
+
+    def class_counts(self, data: _Rows) -> Dict[str, Any]:
+        return self._counts(data.rows, data.w)
+
+    def score(self, data: _Rows, features: List[str], counts: Dict[str, Any]):
+        """Gera (atributo, IG, SplitInfo, detalhes, limiar) por atributo avaliável.
+
+        limiar é None para categóricos. Para numéricos o limiar é o maior valor observado
+        do lado esquerdo (como no C4.5) e o ganho recebe a correção do C4.5 release 8,
+        log2(n_limiares)/N. Com valores ausentes, IG = fração conhecida × ganho sobre os
+        conhecidos e o SplitInfo inclui os ausentes como um ramo a mais.
+        """
+        rows = data.rows
+        h_before = entropy(counts)
+        n_total = self.size(data)
+        if data.w is not None:
+            self._wrow[rows] = data.w
+        # os atributos só leem os vetores do backend: com o executor, um por thread
+        tasks = [(data, attr, h_before, n_total) for attr in features]
+        results = map_tasks(self.executor, self._score_attr, tasks, len(rows))
+        for attr, res in zip(features, results):
+            if res is not None:
+                yield (attr,) + res
+
+    def _score_attr(self, data: _Rows, attr: str, h_before: float, n_total: Any):
+        if attr in self.numeric:
+            return self._score_numeric(data, attr, h_before, n_total)
+        return self._score_categorical(data, attr, h_before, n_total)
+
+    def _score_categorical(
+        self, data: _Rows, attr: str, h_before: float, n_total: Any
+    ):
+        rows = data.rows
+        codes = self.codes[attr][rows]
+        valid = codes >= 0
+        yk = self.y[rows]
+        nv = len(self.categories[attr])
+        flat = codes[valid] * self.k + yk[valid]
+        wv = None if data.w is None else data.w[valid]
+        table = np.bincount(flat, weights=wv, minlength=nv * self.k).reshape(
+            nv, self.k
+        )
+        first = np.full(nv * self.k, len(rows), dtype=np.int64)
+        np.minimum.at(first, flat, np.flatnonzero(valid))
+        first = first.reshape(nv, self.k)
+        branches = [
+            (
+                self.categories[attr][v],
+                ordered_class_counts(table[v], first[v], self.classes),
+            )
+            for v in np.flatnonzero(table.sum(axis=1))
+        ]
+        if valid.all():
+            ig, si, details = _gain_details(branches, h_before, n_total)
+        else:
+            ig, si, details = self._gain_known(branches, table.sum(axis=0), n_total)
+        return ig, si, details, None
+
+    def _gain_known(self, branches, known: np.ndarray, n_total: float):
+        """IG e SplitInfo com ausentes: ganho sobre os casos conhecidos × fração conhecida;
+        os ausentes entram no SplitInfo como um ramo próprio."""
+        n_known = float(known.sum())
+        h_known = entropy(dict(enumerate(known.tolist())))
+        ig, _, details = _gain_details(branches, h_known, n_known)
+        frac = n_known / n_total
+        split_info = 0.0
+        for d in details.values():
+            p = d["weight"] * frac
+            if p > 0:
+                split_info -= p * math.log2(p)
+        if frac < 1.0:
+            split_info -= (1.0 - frac) * math.log2(1.0 - frac)
+        return frac * ig, split_info, details
+
+    def _score_numeric(self, data: _Rows, attr: str, h_before: float, n_total: Any):
+        s = data.sorted[attr]
+        m = len(s)
+        if m < 2:
+            return None
+        xs = self.x[attr][s]
+        bounds = np.flatnonzero(xs[:-1] < xs[1:])
+        if not len(bounds):
+            return None
+        if data.w is None:
+            onehot = np.zeros((m, self.k), dtype=np.int64)
+            onehot[np.arange(m), self.y[s]] = 1
+        else:
+            onehot = np.zeros((m, self.k), dtype=np.float64)
+            onehot[np.arange(m), self.y[s]] = self._wrow[s]
+        cum = np.cumsum(onehot, axis=0)
+        left = cum[bounds]
+        right = cum[-1] - left
+        x = self.x[attr][data.rows]
+        complete = m == len(data.rows)
+        if data.w is None:
+            nl = (bounds + 1).astype(np.float64)
+            nr = m - nl
+        else:
+            nl = left.sum(axis=1)
+            nr = right.sum(axis=1)
+        if complete:
+            h_after = (nl * _entropy_rows(left) + nr * _entropy_rows(right)) / n_total
+            i = bounds[int(np.argmax(h_before - h_after))]
+        else:
+            h_after = (nl * _entropy_rows(left) + nr * _entropy_rows(right)) / (nl + nr)
+            i = bounds[int(np.argmin(h_after))]
+        t = float(xs[i])
+        le, gt = x <= t, x > t
+        w = data.w
+        branches = [
+            ("<=", self._counts(data.rows[le], None if w is None else w[le])),
+            (">", self._counts(data.rows[gt], None if w is None else w[gt])),
+        ]
+        if complete:
+            ig, si, details = _gain_details(branches, h_before, n_total)
+        else:
+            ig, si, details = self._gain_known(branches, cum[-1], n_total)
+        ig -= math.log2(len(bounds)) / n_total
+        return ig, si, details, t
+
+    def labels(self, attr: str, threshold: Optional[float], rows: np.ndarray):
+        """Ramo de cada linha (-1 = valor ausente) e as chaves dos ramos, na ordem."""
+        if threshold is not None:
+            x = self.x[attr][rows]
+            lab = np.where(x <= threshold, 0, 1)
+            lab[np.isnan(x)] = -1
+            return lab, ["<=", ">"]
+        return self.codes[attr][rows], list(self.categories[attr])
+
+    def distribute(
+        self, rows: np.ndarray, w: Optional[np.ndarray], lab: np.ndarray, n_branches: int
+    ) -> List[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """(linhas, pesos) de cada ramo; linhas com rótulo -1 vão para todos os ramos com
+        peso × (peso conhecido do ramo / peso conhecido total). As linhas de cada ramo
+        mantêm a ordem original."""
+        order = np.argsort(lab, kind="stable")
+        sizes = np.bincount(lab + 1, minlength=n_branches + 1)
+        bounds = np.cumsum(sizes)
+        n_miss = int(sizes[0])
+        out: List[Tuple[np.ndarray, Optional[np.ndarray]]] = []
+        if n_miss == 0:
+            for v in range(n_branches):
+                sel = order[bounds[v] : bounds[v + 1]]
+                out.append((rows[sel], None if w is None else w[sel]))
+            return out
+        wk = np.ones(len(rows)) if w is None else w
+        miss = order[:n_miss]
+        known_w = np.bincount(lab[lab >= 0], weights=wk[lab >= 0], minlength=n_branches)
+        total_known = known_w.sum()
+        frac = (
+            known_w / total_known
+            if total_known > 0
+            else np.full(n_branches, 1.0 / max(1, n_branches))
+        )
+        for v in range(n_branches):
+            sel = order[bounds[v] : bounds[v + 1]]
+            if not len(sel):
+                out.append((rows[sel], wk[sel]))
+                continue
+            idx = np.concatenate([sel, miss])
+            cw = np.concatenate([wk[sel], wk[miss] * frac[v]])
+            o = np.argsort(idx, kind="stable")
+            out.append((rows[idx[o]], cw[o]))
+        return out
+
+    def partition(self, data: _Rows, attr: str, threshold: Optional[float]):
+        rows = data.rows
+        lab, keys = self.labels(attr, threshold, rows)
+        branches = self.distribute(rows, data.w, lab, len(keys))
+        # categóricos: só valores presentes no nó; numéricos: sempre "<=" e ">"
+        present = np.bincount(lab[lab >= 0], minlength=len(keys)) > 0
+        parts = [
+            (v, keys[v], child_rows, child_w)
+            for v, (child_rows, child_w) in enumerate(branches)
+            if threshold is not None or present[v]
+        ]
+        # filtra as listas pré-ordenadas de cada filho, preservando a ordenação; linhas
+        # com valor ausente no atributo do split pertencem a todos os filhos
+        marks = self._lab
+        miss = self._miss
+        marks[rows] = lab
+        miss[rows[lab < 0]] = True
+        out = []
+        for _, key, child_rows, child_w in parts:
+            out.append((key, _Rows(child_rows, {}, child_w)))
+        branch = [v for v, _, _, _ in parts]
+        for a, ps in data.sorted.items():
+            ls = marks[ps]
+            ms = miss[ps]
+            for k, (_, child) in zip(branch, out):
+                child.sorted[a] = ps[(ls == k) | ms]
+        marks[rows] = -1
+        miss[rows] = False
+        return out
+
+
+def _num(v: Any) -> str:
+    """Contagem para exibição: pesos fracionários (ausentes) com 2 casas."""
+    return f"{v:.2f}" if isinstance(v, float) else str(v)
+
+
+def _rounded(cc: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: round(v, 2) if isinstance(v, float) else v for k, v in cc.items()}
+
+
+def _fmt_attr(r: Dict[str, Any]) -> str:
+    t = r.get("threshold")
+    head = f"\nAtributo '{r['attr']}'"
+    if t is not None:
+        head += f" (limiar {t:g})"
+    lines = [
+        f"{head}: IG={r['ig']:.6f} | SplitInfo={r['si']:.6f} | GainRatio={r['gr']:.6f}"
+    ]
+    for v, d in r["details"].items():
+        cond = f"{r['attr']} = {v}" if t is None else f"{r['attr']} {v} {t:g}"
+        lines.append(
+            f"  - {cond} -> n={_num(d['n'])}, dist={_rounded(d['class_counts'])}, H={d['entropy']:.4f}, peso={d['weight']:.3f}"
+        )
+    return "\n".join(lines)
+
+
+def _fmt_split(r: Dict[str, Any]) -> str:
+    t = r.get("threshold")
+    cond = f"'{r['attr']}'" if t is None else f"'{r['attr']}' <= {t:g}"
+    return f"\n=> Escolhido split por {cond} (GainRatio={r['gr']:.6f}, IG={r['ig']:.6f}, SI={r['si']:.6f})"
+
+
+def _fmt_child(r: Dict[str, Any]) -> str:
+    t = r.get("threshold")
+    cond = f"{r['attr']} = {r['value']}" if t is None else f"{r['attr']} {r['value']} {t:g}"
+    return f"  Gerando filho para {cond} (n={_num(r['n'])})"
+
+
+_LEAF_REASONS = {
+    "pure": "Folha pura: classe={cls}",
+    "no_attrs": "Folha (sem atributos): classe majoritária={cls}",
+    "no_gain": "Folha (GainRatio<=0): classe majoritária={cls}",
+}
+
+# Formatadores do TerminalTrace (saída didática do script)
+TERMINAL_FORMATS = {
+    "node": lambda r: (
+        "\n" + "-" * 80 + f"\nNó (profundidade={r['depth']})\n"
+        f"Amostras: {_num(r['samples'])} | Distribuição: {_rounded(r['counts'])} | Entropia: {r['entropy']:.4f}"
+    ),
+    "leaf": lambda r: _LEAF_REASONS[r["reason"]].format(cls=r["cls"]),
+    "attr": _fmt_attr,
+    "split": _fmt_split,
+    "child": _fmt_child,
+    "window": lambda r: (
+        f"\n[Janela] iteração {r['iteration']}: {r['size']} linhas na janela, "
+        f"{r['errors']} erros fora dela"
+    ),
+    "prune": lambda r: (
+        f"Poda (profundidade={r['depth']}, split={r['split']}): "
+        + ("vira folha" if r["action"] == "leaf" else "eleva a maior subárvore")
+        + f" | erro folha={r['leaf_err']:.3f}, erro subárvore={r['tree_err']:.3f}"
+        + (f", erro ramo={r['branch_err']:.3f}" if r["branch_err"] is not None else "")
+    ),
+}
+
+
 @dataclass
 class Node:
     depth: int
@@ -96,277 +579,750 @@ class Node:
     class_counts: Dict[str, int]
     entropy: float
     split_attr: Optional[str] = None
+    # "eq": um ramo por valor (categórico); "le": ramos "<=" e ">" do limiar (numérico)
+    split_type: str = "eq"
+    split_value: Optional[float] = None
     split_ig: float = 0.0
     split_si: float = 0.0
     split_gr: float = 0.0
-    tested_attrs: List[Tuple[str, float, float, Dict[Any, Dict[str, Any]]]] = field(
-        default_factory=list
-    )
+    # Id do nó no registro de auditoria (-1 sem auditoria)
+    node_id: int = -1
     children: Dict[Any, "Node"] = field(default_factory=dict)
     predicted_class: Optional[str] = None
 
     def is_leaf(self) -> bool:
         return self.predicted_class is not None
 
+    def edges(self) -> List[Tuple[Any, "Node"]]:
+        return list(self.children.items())
+
+    def branch(self, key: Any) -> Tuple[str, str, Any]:
+        """Condição (atributo, operador, valor) do ramo `key`."""
+        if self.split_type == "le":
+            return (self.split_attr or "?", key, self.split_value)
+        return (self.split_attr or "?", "=", key)
+
+    def branch_label(self, key: Any) -> str:
+        if self.split_type == "le":
+            return f"{key} {self.split_value:g}"
+        return str(key)
+
+    def split_label(self) -> str:
+        if self.split_type == "le":
+            return f"{self.split_attr} <= {self.split_value:g}"
+        return str(self.split_attr)
+
 
 class C45DecisionTree:
-    def __init__(self, target: str):
+    def __init__(
+        self,
+        target: str,
+        trace=None,
+        order: str = "depth",
+        audit: bool = False,
+        max_features: Any = None,
+        random_state: Any = None,
+        executor: Optional[NodeExecutor] = None,
+    ):
         self.target = target
+        # Sem trace o fit é silencioso; TerminalTrace(TERMINAL_FORMATS) imprime os cálculos
+        self.trace = trace if trace is not None else NULL_TRACE
+        # Ordem de expansão sem recursão: "depth" (pré-ordem) ou "breadth" (por nível)
+        self.order = order
+        # audit=True guarda IG/SplitInfo de todos os atributos testados em audit_
+        # (common.audit; refeito a cada árvore construída, inclusive no windowing)
+        self.audit = audit
+        self.audit_: Optional[SplitAudit] = None
+        # max_features: avalia em cada nó só um sorteio dos atributos
+        # (common.forest.FeatureSampler, semente random_state; None = todos), como nas
+        # florestas aleatórias. O sorteio da janela usa o window_random_state de fit.
+        self.max_features = max_features
+        self.random_state = random_state
+        self._sampler = (
+            None if max_features is None else FeatureSampler(max_features, random_state)
+        )
+        # executor (common.parallel.NodeExecutor): avalia os atributos dos nós grandes
+        # em threads; None = em série
+        self.executor = executor
         self.root: Optional[Node] = None
+        self.features: List[str] = []
+        self.classes_: np.ndarray = np.empty(0, dtype=object)
+        # resumo do windowing do último fit (None quando treinado sem janela)
+        self.windowing_: Optional[Dict[str, int]] = None
+        # dados de treino codificados (com windowing, a tabela inteira); a poda com
+        # subtree raising e simplify_rules os releem
+        self._backend: Optional[_C45Backend] = None
+        # árvore emitida no núcleo em vetores (compile); refeita após fit/poda
+        self._tree: Optional[TreeArrays] = None
+        # função de predição por linha gerada em código (compiled_predictor)
+        self._row_fn: Optional[Tuple[TreeArrays, Callable[[Mapping[str, Any]], Any]]] = None
+
+    def fit(
+        self,
+        df: pd.DataFrame,
+        features: List[str],
+        window: Optional[Union[float, int]] = None,
+        window_increment: Optional[int] = None,
+        max_window_iter: int = 10,
+        window_random_state: int = 0,
+    ) -> None:
+        """Treina a árvore; com `window`, usa o windowing do C4.5.
+
+        window: tamanho da janela inicial, amostrada de forma estratificada por classe —
+        um float em (0, 1] é a fração das linhas (1.0 = todas) e um int é o número de
+        linhas. A cada iteração a árvore é construída só sobre a janela, as demais
+        linhas são classificadas em lote e até `window_increment` linhas mal
+        classificadas (padrão: 20% da janela inicial) entram na janela. Para quando
+        nenhuma linha fora da janela é errada ou após `max_window_iter` iterações; o
+        resumo fica em `self.windowing_` (iterações e tamanho final da janela). A poda
+        com subtree raising e simplify_rules usam todas as linhas de `df`.
+
+        window_random_state: semente dos sorteios da janela (o `random_state` do
+        construtor é o do sorteio de atributos, com max_features).
+        """
+        self.features = list(features)
+        self.windowing_ = None
+        if self._sampler is not None:
+            self._sampler.reset()
+        if window is None:
+            self._grow(df, features)
+            return
+
+        n = len(df)
+        # o tipo decide: 1.0 é a tabela inteira, 1 é uma linha
+        if isinstance(window, (int, np.integer)) and not isinstance(window, bool):
+            size = int(window)
+        elif isinstance(window, (float, np.floating)) and 0.0 < window <= 1.0:
+            size = max(1, int(round(window * n)))
+        else:
+            size = 0
+        if not 0 < size <= n:
+            raise ValueError(
+                f"window inválido: {window!r} (float em (0, 1] como fração ou int de "
+                f"1 a {n} como nº de linhas)"
+            )
+        step = window_increment or max(1, size // 5)
+        rng = np.random.default_rng(window_random_state)
+        y = df[self.target].astype(str).to_numpy()
+        in_window = np.zeros(n, dtype=bool)
+        # janela inicial estratificada: cada classe contribui na sua proporção
+        for cls in pd.unique(y):
+            idx = np.flatnonzero(y == cls)
+            take = max(1, int(round(size * len(idx) / n)))
+            in_window[rng.choice(idx, min(take, len(idx)), replace=False)] = True
+
+        tr = self.trace
+        for it in range(1, max_window_iter + 1):
+            self._grow(df.iloc[np.flatnonzero(in_window)], features)
+            rest = np.flatnonzero(~in_window)
+            wrong = rest[self.predict(df.iloc[rest]) != y[rest]] if len(rest) else rest
+            if tr.enabled:
+                tr.emit(
+                    "window",
+                    iteration=it,
+                    size=int(in_window.sum()),
+                    errors=int(len(wrong)),
+                )
+            if not len(wrong) or it == max_window_iter:
+                break
+            in_window[rng.choice(wrong, min(step, len(wrong)), replace=False)] = True
+        self.windowing_ = {"iterations": it, "window_size": int(in_window.sum())}
+        if not in_window.all():
+            # a poda com subtree raising e simplify_rules avaliam sobre todas as linhas
+            # de treino, não só sobre a janela final
+            self._backend = _C45Backend(df, features, self.target, self.executor)
+
+    def _grow(self, df: pd.DataFrame, features: List[str]) -> None:
+        backend = _C45Backend(df, features, self.target, self.executor)
+        self._backend = backend
+        self._tree = None
+        self.classes_ = backend.classes
+        self.audit_ = SplitAudit() if self.audit else None
+        self.root = grow(
+            (backend.data, features, 0, None),
+            lambda task: self._expand(backend, *task),
+            self._attach,
+            order=self.order,
+        )
 
-    def fit(self, df: pd.DataFrame, features: List[str]) -> None:
-        self.root = self._build(df, features, depth=0)
+    # -------------------
+    # Predição em lote
+    # -------------------
+    def _classify(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Desce todas as linhas juntas, nó a nó, com vetores de índices e pesos.
+
+        Valor ausente: a linha segue por todos os ramos com peso proporcional ao número
+        de casos de treino de cada ramo (como no C4.5); categoria sem ramo: a linha para
+        no nó e usa sua distribuição. Devolve (probabilidades, classe do nó terminal,
+        linha seguiu um único caminho).
+        """
+        assert self.root is not None
+        n = len(df)
+        code = {c: k for k, c in enumerate(self.classes_)}
+        proba = np.zeros((n, len(self.classes_)))
+        label = np.zeros(n, dtype=np.int64)
+        exact = np.ones(n, dtype=bool)
+        cols: Dict[str, np.ndarray] = {}
+        stack = [(self.root, np.arange(n), np.ones(n))]
+        while stack:
+            node, r, w = stack.pop()
+            if not len(r):
+                continue
+            stop = np.ones(len(r), dtype=bool)
+            if node.children:
+                attr = node.split_attr
+                if attr not in cols:
+                    cols[attr] = df[attr].to_numpy()
+                v = cols[attr][r]
+                if node.split_type == "le":
+                    x = v.astype(np.float64)
+                    miss = np.isnan(x)
+                    masks = {"<=": x <= node.split_value, ">": x > node.split_value}
+                else:
+                    miss = pd.isna(v)
+                    masks = {key: v == key for key in node.children}
+                known = sum(ch.samples for ch in node.children.values())
+                for key, ch in node.children.items():
+                    mk = masks[key]
+                    sel = mk | miss
+                    frac = ch.samples / known if known > 0 else 0.0
+                    cw = np.where(mk[sel], w[sel], w[sel] * frac)
+                    exact[r[sel & miss]] = False
+                    stack.append((ch, r[sel], cw))
+                    stop &= ~mk
+                stop &= ~miss
+            if not stop.any():
+                continue
+            rs, ws = r[stop], w[stop]
+            total = sum(node.class_counts.values())
+            for c, k in node.class_counts.items():
+                if total > 0:
+                    proba[rs, code[c]] += ws * (k / total)
+            cc = node.class_counts
+            y = node.predicted_class or (max(cc, key=lambda k: cc[k]) if cc else None)
+            label[rs] = code.get(y, 0)
+        return proba, label, exact
+
+    def compile(self) -> TreeArrays:
+        """Emite a árvore no núcleo em vetores NumPy (common.tree), para inspeção e
+        exportação. A predição do C4.5 continua em _classify, que distribui valores
+        ausentes entre os ramos com pesos (o núcleo para a linha no nó)."""
+        assert self.root is not None
+        if self._tree is None:
+            self._tree = compile_nodes(
+                self.root,
+                self.features,
+                "entropy",
+                stats=("split_ig", "split_si", "split_gr"),
+            )
+        return self._tree
+
+    def save(self, path: str) -> None:
+        """Grava a árvore no formato binário de common.model_io."""
+        save_tree(self.compile(), path, {"algorithm": "c4.5", "target": self.target})
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "C45DecisionTree":
+        """Abre um modelo salvo com save(); com mmap=True os vetores ficam mapeados do
+        arquivo. `root` passa a ser uma vista (NodeView) sobre eles: predição, regras e
+        exportações funcionam sem reconstruir os nós, mas não a poda."""
+        tree, meta = load_tree(path, mmap=mmap, algorithm="c4.5")
+        model = cls(meta["target"])
+        model.features = list(tree.features)
+        model.classes_ = tree.classes
+        model.root = tree.root
+        model._tree = tree
+        return model
+
+    def compiled_predictor(
+        self, cache_dir: Optional[str] = None
+    ) -> Callable[[Mapping[str, Any]], Any]:
+        """Função predict_row(row) gerada em Python para a árvore atual
+        (common.codegen), em cache no disco pelo hash da árvore."""
+        tree = self.compile()
+        if self._row_fn is None or self._row_fn[0] is not tree:
+            self._row_fn = (
+                tree,
+                build_predictor(tree, split_missing=True, cache_dir=cache_dir),
+            )
+        return self._row_fn[1]
+
+    def predict_row(self, row: Mapping[str, Any]) -> Any:
+        """Classe prevista para uma linha (dict atributo -> valor), pela função gerada.
+        Se falta o valor de um atributo testado, cai em predict (pesos por ramo)."""
+        y = self.compiled_predictor()(row)
+        if y is MISSING:
+            return self.predict(pd.DataFrame([row]))[0]
+        return y
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """Distribuição de classes (colunas na ordem de `classes_`) por linha."""
+        return self._classify(df)[0]
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """Classe prevista por linha: a do nó terminal, ou a de maior probabilidade
+        somada quando a linha foi dividida entre ramos por valor ausente."""
+        proba, label, exact = self._classify(df)
+        return np.asarray(self.classes_)[np.where(exact, label, proba.argmax(axis=1))]
+
+    @staticmethod
+    def _attach(parent: Node, value: Any, child: Node) -> None:
+        parent.children[value] = child
+
+    # -------------------
+    # Poda por erro pessimista
+    # -------------------
+    def prune(self, cf: float = 0.25, subtree_raising: bool = False) -> int:
+        """Poda pós-treino do C4.5; devolve quantos nós foram removidos.
+
+        Em pós-ordem, compara os erros estimados (pessimistic_errors) da subárvore, do nó
+        como folha e — com subtree_raising — da maior subárvore filha recebendo todos os
+        casos do nó. A substituição por folha usa só as contagens já guardadas nos nós; o
+        subtree raising redistribui as linhas de treino do nó pela subárvore elevada.
+        """
+        assert self.root is not None
+        if not 0.0 < cf < 1.0:
+            raise ValueError(f"cf deve estar em (0, 1): {cf!r}")
+        if subtree_raising and self._backend is None:
+            raise ValueError("subtree_raising precisa da árvore treinada com fit()")
+        before = sum(1 for _ in iter_preorder(self.root))
+        self._tree = None
+        rows_at = None
+        if subtree_raising:
+            rows_at = self._route(self.root, self._backend.data)
+        self._prune_subtree(self.root, cf, rows_at)
+        return before - sum(1 for _ in iter_preorder(self.root))
+
+    def _prune_subtree(
+        self, top: Node, cf: float, rows_at: Optional[Dict[int, _Rows]]
+    ) -> float:
+        """Poda a subárvore `top` (no lugar) e devolve seus erros estimados.
+
+        Pós-ordem com pilha explícita: um nó que recebe a subárvore elevada volta à
+        pilha, e a subárvore (com os casos redistribuídos) é podada de novo, sem
+        recursão.
+        """
+        tr = self.trace
+        est: Dict[int, float] = {}
+        stack: List[Tuple[Node, bool]] = [(top, False)]
+        while stack:
+            n, done = stack.pop()
+            if not done and n.children:
+                stack.append((n, True))
+                stack.extend((ch, False) for ch in reversed(list(n.children.values())))
+                continue
+            e = _node_errors(n)
+            leaf_err = pessimistic_errors(n.samples, e, cf)
+            if not n.children:
+                est[id(n)] = leaf_err
+                continue
+            tree_err = sum(est[id(ch)] for ch in n.children.values())
+            branch_err = None
+            largest = None
+            if rows_at is not None:
+                largest = max(n.children.values(), key=lambda ch: ch.samples)
+                branch_err = self._estimate(largest, rows_at[id(n)], cf)
+            action = None
+            if leaf_err <= tree_err + 0.1 and (
+                branch_err is None or leaf_err <= branch_err + 0.1
+            ):
+                action = "leaf"
+                est[id(n)] = leaf_err
+            elif branch_err is not None and branch_err <= tree_err + 0.1:
+                action = "raise"
+            else:
+                est[id(n)] = tree_err
+            if action is not None and tr.enabled:
+                tr.emit(
+                    "prune",
+                    depth=n.depth,
+                    split=n.split_label(),
+                    action=action,
+                    leaf_err=leaf_err,
+                    tree_err=tree_err,
+                    branch_err=branch_err,
+                )
+            if action == "leaf":
+                self._make_leaf(n)
+            elif action == "raise":
+                self._raise(n, largest, rows_at)
+                stack.append((n, False))
+        return est[id(top)]
+
+    @staticmethod
+    def _make_leaf(n: Node) -> None:
+        cc = n.class_counts
+        n.predicted_class = max(cc.items(), key=lambda kv: kv[1])[0] if cc else "?"
+        n.children = {}
+        n.split_attr = None
+        n.split_type = "eq"
+        n.split_value = None
+
+    def _route(self, top: Node, data: _Rows) -> Dict[int, _Rows]:
+        """Linhas de treino (e pesos) que chegam a cada nó da subárvore `top`.
+
+        Como no fit, linhas com valor ausente descem por todos os ramos com peso
+        proporcional; linhas com categoria sem ramo param no nó interno.
+        """
+        b = self._backend
+        out: Dict[int, _Rows] = {}
+        stack: List[Tuple[Node, _Rows]] = [(top, data)]
+        while stack:
+            n, d = stack.pop()
+            out[id(n)] = d
+            if not n.children:
+                continue
+            lab, keys = b.labels(n.split_attr, n.split_value, d.rows)
+            parts = b.distribute(d.rows, d.w, lab, len(keys))
+            for key, ch in n.children.items():
+                v = 0 if key == "<=" else 1
+                if n.split_type == "eq":
+                    v = int(np.searchsorted(b.categories[n.split_attr], key))
+                r, w = parts[v]
+                stack.append((ch, _Rows(r, {}, w)))
+        return out
+
+    def _estimate(self, top: Node, data: _Rows, cf: float) -> float:
+        """Erros estimados da subárvore `top` se recebesse as linhas `data`, sem alterá-la."""
+        total = 0.0
+        routed = self._route(top, data)
+        b = self._backend
+        code = {c: k for k, c in enumerate(b.classes)}
+        for n in iter_preorder(top):
+            if n.children:
+                continue
+            d = routed[id(n)]
+            hit = b.y[d.rows] == code.get(n.predicted_class, -1)
+            hits = int(np.count_nonzero(hit)) if d.w is None else float(d.w[hit].sum())
+            total += pessimistic_errors(b.size(d), b.size(d) - hits, cf)
+        return total
+
+    def _raise(self, n: Node, largest: Node, rows_at: Dict[int, _Rows]) -> None:
+        """Substitui `n` pela subárvore `largest`, redistribuindo os casos de `n`."""
+        data = rows_at[id(n)]
+        depth = n.depth
+        for k, v in vars(largest).items():
+            setattr(n, k, v)
+        routed = self._route(n, data)
+        rows_at.update(routed)
+        b = self._backend
+        for m in iter_preorder(n):
+            if m is not n:
+                m.depth -= 1
+            d = routed[id(m)]
+            m.samples = b.size(d)
+            m.class_counts = b.class_counts(d)
+            m.entropy = entropy(m.class_counts)
+            if m.is_leaf() and m.class_counts:
+                m.predicted_class = max(m.class_counts.items(), key=lambda kv: kv[1])[0]
+        n.depth = depth
 
     # -------------------
     # Regras (base de regras)
     # -------------------
     def extract_rules(self) -> List[Dict[str, Any]]:
+        return list(self.iter_rules())
+
+    def iter_rules(self, copy: bool = True) -> Iterator[Dict[str, Any]]:
+        """Regras de extract_rules uma a uma (common.export.iter_rules)."""
         assert self.root is not None
+        return iter_rules(self.root, lambda n, val: n.branch(val), copy)
+
+    def simplify_rules(self, cf: float = 0.25) -> List[Dict[str, Any]]:
+        """Pós-processamento no estilo C4.5rules sobre as regras de extract_rules.
+
+        - a cobertura de cada condição distinta nas linhas de treino é pré-calculada uma
+          vez como bitset; avaliar uma regra é um AND dos bitsets mais um popcount;
+        - em cada regra, remove gulosamente a condição cuja retirada dá a menor taxa de
+          erro pessimista (pessimistic_errors / n), enquanto ela não piorar;
+        - regras com as mesmas condições são fundidas, ficando a de menor taxa de erro
+          (com classes diferentes, a segunda nunca seria aplicada); as classes são ordenadas pelo número de
+          falsos positivos de suas regras (menos primeiro) e, dentro da classe, as regras
+          pela taxa de erro;
+        - a última regra, sem condições, é a classe padrão: a majoritária entre as linhas
+          não cobertas por nenhuma regra.
+
+        As regras são aplicadas em ordem (vale a primeira que cobrir a linha).
+        """
+        assert self.root is not None and self._backend is not None
+        if not 0.0 < cf < 1.0:
+            raise ValueError(f"cf deve estar em (0, 1): {cf!r}")
+        b = self._backend
+        n = len(b.y)
+        code = {c: k for k, c in enumerate(b.classes)}
+        class_bits = [bitset.pack(b.y == k) for k in range(b.k)]
+
+        cover: Dict[Tuple[str, str, Any], np.ndarray] = {}
+
+        def bits(cond: Tuple[str, str, Any]) -> np.ndarray:
+            if cond not in cover:
+                attr, op, v = cond
+                if op == "=":
+                    j = np.flatnonzero(b.categories[attr] == v)
+                    mask = b.codes[attr] == (j[0] if len(j) else -2)
+                elif op == "<=":
+                    mask = b.x[attr] <= v
+                else:
+                    mask = b.x[attr] > v
+                cover[cond] = bitset.pack(mask)
+            return cover[cond]
+
+        def rate(cov: np.ndarray, k: int) -> float:
+            m = bitset.popcount(cov)
+            if m == 0:
+                return math.inf
+            e = m - bitset.popcount(cov & class_bits[k])
+            return pessimistic_errors(m, e, cf) / m
+
+        # conjunto de condições -> (condições, classe, taxa de erro)
+        simplified: Dict[frozenset, Tuple[List, str, float]] = {}
+        for r in self.extract_rules():
+            k = code.get(r["predicted_class"], 0)
+            conds = list(r["conditions"])
+            sets = [bits(c) for c in conds]
+            cur = rate(bitset.and_all(sets, n), k)
+            while conds:
+                # AND de todas as condições exceto i, via prefixos e sufixos
+                prefix = [bitset.full(n)]
+                for st in sets:
+                    prefix.append(prefix[-1] & st)
+                suffix = [bitset.full(n)]
+                for st in reversed(sets):
+                    suffix.append(suffix[-1] & st)
+                suffix.reverse()
+                best_i, best = -1, cur
+                for i in range(len(sets)):
+                    e_i = rate(prefix[i] & suffix[i + 1], k)
+                    if e_i <= best:
+                        best_i, best = i, e_i
+                if best_i < 0:
+                    break
+                del conds[best_i], sets[best_i]
+                cur = best
+            key = frozenset(conds)
+            if key not in simplified or cur < simplified[key][2]:
+                simplified[key] = (conds, r["predicted_class"], cur)
+
+        # ordem das classes: menos falsos positivos primeiro
+        by_class: Dict[str, List[Tuple[List, float]]] = {}
+        for conds, cls, err in simplified.values():
+            by_class.setdefault(cls, []).append((conds, err))
+        fp: Dict[str, int] = {}
+        covered = np.zeros_like(class_bits[0])
+        for cls, items in by_class.items():
+            union = np.zeros_like(class_bits[0])
+            for conds, _ in items:
+                union |= bitset.and_all([bits(c) for c in conds], n)
+            covered |= union
+            fp[cls] = bitset.popcount(union & ~class_bits[code[cls]])
+            items.sort(key=lambda it: it[1])
 
         rules: List[Dict[str, Any]] = []
-        N_total = max(1, self.root.samples)
-
-        def dfs(n: Node, conditions: List[Tuple[str, str, Any]]):
-            if n.is_leaf():
-                n_samples = n.samples
-                cc = n.class_counts
-                y = n.predicted_class or (max(cc, key=lambda k: cc[k]) if cc else "?")
-                hits = cc.get(y, 0) if cc else 0
-                confidence = (hits / n_samples) if n_samples > 0 else 0.0
-                support = (n_samples / N_total) if N_total > 0 else 0.0
-                rules.append(
-                    {
-                        "conditions": list(conditions),
-                        "predicted_class": y,
-                        "n": n_samples,
-                        "class_counts": cc,
-                        "support": support,
-                        "confidence": confidence,
-                        "hits": hits,
-                    }
-                )
-                return
-            split_attr = n.split_attr or "?"
-            for val, ch in n.children.items():
-                dfs(ch, conditions + [(split_attr, "=", val)])
-
-        dfs(self.root, [])
+        for cls in sorted(by_class, key=lambda c: (fp[c], c)):
+            for conds, err in by_class[cls]:
+                cov = bitset.and_all([bits(c) for c in conds], n)
+                rules.append(self._rule_stats(conds, cls, cov, err))
+        rest = bitset.unpack(~covered, n)
+        pool = np.flatnonzero(rest) if rest.any() else np.arange(n)
+        default = str(b.classes[np.bincount(b.y[pool], minlength=b.k).argmax()])
+        k = code[default]
+        cov = bitset.full(n)
+        rules.append(self._rule_stats([], default, cov, rate(cov, k)))
         return rules
 
-    def export_rules_txt(self, out_path: str) -> None:
+    def _rule_stats(
+        self, conds: List, cls: str, cov: np.ndarray, err: float
+    ) -> Dict[str, Any]:
+        b = self._backend
+        rows = np.flatnonzero(bitset.unpack(cov, len(b.y)))
+        cc = b._counts(rows)
+        m = len(rows)
+        hits = cc.get(cls, 0)
+        return {
+            "conditions": list(conds),
+            "predicted_class": cls,
+            "n": m,
+            "class_counts": cc,
+            "support": m / max(1, len(b.y)),
+            "confidence": hits / m if m else 0.0,
+            "hits": hits,
+            "error": err,
+        }
+
+    def export_rules_txt(
+        self,
+        out_path: str,
+        rules: Optional[List[Dict[str, Any]]] = None,
+        title: str = "Base de regras (C4.5)",
+    ) -> None:
+        """Escreve as regras no arquivo à medida que são geradas (rules=None: as da
+        árvore, sem montar a lista)."""
         assert self.root is not None
-        rules = self.extract_rules()
-        lines: List[str] = []
-        lines.append(f"# Base de regras (C4.5) — alvo: {self.target}")
-        lines.append(f"# Total de amostras de treino: {self.root.samples}")
-        for i, r in enumerate(rules, start=1):
-            conds = (
-                " E ".join([f"{a} {op} {v}" for (a, op, v) in r["conditions"]])
-                or "(sempre)"
-            )
-            cls = r["predicted_class"]
-            n = r["n"]
-            sup = r["support"] * 100.0
-            conf = r["confidence"] * 100.0
-            dist = ", ".join(f"{k}:{v}" for k, v in r["class_counts"].items())
-            lines.append(
-                f"Regra {i}: SE {conds} ENTÃO {self.target} = {cls} (n={n}, suporte={sup:.2f}%, confiança={conf:.2f}%, dist=[{dist}])"
-            )
+        lines = rule_lines(
+            self.iter_rules(copy=False) if rules is None else rules,
+            title,
+            self.target,
+            self.root.samples,
+            fmt_count=_num,
+        )
         os.makedirs(os.path.dirname(out_path), exist_ok=True)
         with open(out_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines) + "\n")
-
-    def _build(self, df: pd.DataFrame, features: List[str], depth: int) -> Node:
-        counts = class_distribution(df, self.target)
+            write_lines(f, lines)
+
+    def _candidates(self, features: List[str]) -> List[str]:
+        """Atributos avaliados no nó: todos, ou o sorteio de max_features."""
+        return features if self._sampler is None else self._sampler(features)
+
+    def _expand(self, backend, data, features: List[str], depth: int, announce):
+        """Cria o nó de `data` e devolve as tarefas dos filhos (sem recursão)."""
+        tr = self.trace
+        if announce is not None and tr.enabled:
+            tr.emit("child", **announce)
+        counts = backend.class_counts(data)
         node_entropy = entropy(counts)
         node = Node(
-            depth=depth, samples=len(df), class_counts=counts, entropy=node_entropy
-        )
-
-        print("\n" + "-" * 80)
-        print(f"Nó (profundidade={depth})")
-        print(
-            f"Amostras: {node.samples} | Distribuição: {counts} | Entropia: {node_entropy:.4f}"
+            depth=depth,
+            samples=backend.size(data),
+            class_counts=counts,
+            entropy=node_entropy,
         )
+        audit = self.audit_
+        if audit is not None:
+            node.node_id = audit.new_node()
+
+        if tr.enabled:
+            tr.emit(
+                "node",
+                depth=depth,
+                samples=node.samples,
+                counts=counts,
+                entropy=node_entropy,
+            )
 
         if node_entropy == 0.0:
             node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
-            print(f"Folha pura: classe={node.predicted_class}")
-            return node
+            if tr.enabled:
+                tr.emit("leaf", reason="pure", cls=node.predicted_class)
+            return node, []
         if not features:
             node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
-            print(f"Folha (sem atributos): classe majoritária={node.predicted_class}")
-            return node
+            if tr.enabled:
+                tr.emit("leaf", reason="no_attrs", cls=node.predicted_class)
+            return node, []
 
         best_attr = None
         best_gr = -1.0
         best_ig = 0.0
         best_si = 0.0
-        best_details: Dict[Any, Dict[str, Any]] = {}
-        for attr in features:
-            ig, si, details = info_gain_and_splitinfo(df, attr, self.target)
+        best_t: Optional[float] = None
+        for attr, ig, si, details, t in backend.score(
+            data, self._candidates(features), counts
+        ):
             gr = 0.0 if si <= 1e-12 else (ig / si)
-            node.tested_attrs.append((attr, ig, si, details))
-            print(
-                f"\nAtributo '{attr}': IG={ig:.6f} | SplitInfo={si:.6f} | GainRatio={gr:.6f}"
-            )
-            for v, d in details.items():
-                print(
-                    f"  - {attr} = {v} -> n={d['n']}, dist={d['class_counts']}, H={d['entropy']:.4f}, peso={d['weight']:.3f}"
+            if audit is not None:
+                audit.add_branches(node.node_id, attr, ig, details, split_info=si, threshold=t)
+            if tr.enabled:
+                tr.emit(
+                    "attr", attr=attr, ig=ig, si=si, gr=gr, details=details, threshold=t
                 )
             if gr > best_gr or (
                 math.isclose(gr, best_gr, rel_tol=1e-12)
                 and (best_attr is None or attr < best_attr)
             ):
-                best_attr, best_gr, best_ig, best_si, best_details = (
-                    attr,
-                    gr,
-                    ig,
-                    si,
-                    details,
-                )
+                best_attr, best_gr, best_ig, best_si, best_t = attr, gr, ig, si, t
 
         if best_attr is None or best_gr <= 0.0:
             node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
-            print(f"Folha (GainRatio<=0): classe majoritária={node.predicted_class}")
-            return node
+            if tr.enabled:
+                tr.emit("leaf", reason="no_gain", cls=node.predicted_class)
+            return node, []
 
         node.split_attr = best_attr
+        if best_t is not None:
+            node.split_type = "le"
+            node.split_value = best_t
         node.split_gr = float(best_gr)
         node.split_ig = float(best_ig)
         node.split_si = float(best_si)
-        print(
-            f"\n=> Escolhido split por '{best_attr}' (GainRatio={best_gr:.6f}, IG={best_ig:.6f}, SI={best_si:.6f})"
-        )
-
-        remaining = [a for a in features if a != best_attr]
-        for v, df_child in df.groupby(best_attr):
-            print(f"  Gerando filho para {best_attr} = {v} (n={len(df_child)})")
-            child = self._build(
-                df_child.drop(columns=[best_attr]), remaining, depth + 1
+        if tr.enabled:
+            tr.emit(
+                "split",
+                attr=best_attr,
+                gr=best_gr,
+                ig=best_ig,
+                si=best_si,
+                threshold=best_t,
             )
-            node.children[v] = child
 
-        return node
-
-    def export_dot(self) -> str:
-        assert self.root is not None
-        lines: List[str] = [
-            "digraph C45 {",
-            "  node [shape=box, style=rounded, fontsize=10];",
-        ]
-        _id = [0]
+        # atributos categóricos saem do conjunto; numéricos podem ser testados de novo
+        remaining = (
+            features if best_t is not None else [a for a in features if a != best_attr]
+        )
+        tasks = []
+        for v, child_data in backend.partition(data, best_attr, best_t):
+            announce = None
+            if tr.enabled:
+                announce = dict(
+                    attr=best_attr,
+                    value=v,
+                    n=backend.size(child_data),
+                    threshold=best_t,
+                )
+            tasks.append((v, (child_data, remaining, depth + 1, announce)))
 
-        def nid() -> int:
-            _id[0] += 1
-            return _id[0]
+        return node, tasks
 
-        def esc(s: str) -> str:
-            return str(s).replace("\n", "\\n").replace('"', '\\"')
+    def iter_dot(self) -> Iterator[str]:
+        assert self.root is not None
 
         def label(n: Node) -> str:
-            dist_str = ", ".join(f"{k}:{v}" for k, v in n.class_counts.items())
+            dist_str = ", ".join(f"{k}:{_num(v)}" for k, v in n.class_counts.items())
             if n.is_leaf():
-                return esc(
-                    f"Leaf\\nN={n.samples}\\nH={n.entropy:.3f}\\n[{dist_str}]\\nClass={n.predicted_class}"
+                return dot_escape(
+                    f"Leaf\\nN={_num(n.samples)}\\nH={n.entropy:.3f}\\n[{dist_str}]\\nClass={n.predicted_class}"
                 )
-            return esc(
-                f"N={n.samples} H={n.entropy:.3f}\\n[{dist_str}]\\nSplit: {n.split_attr}\\nGR={n.split_gr:.3f} (IG={n.split_ig:.3f}, SI={n.split_si:.3f})"
+            return dot_escape(
+                f"N={_num(n.samples)} H={n.entropy:.3f}\\n[{dist_str}]\\nSplit: {n.split_label()}\\nGR={n.split_gr:.3f} (IG={n.split_ig:.3f}, SI={n.split_si:.3f})"
             )
 
-        def walk(n: Node) -> int:
-            i = nid()
-            lines.append(f'  n{i} [label="{label(n)}"];')
-            if not n.is_leaf():
-                for val, ch in n.children.items():
-                    j = walk(ch)
-                    lines.append(f'  n{i} -> n{j} [label="{esc(val)}"];')
-            return i
+        return dot_lines(
+            self.root, "C45", label, lambda n, val: dot_escape(n.branch_label(val))
+        )
 
-        walk(self.root)
-        lines.append("}")
-        return "\n".join(lines)
+    def export_dot(self) -> str:
+        return "\n".join(self.iter_dot())
 
-    def plot_png(self, out_path: str) -> None:
-        assert self.root is not None
+    def write_dot(self, out_path: str) -> None:
+        """DOT escrito direto no arquivo, linha a linha."""
+        with open(out_path, "w", encoding="utf-8") as f:
+            write_lines(f, self.iter_dot(), end="")
 
-        def subtree_leaves(n: Node) -> int:
-            if n.is_leaf() or not n.children:
-                return 1
-            return sum(subtree_leaves(ch) for ch in n.children.values())
+    def _drawing(self) -> TreeDrawing:
+        """Layout da árvore (common.render) com os textos de cada nó e aresta."""
+        assert self.root is not None
 
         def annotate(n: Node) -> str:
-            dist_str = ", ".join(f"{k}:{v}" for k, v in n.class_counts.items())
+            dist_str = ", ".join(f"{k}:{_num(v)}" for k, v in n.class_counts.items())
             if n.is_leaf():
-                return f"Leaf\nN={n.samples}\nH={n.entropy:.3f}\n[{dist_str}]\nClass={n.predicted_class}"
-            return f"N={n.samples} H={n.entropy:.3f}\n[{dist_str}]\nSplit: {n.split_attr}\nGR={n.split_gr:.3f} (IG={n.split_ig:.3f}, SI={n.split_si:.3f})"
-
-        x_gap = 1.0
-        y_gap = 1.5
-
-        positions: Dict[int, Tuple[float, float]] = {}
-
-        def assign_pos(
-            n: Node, depth: int, x_start: float
-        ) -> Tuple[float, float, float]:
-            width = subtree_leaves(n)
-            x_center = x_start + (width - 1) * x_gap / 2.0
-            y = -depth * y_gap
-            positions[id(n)] = (x_center, y)
-            cur_x = x_start
-            for ch in n.children.values():
-                ch_w = subtree_leaves(ch)
-                assign_pos(ch, depth + 1, cur_x)
-                cur_x += ch_w * x_gap
-            return x_center, y, width
-
-        assign_pos(self.root, 0, 0.0)
-
-        def walk_nodes(n: Node):
-            yield n
-            for ch in n.children.values():
-                yield from walk_nodes(ch)
-
-        fig_h = max(3, (max(nn.depth for nn in walk_nodes(self.root)) + 1) * 1.8)
-        fig_w = max(6, subtree_leaves(self.root) * 1.2)
-        fig, ax = plt.subplots(figsize=(fig_w, fig_h))
-        ax.axis("off")
-
-        def draw_edges(n: Node):
-            x0, y0 = positions[id(n)]
-            for val, ch in n.children.items():
-                x1, y1 = positions[id(ch)]
-                ax.plot([x0, x1], [y0 - 0.1, y1 + 0.1], color="#555", linewidth=1)
-                mx, my = (x0 + x1) / 2.0, (y0 + y1) / 2.0
-                ax.text(
-                    mx,
-                    my,
-                    str(val),
-                    fontsize=8,
-                    ha="center",
-                    va="center",
-                    bbox=dict(fc="white", ec="none", alpha=0.7),
-                )
-                draw_edges(ch)
-
-        def draw_nodes(n: Node):
-            x, y = positions[id(n)]
-            text = annotate(n)
-            bbox_props = dict(
-                boxstyle="round,pad=0.3",
-                fc="#FFF3E0" if not n.is_leaf() else "#E8F5E9",
-                ec="#90A4AE",
-            )
-            ax.text(x, y, text, fontsize=8, ha="center", va="center", bbox=bbox_props)
-            for ch in n.children.values():
-                draw_nodes(ch)
+                return f"Leaf\nN={_num(n.samples)}\nH={n.entropy:.3f}\n[{dist_str}]\nClass={n.predicted_class}"
+            return f"N={_num(n.samples)} H={n.entropy:.3f}\n[{dist_str}]\nSplit: {n.split_label()}\nGR={n.split_gr:.3f} (IG={n.split_ig:.3f}, SI={n.split_si:.3f})"
 
-        draw_edges(self.root)
-        draw_nodes(self.root)
-        plt.tight_layout()
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        fig.savefig(out_path, dpi=160)
-        plt.close(fig)
+        return layout_tree(self.root, annotate, lambda n, val: n.branch_label(val), y_gap=1.5)
+
+    def plot_png(self, out_path: str) -> None:
+        draw_png(self._drawing(), out_path, internal_color="#FFF3E0")
+
+    def plot_svg(self, out_path: str) -> None:
+        """SVG escrito direto no arquivo, sem matplotlib (árvores grandes)."""
+        write_svg(self._drawing(), out_path, internal_color="#FFF3E0")
+
+
+def _window_arg(text: str) -> Union[float, int]:
+    """--window: "0.3" e "1.0" são frações (float); "500" é um nº de linhas (int)."""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
 
 
 def main():
@@ -378,12 +1334,77 @@ def main():
         default=DEFAULT_DATASET_PATH,
         help="Caminho para o CSV (padrão: data/dataset1.csv)",
     )
+    parser.add_argument(
+        "--target",
+        default="Risco",
+        help="Coluna alvo (padrão: Risco; use Target para data/dataset2.csv)",
+    )
     parser.add_argument(
         "--no_png", action="store_true", help="Não salvar PNG da árvore"
     )
     parser.add_argument(
         "--no_dot", action="store_true", help="Não salvar DOT da árvore"
     )
+    parser.add_argument(
+        "--quiet", action="store_true", help="Não exibir os cálculos por nó"
+    )
+    parser.add_argument(
+        "--trace_jsonl",
+        default=None,
+        help="Grava os eventos do build em JSONL (um registro por linha) em vez de imprimir",
+    )
+    parser.add_argument(
+        "--save_model",
+        default=None,
+        help="Grava a árvore treinada no formato binário (common.model_io)",
+    )
+    parser.add_argument(
+        "--simplify_rules",
+        action="store_true",
+        help="Gera também rules_c45rules.txt, com as regras simplificadas (C4.5rules)",
+    )
+    parser.add_argument(
+        "--window",
+        type=_window_arg,
+        default=None,
+        help="Windowing do C4.5: tamanho da janela inicial (com ponto, fração em"
+        " (0, 1]; inteiro, nº de linhas)",
+    )
+    parser.add_argument(
+        "--window_increment",
+        type=int,
+        default=None,
+        help="Máximo de linhas mal classificadas adicionadas por iteração (padrão: 20%% da janela)",
+    )
+    parser.add_argument(
+        "--cf",
+        type=float,
+        default=None,
+        help="Poda por erro pessimista com este fator de confiança (ex.: 0.25; padrão: sem poda)",
+    )
+    parser.add_argument(
+        "--raising",
+        action="store_true",
+        help="Com --cf, considera também o subtree raising",
+    )
+    parser.add_argument(
+        "--forest",
+        type=int,
+        default=None,
+        help="Treina também uma floresta aleatória com este número de árvores e mostra a acurácia out-of-bag",
+    )
+    parser.add_argument(
+        "--n_jobs",
+        type=int,
+        default=None,
+        help="Processos para a floresta de --forest (padrão: núcleos disponíveis; 1 = em série)",
+    )
+    parser.add_argument(
+        "--node_jobs",
+        type=int,
+        default=None,
+        help="Avalia em paralelo os atributos candidatos dos nós grandes com este número de trabalhadores (padrão: em série)",
+    )
     args = parser.parse_args()
 
     csv_path = args.data
@@ -393,38 +1414,96 @@ def main():
 
     print(f"Lendo dataset: {csv_path}")
     df = pd.read_csv(csv_path)
-    if "Risco" not in df.columns:
-        raise ValueError("Coluna alvo 'Risco' não encontrada.")
+    target = args.target
+    if target not in df.columns:
+        raise ValueError(f"Coluna alvo '{target}' não encontrada.")
     if "ID" in df.columns:
         df = df.drop(columns=["ID"])  # ID não é atributo
 
-    target = "Risco"
     features = [c for c in df.columns if c != target]
     print("Atributos:")
     for f in features:
-        print(f"- {f} -> valores: {sorted(df[f].dropna().unique().tolist())}")
-
-    tree = C45DecisionTree(target=target)
-    tree.fit(df, features)
+        if pd.api.types.is_numeric_dtype(df[f]):
+            print(f"- {f} -> numérico: [{df[f].min()}, {df[f].max()}]")
+        else:
+            print(f"- {f} -> valores: {sorted(df[f].dropna().unique().tolist())}")
+
+    trace = make_trace(TERMINAL_FORMATS, quiet=args.quiet, jsonl_path=args.trace_jsonl)
+    executor = NodeExecutor(args.node_jobs) if args.node_jobs else None
+    tree = C45DecisionTree(target=target, trace=trace, executor=executor)
+    try:
+        tree.fit(
+            df, features, window=args.window, window_increment=args.window_increment
+        )
+        if tree.windowing_ is not None:
+            print(
+                f"\nWindowing: {tree.windowing_['iterations']} iterações, "
+                f"janela final com {tree.windowing_['window_size']} de {len(df)} linhas"
+            )
+        if args.cf is not None:
+            removed = tree.prune(cf=args.cf, subtree_raising=args.raising)
+            print(f"\nPoda (CF={args.cf:g}): {removed} nós removidos")
+    finally:
+        trace.close()
+        if tree.executor is not None:
+            tree.executor.close()
 
     out_dir = os.path.dirname(__file__)
     if not args.no_dot:
-        dot_text = tree.export_dot()
         dot_path = os.path.join(out_dir, "tree_c45.dot")
-        with open(dot_path, "w", encoding="utf-8") as f:
-            f.write(dot_text)
+        tree.write_dot(dot_path)
         print(f"DOT salvo em: {dot_path}")
 
     if not args.no_png:
         png_path = os.path.join(out_dir, "tree_c45.png")
-        tree.plot_png(png_path)
-        print(f"PNG salvo em: {png_path}")
+        try:
+            tree.plot_png(png_path)
+            print(f"PNG salvo em: {png_path}")
+        except PngTooLargeError as e:
+            svg_path = os.path.join(out_dir, "tree_c45.svg")
+            tree.plot_svg(svg_path)
+            print(f"{e}\nSVG salvo em: {svg_path}")
 
     # Exporta base de regras
     rules_path = os.path.join(out_dir, "rules_c45.txt")
     tree.export_rules_txt(rules_path)
     print(f"Regras salvas em: {rules_path}")
 
+    if args.save_model:
+        tree.save(args.save_model)
+        print(f"Modelo salvo em: {args.save_model}")
+
+    if args.simplify_rules:
+        simple = tree.simplify_rules(cf=args.cf if args.cf is not None else 0.25)
+        simple_path = os.path.join(out_dir, "rules_c45rules.txt")
+        tree.export_rules_txt(
+            simple_path, rules=simple, title="Base de regras simplificada (C4.5rules)"
+        )
+        print(
+            f"Regras simplificadas ({len(simple) - 1} de {len(tree.extract_rules())}, "
+            f"mais a regra padrão) salvas em: {simple_path}"
+        )
+        # a base de regras pontuada por si só (índice por atributo, sem a árvore)
+        # classes das regras são str (o backend converte o alvo); a última é a padrão
+        index = RuleIndex(simple, default=simple[-1]["predicted_class"])
+        hits = index.predict(df) == df[target].astype(str).to_numpy()
+        print(f"Acurácia da base simplificada no treino: {hits.mean():.4f}")
+
+    if args.forest:
+        # bagging + sorteio de atributos por nó, árvores em paralelo (common.forest)
+        forest = RandomForest(
+            C45DecisionTree,
+            target,
+            n_estimators=args.forest,
+            oob_score=True,
+            n_jobs=args.n_jobs,
+        ).fit(df, features)
+        oob = forest.oob_score_
+        print(
+            f"Floresta aleatória ({args.forest} árvores): acurácia out-of-bag "
+            + ("indisponível" if oob is None else f"{oob:.4f}")
+        )
+
 
 if __name__ == "__main__":
     main()
@@ -4,14 +4,24 @@
 O script:
 - Lê data/dataset1.csv (classe alvo: 'Risco', ignora coluna 'ID');
 - Constrói a árvore com o algoritmo CART (impureza de Gini) suportando atributos numéricos e categóricos;
-  - para atributos numéricos testa thresholds entre valores adjacentes;
-  - para atributos categóricos testa splits binários do tipo (attr == valor) vs (attr != valor);
+  - para atributos numéricos testa thresholds entre valores adjacentes (uma ordenação e
+    uma varredura de contagens acumuladas por atributo e nó);
+  - para atributos categóricos testa splits binários do tipo (attr == valor) vs (attr != valor)
+    ou, com --categorical subset, (attr ∈ S) vs restante, avaliando só os prefixos da
+    ordenação das categorias por proporção de classe (Breiman);
+  - com --splitter hist, cada atributo numérico é quantizado uma vez em até --max_bins
+    faixas (matriz uint8) e os splits saem dos histogramas do nó; o histograma do filho
+    maior é obtido por subtração (pai - irmão) e o script informa a diferença de
+    acurácia em relação ao modo exato;
+- Opcionalmente poda a árvore por custo-complexidade (elo mais fraco), com alfa fixo ou
+  escolhido por validação cruzada;
 - Exibe no terminal TODOS os cálculos por nó:
   - distribuição de classes, gini do nó;
   - para cada atributo candidato: gini(s) dos filhos, gini ponderada e redução de gini (Gini decrease);
   - split escolhido e divisão (atributo + threshold/valor);
 - Gera:
-  - uma imagem PNG `tree_cart.png` desenhada com matplotlib;
+  - uma imagem PNG `tree_cart.png` desenhada com matplotlib (ou `tree_cart.svg`, se
+    a árvore for larga demais para um PNG legível);
   - um arquivo DOT `tree_cart.dot` (pode ser renderizado com Graphviz, opcional).
 
 Execução:
@@ -19,8 +29,21 @@ Execução:
 
 Parâmetros opcionais:
   --data <caminho_csv> (padrão: data/dataset1.csv)
+  --target <coluna> (padrão: Risco; ex.: Target para data/dataset2.csv)
   --no_png (não salvar PNG)
   --no_dot (não salvar DOT)
+  --quiet (não exibir os cálculos por nó)
+  --categorical subset (splits categóricos por subconjunto, ordenação de Breiman)
+  --splitter hist (splits por histograma) e --max_bins <n> (padrão: 255)
+  --max_leaves <n>, --min_impurity_decrease <x>, --time_budget <s> (crescimento
+    best-first, sempre expandindo a folha de maior redução de impureza)
+  --ccp_alpha <alfa> (poda por custo-complexidade) ou --ccp_cv <k> [--n_jobs <n>]
+    (alfa escolhido por validação cruzada k-fold, folds em paralelo)
+  --forest <n> [--n_jobs <n>] (floresta aleatória de n árvores em paralelo; mostra a
+    acurácia out-of-bag)
+  --node_jobs <n> (avalia os atributos candidatos dos nós grandes em paralelo)
+  --trace_jsonl <caminho> (grava os eventos do build em JSONL em vez de imprimir)
+  --save_model <caminho> (grava a árvore no formato binário mapeável; ver load())
 
 Requisitos: pandas, matplotlib, numpy (listar em requirements.txt se necessário)
 """
@@ -28,17 +51,48 @@ Requisitos: pandas, matplotlib, numpy (listar em requirements.txt se necessário
 from __future__ import annotations
 
 import argparse
+import heapq
 import math
 import os
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
 try:
     from activity1.common import get_repo_root, get_data_path
+    from activity1.common.audit import SplitAudit
+    from activity1.common.binning import MAX_BINS, MISSING_BIN, quantize
+    from activity1.common.encoding import class_first_occurrence, ordered_class_counts
+    from activity1.common.codegen import build_predictor
+    from activity1.common.export import (
+        dot_escape,
+        dot_lines,
+        iter_rules,
+        rule_lines,
+        write_lines,
+    )
+    from activity1.common.forest import FeatureSampler, RandomForest
+    from activity1.common.model_io import load_tree, save_tree
+    from activity1.common.parallel import NodeExecutor, is_parallel, map_tasks
+    from activity1.common.render import (
+        PngTooLargeError,
+        TreeDrawing,
+        draw_png,
+        layout_tree,
+        write_svg,
+    )
+    from activity1.common.tree import TreeArrays, compile_nodes
+    from activity1.common.trace import NULL_TRACE, make_trace
+    from activity1.common.traversal import (
+        grow,
+        grow_best_first,
+        iter_postorder,
+        iter_preorder,
+    )
 except Exception:
     import sys as _sys, os as _os
 
@@ -46,6 +100,35 @@ except Exception:
         _os.path.abspath(_os.path.join(_os.path.dirname(__file__), "..", "..", ".."))
     )
     from activity1.common import get_repo_root, get_data_path
+    from activity1.common.audit import SplitAudit
+    from activity1.common.binning import MAX_BINS, MISSING_BIN, quantize
+    from activity1.common.encoding import class_first_occurrence, ordered_class_counts
+    from activity1.common.codegen import build_predictor
+    from activity1.common.export import (
+        dot_escape,
+        dot_lines,
+        iter_rules,
+        rule_lines,
+        write_lines,
+    )
+    from activity1.common.forest import FeatureSampler, RandomForest
+    from activity1.common.model_io import load_tree, save_tree
+    from activity1.common.parallel import NodeExecutor, is_parallel, map_tasks
+    from activity1.common.render import (
+        PngTooLargeError,
+        TreeDrawing,
+        draw_png,
+        layout_tree,
+        write_svg,
+    )
+    from activity1.common.tree import TreeArrays, compile_nodes
+    from activity1.common.trace import NULL_TRACE, make_trace
+    from activity1.common.traversal import (
+        grow,
+        grow_best_first,
+        iter_postorder,
+        iter_preorder,
+    )
 
 
 DEFAULT_DATASET_PATH = get_data_path("dataset1.csv")
@@ -101,6 +184,434 @@ def evaluate_binary_split(
     return g_weighted, details
 
 
+def _ordered_counts(counts: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """Ordem das classes de cada linha como em value_counts: contagem decrescente,
+    depois primeira aparição (classes ausentes vão para o fim)."""
+    n = int(first.max()) + 2 if first.size else 1
+    key = np.where(counts > 0, -counts * n + first, n * n)
+    return np.argsort(key, axis=1, kind="stable")
+
+
+def _gini_rows(counts: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """Gini de cada linha de contagens, somando p² na ordem `order` — as mesmas operações
+    de ponto flutuante de gini() sobre o dict ordenado, logo o mesmo resultado bit a bit."""
+    n = counts.sum(axis=1)
+    p = np.take_along_axis(counts, order, axis=1) / np.maximum(n, 1)[:, None]
+    s = np.zeros(len(counts))
+    for j in range(counts.shape[1]):
+        s = s + p[:, j] * p[:, j]
+    return np.where(n > 0, 1.0 - s, 0.0)
+
+
+def numeric_split_sweep(x: np.ndarray, y: np.ndarray, n_classes: int):
+    """Avalia todos os limiares (pontos médios entre valores distintos) de um atributo
+    numérico com uma ordenação e uma varredura de contagens acumuladas.
+
+    x: valores do atributo no nó (NaN = ausente, fica fora dos dois lados, como no filtro
+    do DataFrame); y: códigos das classes. Devolve None se não há limiar, senão um dict
+    de vetores (um elemento por limiar, em ordem crescente): t, n_left, n_right,
+    left/right (contagens por classe), left_first/right_first (primeira posição de cada
+    classe no nó, para a ordem de value_counts), g_left, g_right, w_left, w_right e
+    g_weighted.
+    """
+    pos = np.flatnonzero(~np.isnan(x))
+    order = pos[np.argsort(x[pos], kind="stable")]
+    xs = x[order]
+    m = len(xs)
+    if m < 2:
+        return None
+    bounds = np.flatnonzero(xs[:-1] < xs[1:])
+    if not len(bounds):
+        return None
+    t = (xs[bounds] + xs[bounds + 1]) / 2.0
+    # linhas com x <= t (um ponto médio arredondado pode coincidir com o valor seguinte)
+    cut = np.searchsorted(xs, t, side="right")
+
+    onehot = np.zeros((m, n_classes), dtype=np.int64)
+    onehot[np.arange(m), y[order]] = 1
+    cum = np.cumsum(onehot, axis=0)
+    left = cum[cut - 1]
+    right = cum[-1] - left
+    big = np.iinfo(np.int64).max
+    first = np.where(onehot > 0, order[:, None], big)
+    pre = np.minimum.accumulate(first, axis=0)
+    suf = np.minimum.accumulate(first[::-1], axis=0)[::-1]
+    left_first = pre[cut - 1]
+    right_first = np.where(cut[:, None] < m, suf[np.minimum(cut, m - 1)], big)
+
+    n_left = cut
+    n_right = m - cut
+    g_left = _gini_rows(left, _ordered_counts(left, np.where(left > 0, left_first, 0)))
+    g_right = _gini_rows(
+        right, _ordered_counts(right, np.where(right > 0, right_first, 0))
+    )
+    w_left = n_left / m
+    w_right = n_right / m
+    return {
+        "t": t,
+        "n_left": n_left,
+        "n_right": n_right,
+        "left": left,
+        "right": right,
+        "left_first": left_first,
+        "right_first": right_first,
+        "g_left": g_left,
+        "g_right": g_right,
+        "w_left": w_left,
+        "w_right": w_right,
+        "g_weighted": w_left * g_left + w_right * g_right,
+    }
+
+
+def _subset_order(table: np.ndarray) -> np.ndarray:
+    """Ordem das categorias (linhas de `table`, todas presentes) para a busca por prefixos.
+
+    2 classes: proporção da primeira classe (a melhor partição é um prefixo dessa ordem,
+    Breiman et al.); mais classes: projeção das distribuições de classe na primeira
+    componente principal ponderada (heurística de Coppersmith et al.).
+    """
+    n_v = table.sum(axis=1)
+    prop = table / n_v[:, None]
+    if table.shape[1] <= 2:
+        score = prop[:, 0]
+    else:
+        mean = (n_v[:, None] * prop).sum(axis=0) / n_v.sum()
+        centered = prop - mean
+        cov = (n_v[:, None] * centered).T @ centered
+        score = centered @ np.linalg.eigh(cov)[1][:, -1]
+    return np.argsort(score, kind="stable")
+
+
+def categorical_subset_sweep(
+    codes: np.ndarray, n_values: int, y: np.ndarray, n_classes: int
+):
+    """Partições binárias (attr ∈ S) de um atributo categórico pelo truque de ordenação
+    de Breiman: só os k-1 prefixos da ordem de _subset_order são avaliados, em vez de
+    2^(k-1) subconjuntos.
+
+    codes: código de cada linha (-1 = ausente, vai sempre para a direita, como em
+    attr == v). Devolve None se há menos de 2 categorias, senão os mesmos vetores de
+    numeric_split_sweep, com "subsets" (códigos à esquerda, por prefixo) no lugar de "t".
+    """
+    m = len(codes)
+    valid = codes >= 0
+    flat = codes[valid] * n_classes + y[valid]
+    table = np.bincount(flat, minlength=n_values * n_classes).reshape(
+        n_values, n_classes
+    )
+    big = np.iinfo(np.int64).max
+    first = np.full(n_values * n_classes, big, dtype=np.int64)
+    np.minimum.at(first, flat, np.flatnonzero(valid))
+    first = first.reshape(n_values, n_classes)
+    present = np.flatnonzero(table.sum(axis=1))
+    if len(present) < 2:
+        return None
+    ordered = present[_subset_order(table[present])]
+
+    total = np.bincount(y, minlength=n_classes)
+    left = np.cumsum(table[ordered], axis=0)[:-1]
+    right = total - left
+    left_first = np.minimum.accumulate(first[ordered], axis=0)[:-1]
+    # primeira posição à direita: linhas das categorias restantes ou ausentes
+    miss_first = np.full(n_classes, big, dtype=np.int64)
+    np.minimum.at(miss_first, y[~valid], np.flatnonzero(~valid))
+    suf = np.minimum.accumulate(first[ordered][::-1], axis=0)[::-1][1:]
+    right_first = np.minimum(suf, miss_first)
+
+    n_left = left.sum(axis=1)
+    n_right = m - n_left
+    g_left = _gini_rows(left, _ordered_counts(left, np.where(left > 0, left_first, 0)))
+    g_right = _gini_rows(
+        right, _ordered_counts(right, np.where(right > 0, right_first, 0))
+    )
+    w_left = n_left / m
+    w_right = n_right / m
+    return {
+        "subsets": [np.sort(ordered[: i + 1]) for i in range(len(ordered) - 1)],
+        "n_left": n_left,
+        "n_right": n_right,
+        "left": left,
+        "right": right,
+        "left_first": left_first,
+        "right_first": right_first,
+        "g_left": g_left,
+        "g_right": g_right,
+        "w_left": w_left,
+        "w_right": w_right,
+        "g_weighted": w_left * g_left + w_right * g_right,
+    }
+
+
+def _sweep_details(sweep: Dict[str, Any], i: int, classes: np.ndarray) -> Dict[str, Any]:
+    """Detalhes do candidato i de uma varredura, no formato de evaluate_binary_split."""
+    return {
+        "n_left": int(sweep["n_left"][i]),
+        "n_right": int(sweep["n_right"][i]),
+        "left_counts": _counts_dict(sweep["left"][i], sweep["left_first"][i], classes),
+        "right_counts": _counts_dict(
+            sweep["right"][i], sweep["right_first"][i], classes
+        ),
+        "g_left": float(sweep["g_left"][i]),
+        "g_right": float(sweep["g_right"][i]),
+        "w_left": float(sweep["w_left"][i]),
+        "w_right": float(sweep["w_right"][i]),
+        "g_weighted": float(sweep["g_weighted"][i]),
+    }
+
+
+def _fmt_value(v: Any) -> str:
+    """Valor de um split para exibição (subconjuntos como {a, b})."""
+    if isinstance(v, tuple):
+        return "{" + ", ".join(str(x) for x in v) + "}"
+    return str(v)
+
+
+_SPLIT_OPS = {"le": "<=", "eq": "==", "in": "∈"}
+
+
+def _split_repr(node: "CARTNode") -> str:
+    return f"{node.split_attr} {_SPLIT_OPS[node.split_type]} {_fmt_value(node.split_value)}"
+
+
+# operadores das condições de regra nos ramos (esquerdo, direito)
+_BRANCH_OPS = {"le": ("<=", ">"), "in": ("∈", "∉")}
+
+
+def _branch_condition(node: "CARTNode", side: str) -> Tuple[str, str, Any]:
+    """Condição (attr, op, valor) do ramo "L" ou "R" de um nó interno."""
+    ops = _BRANCH_OPS.get(node.split_type, ("=", "!="))
+    return (node.split_attr, ops[side == "R"], node.split_value)
+
+
+def _pick_split(cands: List[Tuple[float, str, str, Any, Any]]):
+    """Melhor candidato (g_w, attr, tipo, valor, chave) com o mesmo critério do modo
+    exato: menor g_w; empates (isclose) pelo menor (attr, valor).
+
+    Só os candidatos próximos do mínimo podem vencer, então só eles passam pela
+    comparação sequencial.
+    """
+    if not cands:
+        return None
+    g_min = min(c[0] for c in cands)
+    best = None
+    for c in cands:
+        if c[0] > g_min * (1 + 1e-9):
+            continue
+        g_w, attr, kind, value, _ = c
+        key = (attr, value if kind == "le" else str(value))
+        if best is None or g_w < best[0][0] or (
+            math.isclose(g_w, best[0][0], rel_tol=1e-12) and key < best[1]
+        ):
+            best = (c, key)
+    return best[0]
+
+
+def _counts_dict(
+    counts: np.ndarray, first: np.ndarray, classes: np.ndarray
+) -> Dict[str, int]:
+    present = np.flatnonzero(counts > 0)
+    order = present[np.lexsort((first[present], -counts[present]))]
+    return {classes[c]: int(counts[c]) for c in order}
+
+
+# ---------------------------
+# Modo histograma
+# ---------------------------
+
+
+class _HistData:
+    """Tabela preparada uma única vez para o modo histograma.
+
+    - numéricos: colunas quantizadas em no máximo `max_bins` faixas, guardadas em uma
+      matriz uint8 (n_linhas × n_numéricos), com os cortes de cada atributo;
+    - categóricos: códigos inteiros (-1 = ausente);
+    - alvo: códigos das classes.
+
+    O histograma de um atributo em um nó é a tabela (faixa/categoria × classe) das
+    linhas do nó; a busca do split só olha esses histogramas, nunca as linhas.
+    """
+
+    def __init__(
+        self, df: pd.DataFrame, features: List[str], target: str, max_bins: int
+    ):
+        self.numeric = [a for a in features if pd.api.types.is_numeric_dtype(df[a])]
+        self.col = {a: j for j, a in enumerate(self.numeric)}
+        self.X = np.empty((len(df), len(self.numeric)), dtype=np.uint8)
+        self.cuts: Dict[str, np.ndarray] = {}
+        for a, j in self.col.items():
+            self.X[:, j], self.cuts[a] = quantize(
+                df[a].to_numpy(dtype=np.float64, na_value=np.nan), max_bins
+            )
+        self.codes: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, np.ndarray] = {}
+        for a in features:
+            if a not in self.col:
+                codes, uniques = pd.factorize(df[a], sort=True)
+                self.codes[a] = codes.astype(np.int64)
+                self.categories[a] = np.asarray(uniques, dtype=object)
+        y_codes, classes = pd.factorize(df[target].astype(str), sort=True)
+        self.y = y_codes.astype(np.int64)
+        self.classes = np.asarray(classes, dtype=object)
+        self.k = len(self.classes)
+
+    def n_bins(self, attr: str) -> int:
+        if attr in self.col:
+            return len(self.cuts[attr]) + 1
+        return len(self.categories[attr])
+
+    def histogram(self, rows: np.ndarray, attr: str) -> np.ndarray:
+        """Tabela (faixa/categoria × classe) das linhas `rows`; ausentes ficam de fora."""
+        nb = self.n_bins(attr)
+        yk = self.y[rows]
+        if attr in self.col:
+            codes = self.X[rows, self.col[attr]].astype(np.int64)
+            flat = codes * self.k + yk
+            h = np.bincount(flat, minlength=(MISSING_BIN + 1) * self.k)
+            return h[: nb * self.k].reshape(nb, self.k)
+        codes = self.codes[attr][rows]
+        valid = codes >= 0
+        flat = codes[valid] * self.k + yk[valid]
+        return np.bincount(flat, minlength=nb * self.k).reshape(nb, self.k)
+
+    def histograms(
+        self,
+        rows: np.ndarray,
+        features: List[str],
+        executor: Optional[NodeExecutor] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Histogramas dos atributos no nó; com o executor, um atributo por thread."""
+        tasks = [(rows, a) for a in features]
+        hists = map_tasks(executor, self.histogram, tasks, len(rows))
+        return dict(zip(features, hists))
+
+    def class_counts(self, rows: np.ndarray) -> Dict[str, int]:
+        y = self.y[rows]
+        return ordered_class_counts(
+            np.bincount(y, minlength=self.k), class_first_occurrence(y, self.k), self.classes
+        )
+
+    def split_mask(self, rows: np.ndarray, attr: str, kind: str, value: Any):
+        """(esquerda, direita) como máscaras sobre `rows`; numérico ausente não vai
+        para nenhum lado (como no filtro do modo exato)."""
+        if kind == "le":
+            b = self.X[rows, self.col[attr]]
+            left = b <= value
+            return left, ~left & (b != MISSING_BIN)
+        codes = self.codes[attr][rows]
+        left = np.isin(codes, value) if kind == "in" else codes == value
+        return left, ~left
+
+
+def _hist_candidates(
+    data: _HistData,
+    attr: str,
+    hist: np.ndarray,
+    total: np.ndarray,
+    categorical: str,
+):
+    """Candidatos de um atributo a partir do seu histograma no nó.
+
+    Devolve (tipo, [códigos/faixas por candidato], left, right), com left/right as
+    contagens por classe de cada candidato (linhas), ou None.
+    """
+    if attr in data.col:
+        if hist.shape[0] < 2:
+            return None
+        left = np.cumsum(hist, axis=0)[:-1]
+        right = hist.sum(axis=0) - left
+        ok = (left.sum(axis=1) > 0) & (right.sum(axis=1) > 0)
+        return "le", list(np.flatnonzero(ok)), left[ok], right[ok]
+    present = np.flatnonzero(hist.sum(axis=1))
+    if categorical == "subset":
+        if len(present) < 2:
+            return None
+        ordered = present[_subset_order(hist[present])]
+        left = np.cumsum(hist[ordered], axis=0)[:-1]
+        subsets = [np.sort(ordered[: i + 1]) for i in range(len(ordered) - 1)]
+        return "in", subsets, left, total - left
+    if not len(present):
+        return None
+    left = hist[present]
+    return "eq", list(present), left, total - left
+
+
+def _attr_sweep(
+    values: np.ndarray, n_values: Optional[int], y: np.ndarray, n_classes: int
+):
+    """Varredura de um candidato do modo exato: numérica (n_values=None) ou de
+    subconjuntos sobre os códigos das categorias."""
+    if n_values is None:
+        return numeric_split_sweep(values, y, n_classes)
+    return categorical_subset_sweep(values, n_values, y, n_classes)
+
+
+def _onevsrest_scores(df: pd.DataFrame, attr: str, target: str):
+    """[(valor, g_ponderada, detalhes)] dos splits attr == valor (nível de módulo para
+    o pool de processos)."""
+    out = []
+    for v in df[attr].dropna().unique():
+        mask = df[attr] == v
+        out.append((v, *evaluate_binary_split(df[mask], df[~mask], target)))
+    return out
+
+
+def _ccp_fold_scores(task) -> List[float]:
+    """Um fold da validação cruzada de select_ccp_alpha (nível de módulo para o pool)."""
+    params, train, test, features, alphas = task
+    model = CARTDecisionTree(**params)
+    model.fit(train, features)
+    y = test[params["target"]].astype(str).to_numpy()
+    scores = []
+    # alfas crescentes: cada poda parte da árvore já podada no alfa anterior
+    for a in alphas:
+        model.prune(float(a))
+        scores.append(float(np.mean(model.predict(test).astype(str) == y)))
+    return scores
+
+
+# ---------------------------
+# Trace (logs didáticos)
+# ---------------------------
+
+
+def _fmt_candidate(r: Dict[str, Any]) -> str:
+    d = r["details"]
+    if r["type"] == "le":
+        head = f"Atributo numérico '{r['attr']}' <= {r['value']:.6f}"
+    elif r["type"] == "in":
+        head = f"Atributo categórico '{r['attr']}' ∈ {_fmt_value(r['value'])}"
+    else:
+        head = f"Atributo categórico '{r['attr']}' == {r['value']}"
+    return (
+        f"\n{head}: g_left={d['g_left']:.6f} n_left={d['n_left']} | g_right={d['g_right']:.6f} n_right={d['n_right']} -> g_ponderada={r['g_weighted']:.6f} | delta Gini={r['g_decrease']:.6f}"
+    )
+
+
+_LEAF_REASONS = {
+    "pure": "Folha pura: classe={cls}",
+    "no_attrs": "Folha (sem atributos): classe majoritária={cls}",
+    "no_gain": "Folha (sem split útil): classe majoritária={cls}",
+    "budget": "Folha (limite do crescimento best-first): classe majoritária={cls}",
+}
+
+TERMINAL_FORMATS = {
+    "node": lambda r: (
+        "\n" + "-" * 80 + f"\nNó (profundidade={r['depth']})\n"
+        f"Amostras: {r['samples']} | Distribuição de classes: {r['counts']} | Gini: {r['gini']:.6f}"
+    ),
+    "leaf": lambda r: _LEAF_REASONS[r["reason"]].format(cls=r["cls"]),
+    "candidate": _fmt_candidate,
+    "split": lambda r: (
+        f"\n=> Escolhido split: {r['attr']} {_SPLIT_OPS[r['type']]} {_fmt_value(r['value'])} | Gini_before={r['gini_before']:.6f} Gini_after={r['gini_after']:.6f} delta={r['delta']:.6f}"
+    ),
+    "children": lambda r: f"  Gerando filho LEFT (n={r['n_left']}) and RIGHT (n={r['n_right']})",
+    "prune": lambda r: (
+        f"Poda (profundidade={r['depth']}, split={r['split']}): vira folha "
+        f"| alfa efetivo={r['alpha']:.6f}"
+    ),
+}
+
+
 # ---------------------------
 # Estruturas da árvore CART
 # ---------------------------
@@ -113,11 +624,14 @@ class CARTNode:
     class_counts: Dict[str, int]
     gini: float
     split_attr: Optional[str] = None
-    split_type: Optional[str] = None  # 'le' (<=) para numérico ou 'eq' para categórico
-    split_value: Optional[Any] = None  # threshold (numérico) ou categoria (valor)
-    tested_splits: List[Tuple[str, Any, float, Dict[str, Any]]] = field(
-        default_factory=list
-    )
+    # 'le' (<=) para numérico; 'eq' (== valor) ou 'in' (∈ subconjunto) para categórico
+    split_type: Optional[str] = None
+    # threshold (numérico), categoria (valor) ou tupla de categorias (subconjunto)
+    split_value: Optional[Any] = None
+    # Gini ponderada dos filhos no split escolhido
+    split_gini: Optional[float] = None
+    # Id do nó no registro de auditoria (-1 sem auditoria)
+    node_id: int = -1
     left: Optional["CARTNode"] = None
     right: Optional["CARTNode"] = None
     predicted_class: Optional[str] = None
@@ -125,165 +639,751 @@ class CARTNode:
     def is_leaf(self) -> bool:
         return self.predicted_class is not None
 
+    def edges(self) -> List[Tuple[str, "CARTNode"]]:
+        out: List[Tuple[str, "CARTNode"]] = []
+        if self.left is not None:
+            out.append(("L", self.left))
+        if self.right is not None:
+            out.append(("R", self.right))
+        return out
+
 
 class CARTDecisionTree:
-    def __init__(self, target: str):
+    def __init__(
+        self,
+        target: str,
+        trace=None,
+        order: str = "depth",
+        categorical: str = "onevsrest",
+        splitter: str = "exact",
+        max_bins: int = MAX_BINS,
+        max_leaves: Optional[int] = None,
+        min_impurity_decrease: float = 0.0,
+        time_budget: Optional[float] = None,
+        audit: bool = False,
+        max_features: Any = None,
+        random_state: Any = None,
+        executor: Optional[NodeExecutor] = None,
+    ):
+        if order not in ("depth", "breadth", "best"):
+            raise ValueError(
+                f"order inválido: {order!r} (use 'depth', 'breadth' ou 'best')"
+            )
+        if max_leaves is not None and max_leaves < 1:
+            raise ValueError(f"max_leaves deve ser >= 1: {max_leaves!r}")
+        if (max_leaves is not None or min_impurity_decrease or time_budget is not None) and (
+            order != "best"
+        ):
+            raise ValueError(
+                "max_leaves/min_impurity_decrease/time_budget exigem order='best'"
+            )
+        if splitter not in ("exact", "hist"):
+            raise ValueError(f"splitter inválido: {splitter!r} (use 'exact' ou 'hist')")
+        if not 2 <= max_bins <= MAX_BINS:
+            raise ValueError(f"max_bins deve estar entre 2 e {MAX_BINS}: {max_bins!r}")
+        if categorical not in ("onevsrest", "subset"):
+            raise ValueError(
+                f"categorical inválido: {categorical!r} (use 'onevsrest' ou 'subset')"
+            )
         self.target = target
+        # Splits categóricos: "onevsrest" (attr == v) ou "subset" (attr ∈ S, ordenação
+        # de Breiman)
+        self.categorical = categorical
+        # "exact": todos os limiares do nó; "hist": atributos numéricos quantizados uma
+        # vez em até max_bins faixas (uint8) e splits buscados nos histogramas do nó
+        self.splitter = splitter
+        self.max_bins = max_bins
+        # Sem trace o fit é silencioso; TerminalTrace(TERMINAL_FORMATS) imprime os cálculos
+        self.trace = trace if trace is not None else NULL_TRACE
+        # Ordem de expansão sem recursão: "depth" (pré-ordem), "breadth" (por nível) ou
+        # "best" (best-first: sempre a folha com maior redução de impureza ponderada)
+        self.order = order
+        # Limites do modo best-first (sem efeito nas outras ordens)
+        self.max_leaves = max_leaves
+        self.min_impurity_decrease = min_impurity_decrease
+        self.time_budget = time_budget
+        # Após fit com order="best": {"leaves", "stop"} (stop=None: árvore completa)
+        self.growth_: Optional[Dict[str, Any]] = None
+        # audit=True guarda todos os candidatos avaliados em audit_ (common.audit);
+        # desligado, nada é registrado
+        self.audit = audit
+        self.audit_: Optional[SplitAudit] = None
+        # max_features: avalia em cada nó só um sorteio dos atributos
+        # (common.forest.FeatureSampler, semente random_state; None = todos), como nas
+        # florestas aleatórias
+        self.max_features = max_features
+        self.random_state = random_state
+        self._sampler = (
+            None if max_features is None else FeatureSampler(max_features, random_state)
+        )
+        # executor (common.parallel.NodeExecutor): avalia os candidatos de nós grandes
+        # em paralelo — varreduras e histogramas em threads, onevsrest em processos;
+        # None = em série
+        self.executor = executor
         self.root: Optional[CARTNode] = None
+        self.features: List[str] = []
+        # árvore emitida no núcleo em vetores (compile); refeita após fit/poda
+        self._tree: Optional[TreeArrays] = None
+        # função de predição por linha gerada em código (compiled_predictor)
+        self._row_fn: Optional[Tuple[TreeArrays, Callable[[Mapping[str, Any]], Any]]] = None
 
     def fit(self, df: pd.DataFrame, features: List[str]) -> None:
-        self.root = self._build(df, features, depth=0)
+        self.features = list(features)
+        self._tree = None
+        self.audit_ = SplitAudit() if self.audit else None
+        if self._sampler is not None:
+            self._sampler.reset()
+        if self.splitter == "hist":
+            data = _HistData(df, features, self.target, self.max_bins)
+            rows = np.arange(len(df))
+            hists = data.histograms(rows, features, self.executor)
+            root_task = (rows, features, 0, hists)
+            expand = lambda task: self._expand_hist(data, *task)
+        else:
+            root_task = (df, features, 0)
+            expand = lambda task: self._expand(*task)
+        if self.order != "best":
+            self.root = grow(root_task, expand, self._attach, order=self.order)
+            return
+
+        n_total = max(1, len(df))
+        self.root, pending, stop = grow_best_first(
+            root_task,
+            expand,
+            self._attach,
+            # redução de impureza ponderada pela fração de amostras (como no sklearn)
+            priority=lambda n: n.samples / n_total * (n.gini - n.split_gini),
+            max_leaves=self.max_leaves,
+            min_priority=self.min_impurity_decrease,
+            time_budget=self.time_budget,
+        )
+        tr = self.trace
+        self._tree = None
+        for n in pending:
+            self._make_leaf(n)
+            if tr.enabled:
+                tr.emit("leaf", reason="budget", cls=n.predicted_class)
+        self.growth_ = {
+            "leaves": sum(1 for n in iter_preorder(self.root) if n.is_leaf()),
+            "stop": stop,
+        }
+
+    def _expand_hist(
+        self,
+        data: _HistData,
+        rows: np.ndarray,
+        features: List[str],
+        depth: int,
+        hists: Dict[str, np.ndarray],
+    ):
+        """Como _expand, mas a busca do split usa só os histogramas do nó.
+
+        Dos filhos, só o menor tem seus histogramas contados sobre as linhas; os do
+        maior saem da subtração pai - irmão (descontando as linhas sem valor no
+        atributo do split, que não descem).
+        """
+        counts = data.class_counts(rows)
+        node_gini = gini(counts)
+        node = CARTNode(
+            depth=depth, samples=len(rows), class_counts=counts, gini=node_gini
+        )
+        audit = self.audit_
+        if audit is not None:
+            node.node_id = audit.new_node()
+        tr = self.trace
+        if tr.enabled:
+            tr.emit(
+                "node", depth=depth, samples=node.samples, counts=counts, gini=node_gini
+            )
+        if node_gini == 0.0 or not features:
+            node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
+            if tr.enabled:
+                reason = "pure" if node_gini == 0.0 else "no_attrs"
+                tr.emit("leaf", reason=reason, cls=node.predicted_class)
+            return node, []
+
+        total = np.bincount(data.y[rows], minlength=data.k)
+        cands: List[Tuple[float, str, str, Any, Any]] = []
+        for attr in self._candidates(features):
+            res = _hist_candidates(data, attr, hists[attr], total, self.categorical)
+            if res is None:
+                continue
+            kind, keys, left, right = res
+            n_left = left.sum(axis=1)
+            n_right = right.sum(axis=1)
+            m = n_left + n_right
+            idx = np.broadcast_to(np.arange(data.k), left.shape)
+            g_left = _gini_rows(left, idx)
+            g_right = _gini_rows(right, idx)
+            g_w = (n_left / m) * g_left + (n_right / m) * g_right
+            values = []
+            for i, key in enumerate(keys):
+                if kind == "le":
+                    value = data.cuts[attr][key]
+                elif kind == "in":
+                    value = tuple(data.categories[attr][key].tolist())
+                else:
+                    value = data.categories[attr][key]
+                values.append(value)
+                cands.append((float(g_w[i]), attr, kind, value, key))
+                if tr.enabled:
+                    zero = np.zeros(data.k, dtype=np.int64)
+                    details = {
+                        "n_left": int(n_left[i]),
+                        "n_right": int(n_right[i]),
+                        "left_counts": _counts_dict(left[i], zero, data.classes),
+                        "right_counts": _counts_dict(right[i], zero, data.classes),
+                        "g_left": float(g_left[i]),
+                        "g_right": float(g_right[i]),
+                        "w_left": float(n_left[i] / m[i]),
+                        "w_right": float(n_right[i] / m[i]),
+                        "g_weighted": float(g_w[i]),
+                    }
+                    tr.emit(
+                        "candidate",
+                        attr=attr,
+                        type=kind,
+                        value=value,
+                        g_weighted=float(g_w[i]),
+                        g_decrease=node_gini - float(g_w[i]),
+                        details=details,
+                    )
+            if audit is not None and len(keys):
+                audit.add_many(
+                    node.node_id,
+                    attr,
+                    kind,
+                    node_gini - g_w,
+                    data.classes,
+                    left,
+                    right,
+                    n_left,
+                    n_right,
+                    thresholds=np.asarray(values) if kind == "le" else None,
+                    values=None if kind == "le" else values,
+                )
+
+        best = _pick_split(cands)
+        if best is None or node_gini - best[0] <= 0.0:
+            node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
+            if tr.enabled:
+                tr.emit("leaf", reason="no_gain", cls=node.predicted_class)
+            return node, []
+
+        g_best, attr, kind, value, key = best
+        node.split_attr, node.split_type, node.split_value = attr, kind, value
+        node.split_gini = g_best
+        if tr.enabled:
+            tr.emit(
+                "split",
+                attr=attr,
+                type=kind,
+                value=value,
+                gini_before=node_gini,
+                gini_after=g_best,
+                delta=node_gini - g_best,
+            )
+
+        left_mask, right_mask = data.split_mask(rows, attr, kind, key)
+        left_rows, right_rows = rows[left_mask], rows[right_mask]
+        if tr.enabled:
+            tr.emit("children", n_left=len(left_rows), n_right=len(right_rows))
+        remaining = [a for a in features if a != attr]
+        small, large = (
+            (left_rows, right_rows)
+            if len(left_rows) <= len(right_rows)
+            else (right_rows, left_rows)
+        )
+        h_small = data.histograms(small, remaining, self.executor)
+        dropped = rows[~(left_mask | right_mask)]
+        h_large = {}
+        for a in remaining:
+            h = hists[a] - h_small[a]
+            if len(dropped):
+                h = h - data.histogram(dropped, a)
+            h_large[a] = h
+        h_left, h_right = (
+            (h_small, h_large) if small is left_rows else (h_large, h_small)
+        )
+        return node, [
+            ("L", (left_rows, remaining, depth + 1, h_left)),
+            ("R", (right_rows, remaining, depth + 1, h_right)),
+        ]
 
     # -------------------
-    # Regras (base de regras)
+    # Predição em lote
     # -------------------
-    def extract_rules(self) -> List[Dict[str, Any]]:
+    def compile(self) -> TreeArrays:
+        """Emite a árvore no núcleo em vetores NumPy (common.tree; cacheado até o
+        próximo fit/poda)."""
         assert self.root is not None
-        rules: List[Dict[str, Any]] = []
-        N_total = max(1, self.root.samples)
-
-        def dfs(n: CARTNode, conditions: List[Tuple[str, str, Any]]):
-            if n.is_leaf():
-                n_samples = n.samples
-                cc = n.class_counts
-                y = n.predicted_class or (max(cc, key=lambda k: cc[k]) if cc else "?")
-                hits = cc.get(y, 0) if cc else 0
-                confidence = (hits / n_samples) if n_samples > 0 else 0.0
-                support = (n_samples / N_total) if N_total > 0 else 0.0
-                rules.append(
-                    {
-                        "conditions": list(conditions),
-                        "predicted_class": y,
-                        "n": n_samples,
-                        "class_counts": cc,
-                        "support": support,
-                        "confidence": confidence,
-                        "hits": hits,
-                    }
+        if self._tree is None:
+            self._tree = compile_nodes(
+                self.root, self.features, "gini", stats=("split_gini",)
+            )
+        return self._tree
+
+    def save(self, path: str) -> None:
+        """Grava a árvore no formato binário de common.model_io."""
+        save_tree(
+            self.compile(),
+            path,
+            {
+                "algorithm": "cart",
+                "target": self.target,
+                "categorical": self.categorical,
+                "splitter": self.splitter,
+                "max_bins": self.max_bins,
+            },
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CARTDecisionTree":
+        """Abre um modelo salvo com save(); com mmap=True os vetores ficam mapeados do
+        arquivo. `root` passa a ser uma vista (NodeView) sobre eles: predição, regras e
+        exportações funcionam sem reconstruir os nós, mas não a poda."""
+        tree, meta = load_tree(path, mmap=mmap, algorithm="cart")
+        model = cls(
+            meta["target"],
+            categorical=meta["categorical"],
+            splitter=meta["splitter"],
+            max_bins=meta["max_bins"],
+        )
+        model.features = list(tree.features)
+        model.root = tree.root
+        model._tree = tree
+        return model
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.compile().classes
+
+    def compiled_predictor(
+        self, cache_dir: Optional[str] = None
+    ) -> Callable[[Mapping[str, Any]], Any]:
+        """Função predict_row(row) gerada em Python para a árvore atual
+        (common.codegen), em cache no disco pelo hash da árvore."""
+        tree = self.compile()
+        if self._row_fn is None or self._row_fn[0] is not tree:
+            self._row_fn = (
+                tree,
+                build_predictor(tree, cache_dir=cache_dir),
+            )
+        return self._row_fn[1]
+
+    def predict_row(self, row: Mapping[str, Any]) -> Any:
+        """Classe prevista para uma linha (dict atributo -> valor), pela função gerada:
+        mesmo resultado de predict, sem montar DataFrame nem percorrer os vetores."""
+        return self.compiled_predictor()(row)
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """Distribuição de classes (colunas na ordem de `classes_`) do nó onde cada
+        linha parou."""
+        tree = self.compile()
+        return tree.predict_proba(tree.encode(df))
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """Classe prevista por linha, descendo todas as linhas juntas nó a nó.
+
+        Um valor numérico ausente para no nó interno (classe majoritária do nó);
+        categórico ausente vai para a direita, como no treino.
+        """
+        tree = self.compile()
+        return tree.predict(tree.encode(df))
+
+    def compare_with_exact(
+        self,
+        df: pd.DataFrame,
+        features: List[str],
+        test_size: float = 0.3,
+        random_state: int = 0,
+    ) -> Dict[str, float]:
+        """Acurácia em holdout deste modo contra o modo exato, com o mesmo particionamento.
+
+        Treina as duas árvores (sem trace) sobre a mesma amostra de treino e devolve as
+        acurácias no teste, a diferença (este modo - exato) e os tempos de treino.
+        """
+        test = df.sample(frac=test_size, random_state=random_state)
+        train = df.drop(index=test.index)
+        y = test[self.target].astype(str).to_numpy()
+        out: Dict[str, float] = {}
+        for name, splitter in (("exact", "exact"), ("this", self.splitter)):
+            model = CARTDecisionTree(
+                self.target,
+                order=self.order,
+                categorical=self.categorical,
+                splitter=splitter,
+                max_bins=self.max_bins,
+                max_leaves=self.max_leaves,
+                min_impurity_decrease=self.min_impurity_decrease,
+                time_budget=self.time_budget,
+            )
+            t0 = time.perf_counter()
+            model.fit(train, features)
+            out[f"fit_s_{name}"] = time.perf_counter() - t0
+            pred = model.predict(test).astype(str)
+            out[f"acc_{name}"] = float(np.mean(pred == y)) if len(y) else float("nan")
+        out["acc_diff"] = out["acc_this"] - out["acc_exact"]
+        return out
+
+    # -------------------
+    # Poda por custo-complexidade (weakest link)
+    # -------------------
+    def _weakest_links(self):
+        """Sequência de podas do elo mais fraco sobre as contagens guardadas nos nós.
+
+        R(t) = (N_t / N) * gini(t). Para cada nó interno, g(t) = (R(t) - R(T_t)) /
+        (folhas(T_t) - 1); o nó de menor g vira folha, só os ancestrais têm R(T_t) e
+        folhas atualizados e voltam ao heap (entradas antigas são descartadas pela
+        versão). Devolve (nós em pré-ordem, alfa a partir do qual cada nó é podado —
+        vira folha ou some junto com um ancestral; inf se nunca —, alfas do caminho,
+        impureza total das folhas em cada alfa).
+        """
+        assert self.root is not None
+        nodes = list(iter_preorder(self.root))
+        index = {id(n): i for i, n in enumerate(nodes)}
+        m = len(nodes)
+        N = max(1, self.root.samples)
+        parent = np.full(m, -1, dtype=np.int64)
+        kids: List[List[int]] = [[] for _ in range(m)]
+        r_node = np.array([n.samples / N * n.gini for n in nodes])
+        r_sub = np.zeros(m)
+        leaves = np.zeros(m, dtype=np.int64)
+        for n in iter_postorder(self.root):
+            i = index[id(n)]
+            kids[i] = [index[id(ch)] for _, ch in n.edges()]
+            for c in kids[i]:
+                parent[c] = i
+            if kids[i]:
+                r_sub[i] = sum(r_sub[c] for c in kids[i])
+                leaves[i] = sum(leaves[c] for c in kids[i])
+            else:
+                r_sub[i] = r_node[i]
+                leaves[i] = 1
+
+        version = np.zeros(m, dtype=np.int64)
+        heap = [
+            ((r_node[i] - r_sub[i]) / (leaves[i] - 1), i, 0)
+            for i in range(m)
+            if leaves[i] > 1
+        ]
+        heapq.heapify(heap)
+        collapse = np.full(m, np.inf)
+        alphas, impurities = [0.0], [float(r_sub[0])]
+        alpha = 0.0
+        while heap:
+            g, i, ver = heapq.heappop(heap)
+            if ver != version[i] or collapse[i] < np.inf:
+                continue
+            alpha = max(alpha, g)
+            stack = [i]
+            while stack:
+                j = stack.pop()
+                if collapse[j] < np.inf:
+                    continue
+                collapse[j] = alpha
+                stack.extend(kids[j])
+            d_r = r_node[i] - r_sub[i]
+            d_leaves = leaves[i] - 1
+            r_sub[i], leaves[i] = r_node[i], 1
+            p = parent[i]
+            while p >= 0:
+                r_sub[p] += d_r
+                leaves[p] -= d_leaves
+                version[p] += 1
+                heapq.heappush(
+                    heap, ((r_node[p] - r_sub[p]) / (leaves[p] - 1), p, version[p])
                 )
-                return
-            # nó interno binário
-            if n.split_attr is None or n.split_type is None:
-                return
-            if n.split_type == "le":
-                left_cond = (n.split_attr, "<=", n.split_value)
-                right_cond = (n.split_attr, ">", n.split_value)
+                p = parent[p]
+            if math.isclose(alpha, alphas[-1], rel_tol=1e-12, abs_tol=1e-15):
+                impurities[-1] = float(r_sub[0])
             else:
-                left_cond = (n.split_attr, "=", n.split_value)
-                right_cond = (n.split_attr, "!=", n.split_value)
-            if n.left is not None:
-                dfs(n.left, conditions + [left_cond])
-            if n.right is not None:
-                dfs(n.right, conditions + [right_cond])
+                alphas.append(alpha)
+                impurities.append(float(r_sub[0]))
+        return nodes, collapse, np.array(alphas), np.array(impurities)
+
+    def cost_complexity_pruning_path(self) -> Dict[str, np.ndarray]:
+        """Alfas efetivos da poda por custo-complexidade e a impureza total das folhas
+        da subárvore ótima em cada um (mesma convenção do ccp_alpha do scikit-learn)."""
+        _, _, alphas, impurities = self._weakest_links()
+        return {"ccp_alphas": alphas, "impurities": impurities}
+
+    def prune(self, ccp_alpha: float) -> int:
+        """Poda no lugar todo nó cujo alfa efetivo é <= ccp_alpha; devolve quantos nós
+        foram removidos."""
+        if ccp_alpha < 0:
+            raise ValueError(f"ccp_alpha deve ser >= 0: {ccp_alpha!r}")
+        nodes, collapse, _, _ = self._weakest_links()
+        self._tree = None
+        index = {id(n): i for i, n in enumerate(nodes)}
+        tr = self.trace
+        stack = [self.root]
+        while stack:
+            n = stack.pop()
+            a = collapse[index[id(n)]]
+            if a <= ccp_alpha:
+                if tr.enabled:
+                    tr.emit("prune", depth=n.depth, split=_split_repr(n), alpha=float(a))
+                self._make_leaf(n)
+                continue
+            stack.extend(ch for _, ch in reversed(n.edges()))
+        return len(nodes) - sum(1 for _ in iter_preorder(self.root))
+
+    @staticmethod
+    def _make_leaf(n: CARTNode) -> None:
+        cc = n.class_counts
+        n.predicted_class = max(cc.items(), key=lambda kv: kv[1])[0] if cc else "?"
+        n.left = n.right = None
+        n.split_attr = n.split_type = n.split_value = n.split_gini = None
+
+    def select_ccp_alpha(
+        self,
+        df: pd.DataFrame,
+        features: List[str],
+        cv: int = 5,
+        n_jobs: Optional[int] = None,
+        random_state: int = 0,
+    ) -> Dict[str, Any]:
+        """Escolhe ccp_alpha por validação cruzada k-fold e poda esta árvore (já treinada
+        em `df`) com ele.
+
+        Os candidatos são as médias geométricas entre alfas consecutivos do caminho da
+        árvore completa (Breiman). Cada fold treina uma árvore, poda-a em alfas
+        crescentes e mede a acurácia no fold de teste; os folds rodam em um pool de
+        processos (n_jobs=1: em série). Empates ficam com o maior alfa (árvore menor).
+        """
+        assert self.root is not None
+        if cv < 2:
+            raise ValueError(f"cv deve ser >= 2: {cv!r}")
+        path = self.cost_complexity_pruning_path()["ccp_alphas"]
+        candidates = np.append(np.sqrt(path[:-1] * path[1:]), path[-1])
+        perm = np.random.default_rng(random_state).permutation(len(df))
+        params = {
+            "target": self.target,
+            "order": self.order,
+            "categorical": self.categorical,
+            "splitter": self.splitter,
+            "max_bins": self.max_bins,
+            "max_leaves": self.max_leaves,
+            "min_impurity_decrease": self.min_impurity_decrease,
+            "time_budget": self.time_budget,
+            "max_features": self.max_features,
+            "random_state": self.random_state,
+        }
+        tasks = []
+        for test_idx in np.array_split(perm, cv):
+            train_mask = np.ones(len(df), dtype=bool)
+            train_mask[test_idx] = False
+            tasks.append(
+                (params, df.iloc[train_mask], df.iloc[test_idx], features, candidates)
+            )
+        workers = min(cv, n_jobs or os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                scores = np.array(list(pool.map(_ccp_fold_scores, tasks)))
+        else:
+            scores = np.array([_ccp_fold_scores(t) for t in tasks])
+        mean = scores.mean(axis=0)
+        best = max(
+            i for i in range(len(mean)) if math.isclose(mean[i], mean.max(), rel_tol=1e-12)
+        )
+        removed = self.prune(float(candidates[best]))
+        return {
+            "ccp_alphas": candidates,
+            "mean_accuracy": mean,
+            "std_accuracy": scores.std(axis=0),
+            "best_alpha": float(candidates[best]),
+            "removed": removed,
+        }
+
+    @staticmethod
+    def _attach(parent: CARTNode, side: str, child: CARTNode) -> None:
+        if side == "L":
+            parent.left = child
+        else:
+            parent.right = child
 
-        dfs(self.root, [])
-        return rules
+    # -------------------
+    # Regras (base de regras)
+    # -------------------
+    def extract_rules(self) -> List[Dict[str, Any]]:
+        return list(self.iter_rules())
+
+    def iter_rules(self, copy: bool = True) -> Iterator[Dict[str, Any]]:
+        """Regras de extract_rules uma a uma (common.export.iter_rules)."""
+        assert self.root is not None
+        return iter_rules(self.root, _branch_condition, copy)
 
     def export_rules_txt(self, out_path: str) -> None:
+        """Escreve as regras no arquivo à medida que são geradas."""
         assert self.root is not None
-        rules = self.extract_rules()
-        lines: List[str] = []
-        lines.append(f"# Base de regras (CART) — alvo: {self.target}")
-        lines.append(f"# Total de amostras de treino: {self.root.samples}")
-        for i, r in enumerate(rules, start=1):
-            conds = (
-                " E ".join([f"{a} {op} {v}" for (a, op, v) in r["conditions"]])
-                or "(sempre)"
-            )
-            cls = r["predicted_class"]
-            n = r["n"]
-            sup = r["support"] * 100.0
-            conf = r["confidence"] * 100.0
-            dist = ", ".join(f"{k}:{v}" for k, v in r["class_counts"].items())
-            lines.append(
-                f"Regra {i}: SE {conds} ENTÃO {self.target} = {cls} (n={n}, suporte={sup:.2f}%, confiança={conf:.2f}%, dist=[{dist}])"
-            )
+        lines = rule_lines(
+            self.iter_rules(copy=False),
+            "Base de regras (CART)",
+            self.target,
+            self.root.samples,
+            fmt_value=_fmt_value,
+        )
         os.makedirs(os.path.dirname(out_path), exist_ok=True)
         with open(out_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines) + "\n")
-
-    def _build(self, df: pd.DataFrame, features: List[str], depth: int) -> CARTNode:
+            write_lines(f, lines)
+
+    def _candidates(self, features: List[str]) -> List[str]:
+        """Atributos avaliados no nó: todos, ou o sorteio de max_features."""
+        return features if self._sampler is None else self._sampler(features)
+
+    def _score_attrs(self, df: pd.DataFrame, attrs: List[str]):
+        """Avaliação dos candidatos do nó, antes da escolha do split (em série).
+
+        Numéricos e subconjuntos: varreduras NumPy (_attr_sweep), em threads com o
+        executor; onevsrest: splits por valor em pandas (_onevsrest_scores), em
+        processos. Devolve (resultado por atributo, categorias dos subconjuntos,
+        classes).
+        """
+        sweep_attrs: List[str] = []
+        sweep_tasks: List[Tuple] = []
+        eq_attrs: List[str] = []
+        cats: Dict[str, Any] = {}
+        y_codes = classes = None
+        for attr in attrs:
+            col = df[attr]
+            if pd.api.types.is_numeric_dtype(col):
+                values, n_values = col.to_numpy(dtype=np.float64, na_value=np.nan), None
+            elif self.categorical == "subset":
+                codes, cats[attr] = pd.factorize(col, sort=True)
+                values, n_values = codes.astype(np.int64), len(cats[attr])
+            else:
+                eq_attrs.append(attr)
+                continue
+            if y_codes is None:
+                y_codes, classes = pd.factorize(df[self.target].astype(str))
+                classes = np.asarray(classes, dtype=object)
+            sweep_attrs.append(attr)
+            sweep_tasks.append((values, n_values, y_codes, len(classes)))
+        ex = self.executor
+        n = len(df)
+        scores = dict(zip(sweep_attrs, map_tasks(ex, _attr_sweep, sweep_tasks, n)))
+        if eq_attrs:
+            # em paralelo, cada processo recebe só as colunas do atributo e do alvo
+            split = is_parallel(ex, n, len(eq_attrs))
+            eq_tasks = [
+                (df[[a, self.target]] if split else df, a, self.target)
+                for a in eq_attrs
+            ]
+            results = map_tasks(ex, _onevsrest_scores, eq_tasks, n, kind="process")
+            scores.update(zip(eq_attrs, results))
+        return scores, cats, classes
+
+    def _expand(self, df: pd.DataFrame, features: List[str], depth: int):
+        """Cria o nó de `df` e devolve as tarefas dos filhos (sem recursão)."""
         counts = class_distribution(df, self.target)
         node_gini = gini(counts)
         node = CARTNode(
             depth=depth, samples=len(df), class_counts=counts, gini=node_gini
         )
+        audit = self.audit_
+        if audit is not None:
+            node.node_id = audit.new_node()
 
+        tr = self.trace
         # Log do nó
-        print("\n" + "-" * 80)
-        print(f"Nó (profundidade={depth})")
-        print(
-            f"Amostras: {node.samples} | Distribuição de classes: {counts} | Gini: {node_gini:.6f}"
-        )
+        if tr.enabled:
+            tr.emit(
+                "node", depth=depth, samples=node.samples, counts=counts, gini=node_gini
+            )
 
         # Critérios de parada
         if node_gini == 0.0:
             node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
-            print(f"Folha pura: classe={node.predicted_class}")
-            return node
+            if tr.enabled:
+                tr.emit("leaf", reason="pure", cls=node.predicted_class)
+            return node, []
         if not features:
             node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
-            print(f"Folha (sem atributos): classe majoritária={node.predicted_class}")
-            return node
+            if tr.enabled:
+                tr.emit("leaf", reason="no_attrs", cls=node.predicted_class)
+            return node, []
 
         best_attr = None
         best_type = None
         best_value = None
         best_g_weighted = float("inf")
-        best_details: Dict[str, Any] = {}
 
+        attrs = self._candidates(features)
+        scores, cats_of, classes = self._score_attrs(df, attrs)
         # Testa cada atributo
-        for attr in features:
+        for attr in attrs:
             col = df[attr]
-            # Numérico -> testar thresholds entre valores únicos ordenados
+            # Numérico -> todos os thresholds entre valores vizinhos em uma só varredura
             if pd.api.types.is_numeric_dtype(col):
-                uniq = sorted(col.dropna().unique())
+                sweep = scores[attr]
                 # se só 1 valor distinto, ignora
-                if len(uniq) <= 1:
+                if sweep is None:
                     continue
-                # candidatos: médias entre vizinhos
-                thresholds = [
-                    (uniq[i] + uniq[i + 1]) / 2.0 for i in range(len(uniq) - 1)
-                ]
-                for t in thresholds:
-                    left = df[df[attr] <= t]
-                    right = df[df[attr] > t]
-                    g_w, details = evaluate_binary_split(left, right, self.target)
-                    g_decrease = node_gini - g_w
-                    node.tested_splits.append((attr, ("le", t), g_decrease, details))
-                    print(
-                        f"\nAtributo numérico '{attr}' <= {t:.6f}: g_left={details['g_left']:.6f} n_left={details['n_left']} | g_right={details['g_right']:.6f} n_right={details['n_right']} -> g_ponderada={g_w:.6f} | delta Gini={g_decrease:.6f}"
+                if audit is not None:
+                    audit.add_many(
+                        node.node_id,
+                        attr,
+                        "le",
+                        node_gini - sweep["g_weighted"],
+                        classes,
+                        sweep["left"],
+                        sweep["right"],
+                        sweep["n_left"],
+                        sweep["n_right"],
+                        thresholds=sweep["t"],
                     )
+                # dicts de detalhes só para o trace
+                for i, t in enumerate(sweep["t"]):
+                    g_w = float(sweep["g_weighted"][i])
+                    if tr.enabled:
+                        tr.emit(
+                            "candidate",
+                            attr=attr,
+                            type="le",
+                            value=t,
+                            g_weighted=g_w,
+                            g_decrease=node_gini - g_w,
+                            details=_sweep_details(sweep, i, classes),
+                        )
                     if g_w < best_g_weighted or (
                         math.isclose(g_w, best_g_weighted, rel_tol=1e-12)
                         and (best_attr is None or (attr, t) < (best_attr, best_value))
                     ):
-                        (
-                            best_attr,
-                            best_type,
-                            best_value,
-                            best_g_weighted,
-                            best_details,
-                        ) = (
-                            attr,
-                            "le",
-                            t,
-                            g_w,
-                            details,
-                        )
+                        best_attr, best_type, best_value = attr, "le", t
+                        best_g_weighted = g_w
 
-            else:
-                # Categórico: testamos split binário por valor (attr == v) vs restante
-                uniq = col.dropna().unique()
-                for v in uniq:
-                    left = df[df[attr] == v]
-                    right = df[df[attr] != v]
-                    g_w, details = evaluate_binary_split(left, right, self.target)
-                    g_decrease = node_gini - g_w
-                    node.tested_splits.append((attr, ("eq", v), g_decrease, details))
-                    print(
-                        f"\nAtributo categórico '{attr}' == {v}: g_left={details['g_left']:.6f} n_left={details['n_left']} | g_right={details['g_right']:.6f} n_right={details['n_right']} -> g_ponderada={g_w:.6f} | delta Gini={g_decrease:.6f}"
+            elif self.categorical == "subset":
+                # Categórico: prefixos da ordenação de Breiman (attr ∈ S) vs restante
+                sweep, cats = scores[attr], cats_of[attr]
+                if sweep is None:
+                    continue
+                subsets = [tuple(cats[sub].tolist()) for sub in sweep["subsets"]]
+                if audit is not None:
+                    audit.add_many(
+                        node.node_id,
+                        attr,
+                        "in",
+                        node_gini - sweep["g_weighted"],
+                        classes,
+                        sweep["left"],
+                        sweep["right"],
+                        sweep["n_left"],
+                        sweep["n_right"],
+                        values=subsets,
                     )
+                for i, v in enumerate(subsets):
+                    g_w = float(sweep["g_weighted"][i])
+                    if tr.enabled:
+                        tr.emit(
+                            "candidate",
+                            attr=attr,
+                            type="in",
+                            value=v,
+                            g_weighted=g_w,
+                            g_decrease=node_gini - g_w,
+                            details=_sweep_details(sweep, i, classes),
+                        )
                     if g_w < best_g_weighted or (
                         math.isclose(g_w, best_g_weighted, rel_tol=1e-12)
                         and (
@@ -291,222 +1391,154 @@ class CARTDecisionTree:
                             or (attr, str(v)) < (best_attr, str(best_value))
                         )
                     ):
-                        (
-                            best_attr,
-                            best_type,
-                            best_value,
-                            best_g_weighted,
-                            best_details,
-                        ) = (
+                        best_attr, best_type, best_value = attr, "in", v
+                        best_g_weighted = g_w
+
+            else:
+                # Categórico: testamos split binário por valor (attr == v) vs restante
+                for v, g_w, details in scores[attr]:
+                    g_decrease = node_gini - g_w
+                    if audit is not None:
+                        audit.add(
+                            node.node_id,
                             attr,
                             "eq",
-                            v,
-                            g_w,
-                            details,
+                            g_decrease,
+                            value=v,
+                            n_left=details["n_left"],
+                            n_right=details["n_right"],
+                            left=details["left_counts"],
+                            right=details["right_counts"],
+                        )
+                    if tr.enabled:
+                        tr.emit(
+                            "candidate",
+                            attr=attr,
+                            type="eq",
+                            value=v,
+                            g_weighted=g_w,
+                            g_decrease=g_decrease,
+                            details=details,
+                        )
+                    if g_w < best_g_weighted or (
+                        math.isclose(g_w, best_g_weighted, rel_tol=1e-12)
+                        and (
+                            best_attr is None
+                            or (attr, str(v)) < (best_attr, str(best_value))
                         )
+                    ):
+                        best_attr, best_type, best_value = attr, "eq", v
+                        best_g_weighted = g_w
 
         # Se não encontrou split com redução (melhora) -> folha por maioria
         if best_attr is None or (node_gini - best_g_weighted) <= 0.0:
             node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
-            print(f"Folha (sem split útil): classe majoritária={node.predicted_class}")
-            return node
+            if tr.enabled:
+                tr.emit("leaf", reason="no_gain", cls=node.predicted_class)
+            return node, []
 
         node.split_attr = best_attr
         node.split_type = best_type
         node.split_value = best_value
+        node.split_gini = best_g_weighted
         g_delta = node_gini - best_g_weighted
-        print(
-            f"\n=> Escolhido split: {best_attr} {'<=' if best_type=='le' else '=='} {best_value} | Gini_before={node_gini:.6f} Gini_after={best_g_weighted:.6f} delta={g_delta:.6f}"
-        )
+        if tr.enabled:
+            tr.emit(
+                "split",
+                attr=best_attr,
+                type=best_type,
+                value=best_value,
+                gini_before=node_gini,
+                gini_after=best_g_weighted,
+                delta=g_delta,
+            )
 
         # Cria filhos e recursão
         remaining = [a for a in features if a != best_attr]
         if node.split_type == "le":
             left_df = df[df[best_attr] <= best_value]
             right_df = df[df[best_attr] > best_value]
+        elif node.split_type == "in":
+            mask = df[best_attr].isin(best_value)
+            left_df = df[mask]
+            right_df = df[~mask]
         else:
             left_df = df[df[best_attr] == best_value]
             right_df = df[df[best_attr] != best_value]
 
-        print(f"  Gerando filho LEFT (n={len(left_df)}) and RIGHT (n={len(right_df)})")
-        node.left = self._build(
-            left_df.drop(columns=[best_attr]) if len(left_df) > 0 else left_df,
-            remaining,
-            depth + 1,
-        )
-        node.right = self._build(
-            right_df.drop(columns=[best_attr]) if len(right_df) > 0 else right_df,
-            remaining,
-            depth + 1,
-        )
+        if tr.enabled:
+            tr.emit("children", n_left=len(left_df), n_right=len(right_df))
+        tasks = [
+            (
+                "L",
+                (
+                    left_df.drop(columns=[best_attr]) if len(left_df) > 0 else left_df,
+                    remaining,
+                    depth + 1,
+                ),
+            ),
+            (
+                "R",
+                (
+                    right_df.drop(columns=[best_attr]) if len(right_df) > 0 else right_df,
+                    remaining,
+                    depth + 1,
+                ),
+            ),
+        ]
 
-        return node
+        return node, tasks
 
     # -------------------
     # Exportações/plots (DOT / PNG)
     # -------------------
 
-    def export_dot(self) -> str:
+    def iter_dot(self) -> Iterator[str]:
         assert self.root is not None
-        lines: List[str] = [
-            "digraph CART {",
-            "  node [shape=box, style=rounded, fontsize=10];",
-        ]
-        _id_counter = [0]
-
-        def next_id() -> int:
-            _id_counter[0] += 1
-            return _id_counter[0]
-
-        def escape(s: str) -> str:
-            return str(s).replace("\n", "\\n").replace('"', '\\"')
 
         def label_for(node: CARTNode) -> str:
             dist_str = ", ".join(f"{k}:{v}" for k, v in node.class_counts.items())
             if node.is_leaf():
-                return escape(
+                return dot_escape(
                     f"Leaf\nN={node.samples}\nG={node.gini:.3f}\nDist:[{dist_str}]\nClass={node.predicted_class}"
                 )
             else:
-                split_repr = (
-                    f"{node.split_attr} <= {node.split_value}"
-                    if node.split_type == "le"
-                    else f"{node.split_attr} == {node.split_value}"
-                )
-                return escape(
+                split_repr = _split_repr(node)
+                return dot_escape(
                     f"N={node.samples} G={node.gini:.3f}\nDist:[{dist_str}]\nSplit: {split_repr}"
                 )
 
-        def walk(node: CARTNode) -> int:
-            nid = next_id()
-            lines.append(f'  n{nid} [label="{label_for(node)}"];')
-            if not node.is_leaf():
-                if node.left is not None:
-                    cid = walk(node.left)
-                    lines.append(f'  n{nid} -> n{cid} [label="L"];')
-                if node.right is not None:
-                    cid = walk(node.right)
-                    lines.append(f'  n{nid} -> n{cid} [label="R"];')
-            return nid
-
-        walk(self.root)
-        lines.append("}")
-        return "\n".join(lines)
+        return dot_lines(self.root, "CART", label_for, lambda node, side: side)
 
-    def plot_png(self, out_path: str) -> None:
-        assert self.root is not None
+    def export_dot(self) -> str:
+        return "\n".join(self.iter_dot())
 
-        # layout e anotação similares ao script ID3
-        def subtree_leaves(node: CARTNode) -> int:
-            if node.is_leaf() or (node.left is None and node.right is None):
-                return 1
-            s = 0
-            if node.left is not None:
-                s += subtree_leaves(node.left)
-            if node.right is not None:
-                s += subtree_leaves(node.right)
-            return s
+    def write_dot(self, out_path: str) -> None:
+        """DOT escrito direto no arquivo, linha a linha."""
+        with open(out_path, "w", encoding="utf-8") as f:
+            write_lines(f, self.iter_dot(), end="")
+
+    def _drawing(self) -> TreeDrawing:
+        """Layout da árvore (common.render) com os textos de cada nó e aresta."""
+        assert self.root is not None
 
         def annotate(node: CARTNode) -> str:
             dist_str = ", ".join(f"{k}:{v}" for k, v in node.class_counts.items())
             if node.is_leaf():
                 return f"Leaf\nN={node.samples}\nG={node.gini:.3f}\n[{dist_str}]\nClass={node.predicted_class}"
-            split_repr = (
-                f"{node.split_attr} <= {node.split_value}"
-                if node.split_type == "le"
-                else f"{node.split_attr} == {node.split_value}"
-            )
+            split_repr = _split_repr(node)
             return (
                 f"N={node.samples} G={node.gini:.3f}\n[{dist_str}]\nSplit: {split_repr}"
             )
 
-        x_gap = 1.0
-        y_gap = 1.6
-
-        def assign_pos(
-            node: CARTNode, depth: int, x_start: float
-        ) -> Tuple[float, float, float]:
-            width = subtree_leaves(node)
-            x_center = x_start + (width - 1) * x_gap / 2.0
-            y = -depth * y_gap
-            positions[id(node)] = (x_center, y)
-            cur_x = x_start
-            if node.left is not None:
-                ch_width = subtree_leaves(node.left)
-                assign_pos(node.left, depth + 1, cur_x)
-                cur_x += ch_width * x_gap
-            if node.right is not None:
-                ch_width = subtree_leaves(node.right)
-                assign_pos(node.right, depth + 1, cur_x)
-                cur_x += ch_width * x_gap
-            return x_center, y, width
-
-        positions: Dict[int, Tuple[float, float]] = {}
-        assign_pos(self.root, 0, 0.0)
-
-        def walk_nodes(node: CARTNode):
-            yield node
-            if node.left is not None:
-                yield from walk_nodes(node.left)
-            if node.right is not None:
-                yield from walk_nodes(node.right)
-
-        fig_h = max(3, (max(n.depth for n in walk_nodes(self.root)) + 1) * 1.8)
-        fig_w = max(6, subtree_leaves(self.root) * 1.2)
-        fig, ax = plt.subplots(figsize=(fig_w, fig_h))
-        ax.axis("off")
-
-        def draw_edges(node: CARTNode):
-            x0, y0 = positions[id(node)]
-            if node.left is not None:
-                x1, y1 = positions[id(node.left)]
-                ax.plot([x0, x1], [y0 - 0.1, y1 + 0.1], linewidth=1)
-                mx, my = (x0 + x1) / 2.0, (y0 + y1) / 2.0
-                ax.text(
-                    mx,
-                    my,
-                    "L",
-                    fontsize=8,
-                    ha="center",
-                    va="center",
-                    bbox=dict(fc="white", ec="none", alpha=0.7),
-                )
-                draw_edges(node.left)
-            if node.right is not None:
-                x1, y1 = positions[id(node.right)]
-                ax.plot([x0, x1], [y0 - 0.1, y1 + 0.1], linewidth=1)
-                mx, my = (x0 + x1) / 2.0, (y0 + y1) / 2.0
-                ax.text(
-                    mx,
-                    my,
-                    "R",
-                    fontsize=8,
-                    ha="center",
-                    va="center",
-                    bbox=dict(fc="white", ec="none", alpha=0.7),
-                )
-                draw_edges(node.right)
-
-        def draw_nodes(node: CARTNode):
-            x, y = positions[id(node)]
-            text = annotate(node)
-            bbox_props = dict(
-                boxstyle="round,pad=0.3",
-                fc="#FFF3E0" if not node.is_leaf() else "#E8F5E9",
-                ec="#90A4AE",
-            )
-            ax.text(x, y, text, fontsize=8, ha="center", va="center", bbox=bbox_props)
-            if node.left is not None:
-                draw_nodes(node.left)
-            if node.right is not None:
-                draw_nodes(node.right)
-
-        draw_edges(self.root)
-        draw_nodes(self.root)
-        plt.tight_layout()
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        fig.savefig(out_path, dpi=160)
-        plt.close(fig)
+        return layout_tree(self.root, annotate, lambda node, side: side, y_gap=1.6)
+
+    def plot_png(self, out_path: str) -> None:
+        draw_png(self._drawing(), out_path, internal_color="#FFF3E0", edge_color=None)
+
+    def plot_svg(self, out_path: str) -> None:
+        """SVG escrito direto no arquivo, sem matplotlib (árvores grandes)."""
+        write_svg(self._drawing(), out_path, internal_color="#FFF3E0", edge_color=None)
 
 
 # ---------------------------
@@ -523,12 +1555,96 @@ def main():
         default=DEFAULT_DATASET_PATH,
         help="Caminho para o CSV (padrão: data/dataset1.csv)",
     )
+    parser.add_argument(
+        "--target",
+        default="Risco",
+        help="Coluna alvo (padrão: Risco; use Target para data/dataset2.csv)",
+    )
     parser.add_argument(
         "--no_png", action="store_true", help="Não salvar PNG da árvore"
     )
     parser.add_argument(
         "--no_dot", action="store_true", help="Não salvar DOT da árvore"
     )
+    parser.add_argument(
+        "--quiet", action="store_true", help="Não exibir os cálculos por nó"
+    )
+    parser.add_argument(
+        "--categorical",
+        choices=["onevsrest", "subset"],
+        default="onevsrest",
+        help="Splits categóricos: onevsrest (attr == v, padrão) ou subset (attr ∈ S, ordenação de Breiman)",
+    )
+    parser.add_argument(
+        "--splitter",
+        choices=["exact", "hist"],
+        default="exact",
+        help="Busca de limiares: exact (todos, padrão) ou hist (histogramas com até --max_bins faixas)",
+    )
+    parser.add_argument(
+        "--max_bins",
+        type=int,
+        default=MAX_BINS,
+        help=f"Faixas por atributo numérico no modo hist (2..{MAX_BINS}, padrão: {MAX_BINS})",
+    )
+    parser.add_argument(
+        "--max_leaves",
+        type=int,
+        default=None,
+        help="Crescimento best-first (maior redução de impureza primeiro) até este número de folhas",
+    )
+    parser.add_argument(
+        "--min_impurity_decrease",
+        type=float,
+        default=None,
+        help="Crescimento best-first: não expande folhas com redução ponderada menor que esta",
+    )
+    parser.add_argument(
+        "--time_budget",
+        type=float,
+        default=None,
+        help="Crescimento best-first: para de expandir após este número de segundos",
+    )
+    parser.add_argument(
+        "--ccp_alpha",
+        type=float,
+        default=None,
+        help="Poda por custo-complexidade com este alfa (padrão: sem poda)",
+    )
+    parser.add_argument(
+        "--ccp_cv",
+        type=int,
+        default=None,
+        help="Escolhe o alfa da poda por validação cruzada com este número de folds",
+    )
+    parser.add_argument(
+        "--n_jobs",
+        type=int,
+        default=None,
+        help="Processos para os folds de --ccp_cv e as árvores de --forest (padrão: núcleos disponíveis; 1 = em série)",
+    )
+    parser.add_argument(
+        "--node_jobs",
+        type=int,
+        default=None,
+        help="Avalia em paralelo os atributos candidatos dos nós grandes com este número de trabalhadores (padrão: em série)",
+    )
+    parser.add_argument(
+        "--forest",
+        type=int,
+        default=None,
+        help="Treina também uma floresta aleatória com este número de árvores e mostra a acurácia out-of-bag",
+    )
+    parser.add_argument(
+        "--trace_jsonl",
+        default=None,
+        help="Grava os eventos do build em JSONL (um registro por linha) em vez de imprimir",
+    )
+    parser.add_argument(
+        "--save_model",
+        default=None,
+        help="Grava a árvore treinada no formato binário (common.model_io)",
+    )
     args = parser.parse_args()
 
     csv_path = args.data
@@ -539,39 +1655,112 @@ def main():
     print(f"Lendo dataset: {csv_path}")
     df = pd.read_csv(csv_path)
 
-    if "Risco" not in df.columns:
-        raise ValueError("Coluna alvo 'Risco' não encontrada no CSV.")
+    target = args.target
+    if target not in df.columns:
+        raise ValueError(f"Coluna alvo '{target}' não encontrada no CSV.")
     if "ID" in df.columns:
         df = df.drop(columns=["ID"])  # identificador, não usar como atributo
 
-    target = "Risco"
     features = [c for c in df.columns if c != target]
 
     print("Atributos:")
     for f in features:
-        print(f"- {f} -> valores: {sorted(df[f].dropna().unique().tolist())}")
+        if pd.api.types.is_numeric_dtype(df[f]):
+            print(f"- {f} -> numérico: [{df[f].min()}, {df[f].max()}]")
+        else:
+            print(f"- {f} -> valores: {sorted(df[f].dropna().unique().tolist())}")
 
-    tree = CARTDecisionTree(target=target)
-    tree.fit(df, features)
+    trace = make_trace(TERMINAL_FORMATS, quiet=args.quiet, jsonl_path=args.trace_jsonl)
+    best_first = (
+        args.max_leaves is not None
+        or args.min_impurity_decrease is not None
+        or args.time_budget is not None
+    )
+    tree = CARTDecisionTree(
+        target=target,
+        trace=trace,
+        order="best" if best_first else "depth",
+        categorical=args.categorical,
+        splitter=args.splitter,
+        max_bins=args.max_bins,
+        max_leaves=args.max_leaves,
+        min_impurity_decrease=args.min_impurity_decrease or 0.0,
+        time_budget=args.time_budget,
+        executor=NodeExecutor(args.node_jobs) if args.node_jobs else None,
+    )
+    try:
+        tree.fit(df, features)
+        if tree.growth_ is not None:
+            stop = tree.growth_["stop"] or "árvore completa"
+            print(f"\nBest-first: {tree.growth_['leaves']} folhas (parada: {stop})")
+        if args.ccp_cv is not None:
+            sel = tree.select_ccp_alpha(df, features, cv=args.ccp_cv, n_jobs=args.n_jobs)
+            best = int(np.flatnonzero(sel["ccp_alphas"] == sel["best_alpha"])[0])
+            print(
+                f"\nPoda custo-complexidade: alfa={sel['best_alpha']:.6f} escolhido por "
+                f"validação cruzada ({args.ccp_cv} folds, acurácia média "
+                f"{sel['mean_accuracy'][best]:.4f}); {sel['removed']} nós removidos"
+            )
+        elif args.ccp_alpha is not None:
+            removed = tree.prune(args.ccp_alpha)
+            print(f"\nPoda custo-complexidade (alfa={args.ccp_alpha:g}): {removed} nós removidos")
+    finally:
+        trace.close()
+        if tree.executor is not None:
+            tree.executor.close()
+
+    if args.splitter == "hist":
+        cmp = tree.compare_with_exact(df, features)
+        print(
+            f"\nModo hist (max_bins={args.max_bins}) vs exato, holdout 30%: "
+            f"acurácia {cmp['acc_this']:.4f} vs {cmp['acc_exact']:.4f} "
+            f"(diferença {cmp['acc_diff']:+.4f}); treino {cmp['fit_s_this']:.2f}s vs "
+            f"{cmp['fit_s_exact']:.2f}s"
+        )
 
     out_dir = os.path.dirname(__file__)
     if not args.no_dot:
-        dot_text = tree.export_dot()
         dot_path = os.path.join(out_dir, "tree_cart.dot")
-        with open(dot_path, "w", encoding="utf-8") as f:
-            f.write(dot_text)
+        tree.write_dot(dot_path)
         print(f"\nDOT salvo em: {dot_path}")
 
     if not args.no_png:
         png_path = os.path.join(out_dir, "tree_cart.png")
-        tree.plot_png(png_path)
-        print(f"PNG salvo em: {png_path}")
+        try:
+            tree.plot_png(png_path)
+            print(f"PNG salvo em: {png_path}")
+        except PngTooLargeError as e:
+            svg_path = os.path.join(out_dir, "tree_cart.svg")
+            tree.plot_svg(svg_path)
+            print(f"{e}\nSVG salvo em: {svg_path}")
 
     # Exporta base de regras
     rules_path = os.path.join(out_dir, "rules_cart.txt")
     tree.export_rules_txt(rules_path)
     print(f"Regras salvas em: {rules_path}")
 
+    if args.save_model:
+        tree.save(args.save_model)
+        print(f"Modelo salvo em: {args.save_model}")
+
+    if args.forest:
+        # bagging + sorteio de atributos por nó, árvores em paralelo (common.forest)
+        forest = RandomForest(
+            CARTDecisionTree,
+            target,
+            n_estimators=args.forest,
+            oob_score=True,
+            n_jobs=args.n_jobs,
+            categorical=args.categorical,
+            splitter=args.splitter,
+            max_bins=args.max_bins,
+        ).fit(df, features)
+        oob = forest.oob_score_
+        print(
+            f"Floresta aleatória ({args.forest} árvores): acurácia out-of-bag "
+            + ("indisponível" if oob is None else f"{oob:.4f}")
+        )
+
 
 if __name__ == "__main__":
     main()
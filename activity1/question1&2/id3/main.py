@@ -9,7 +9,8 @@ O script:
   - para cada atributo candidato: entropias parciais e ganho de informação;
   - atributo escolhido e divisão por valor;
 - Gera:
-  - uma imagem PNG `tree_id3.png` desenhada com matplotlib;
+  - uma imagem PNG `tree_id3.png` desenhada com matplotlib (ou `tree_id3.svg`, se a
+    árvore for larga demais para um PNG legível);
   - um arquivo DOT `tree_id3.dot` (pode ser renderizado com Graphviz, opcional).
 
 Execução:
@@ -19,6 +20,13 @@ Parâmetros opcionais:
   --data <caminho_csv> (padrão: data/dataset1.csv)
   --no_png (não salvar PNG)
   --no_dot (não salvar DOT)
+  --engine pandas|codes (backend de contagem; codes usa np.bincount sobre códigos inteiros)
+  --quiet (não exibir os cálculos por nó)
+  --trace_jsonl <caminho> (grava os eventos do build em JSONL em vez de imprimir)
+  --save_model <caminho> (grava a árvore no formato binário mapeável; ver load())
+  --forest <n> [--n_jobs <n>] (floresta aleatória de n árvores em paralelo; mostra a
+    acurácia out-of-bag)
+  --node_jobs <n> (avalia os atributos candidatos dos nós grandes em paralelo)
 
 Requisitos: pandas, matplotlib (listados em requirements.txt)
 """
@@ -29,13 +37,47 @@ import argparse
 import math
 import os
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
 try:
     from activity1.common import get_repo_root, get_data_path
+    from activity1.common.audit import SplitAudit
+    from activity1.common.export import (
+        dot_escape,
+        dot_lines,
+        iter_rules,
+        rule_lines,
+        write_lines,
+    )
+    from activity1.common.encoding import (
+        class_first_occurrence,
+        contingency_tables,
+        encode_frame,
+        first_occurrence,
+        ordered_class_counts,
+    )
+    from activity1.common.codegen import build_predictor
+    from activity1.common.forest import FeatureSampler, RandomForest
+    from activity1.common.model_io import load_tree, save_tree
+    from activity1.common.parallel import (
+        NodeExecutor,
+        is_parallel,
+        map_tasks,
+        split_chunks,
+    )
+    from activity1.common.render import (
+        PngTooLargeError,
+        TreeDrawing,
+        draw_png,
+        layout_tree,
+        write_svg,
+    )
+    from activity1.common.tree import TreeArrays, compile_nodes
+    from activity1.common.trace import NULL_TRACE, make_trace
+    from activity1.common.traversal import grow, iter_preorder
 except Exception:
     # Permite rodar o script diretamente sem instalar o pacote
     import sys as _sys, os as _os
@@ -44,6 +86,40 @@ except Exception:
         _os.path.abspath(_os.path.join(_os.path.dirname(__file__), "..", "..", ".."))
     )
     from activity1.common import get_repo_root, get_data_path
+    from activity1.common.audit import SplitAudit
+    from activity1.common.export import (
+        dot_escape,
+        dot_lines,
+        iter_rules,
+        rule_lines,
+        write_lines,
+    )
+    from activity1.common.encoding import (
+        class_first_occurrence,
+        contingency_tables,
+        encode_frame,
+        first_occurrence,
+        ordered_class_counts,
+    )
+    from activity1.common.codegen import build_predictor
+    from activity1.common.forest import FeatureSampler, RandomForest
+    from activity1.common.model_io import load_tree, save_tree
+    from activity1.common.parallel import (
+        NodeExecutor,
+        is_parallel,
+        map_tasks,
+        split_chunks,
+    )
+    from activity1.common.render import (
+        PngTooLargeError,
+        TreeDrawing,
+        draw_png,
+        layout_tree,
+        write_svg,
+    )
+    from activity1.common.tree import TreeArrays, compile_nodes
+    from activity1.common.trace import NULL_TRACE, make_trace
+    from activity1.common.traversal import grow, iter_preorder
 
 
 # Caminho padrão resolvido de forma robusta a partir da raiz do repo
@@ -109,6 +185,234 @@ def info_gain(
     return ig, details
 
 
+# ---------------------------
+# Backends de contagem
+# ---------------------------
+
+
+class _FrameBackend:
+    """Contagens via pandas: groupby/value_counts por atributo e cópia do frame por filho.
+
+    Com o executor, os atributos dos nós grandes são avaliados em processos (o groupby
+    não libera o GIL), cada um recebendo só as colunas do atributo e do alvo.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        features: List[str],
+        target: str,
+        executor: Optional[NodeExecutor] = None,
+    ):
+        self.target = target
+        self.executor = executor
+        self.data = df
+
+    def size(self, df: pd.DataFrame) -> int:
+        return len(df)
+
+    def class_counts(self, df: pd.DataFrame) -> Dict[str, int]:
+        return class_distribution(df, self.target)
+
+    def score(self, df: pd.DataFrame, features: List[str]):
+        ex = self.executor
+        split = is_parallel(ex, len(df), len(features))
+        tasks = [
+            (df[[a, self.target]] if split else df, a, self.target) for a in features
+        ]
+        results = map_tasks(ex, info_gain, tasks, len(df), kind="process")
+        for attr, (ig, details) in zip(features, results):
+            yield attr, ig, details
+
+    def partition(self, df: pd.DataFrame, attr: str):
+        for v, df_child in df.groupby(attr):
+            yield v, df_child.drop(columns=[attr])
+
+
+class _CodesBackend:
+    """Contagens sobre códigos inteiros: o frame é codificado uma vez e cada nó é só um
+    vetor de índices de linhas. Todas as tabelas (valor × classe) do nó saem de um único
+    np.bincount; nenhum DataFrame é copiado.
+
+    Os dicts de contagem seguem a ordem de value_counts (contagem decrescente, depois ordem
+    de aparição), de modo que desempates e logs coincidem com o backend pandas. Com o
+    executor, as tabelas de nós grandes são contadas em fatias de atributos, uma por
+    thread.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        features: List[str],
+        target: str,
+        executor: Optional[NodeExecutor] = None,
+    ):
+        self.executor = executor
+        self.enc = encode_frame(df, features, target)
+        self.col = {a: j for j, a in enumerate(features)}
+        self.data = np.arange(len(df), dtype=np.int64)
+
+    def size(self, rows: np.ndarray) -> int:
+        return len(rows)
+
+    def class_counts(self, rows: np.ndarray) -> Dict[str, int]:
+        enc = self.enc
+        y = enc.y[rows]
+        counts = np.bincount(y, minlength=enc.n_classes)
+        first = class_first_occurrence(y, enc.n_classes)
+        return ordered_class_counts(counts, first, enc.classes)
+
+    def score(self, rows: np.ndarray, features: List[str]):
+        enc = self.enc
+        cols = [self.col[a] for a in features]
+        ex = self.executor
+        chunks = [cols]
+        if is_parallel(ex, len(rows), len(cols)):
+            chunks = split_chunks(cols, ex.workers)
+        parts = map_tasks(ex, self._tables, [(rows, c) for c in chunks], len(rows))
+        tables = [t for part, _ in parts for t in part]
+        firsts = [f for _, part in parts for f in part]
+        h_before = entropy(self.class_counts(rows))
+        n_total = len(rows)
+        for attr, j, table, first in zip(features, cols, tables, firsts):
+            details: Dict[Any, Dict[str, Any]] = {}
+            h_after = 0.0
+            sizes = table.sum(axis=1)
+            for v in np.flatnonzero(sizes):
+                cc = ordered_class_counts(table[v], first[v], enc.classes)
+                h_v = entropy(cc)
+                w = int(sizes[v]) / n_total
+                details[enc.categories[j][v]] = {
+                    "n": int(sizes[v]),
+                    "class_counts": cc,
+                    "entropy": h_v,
+                    "weight": w,
+                }
+                h_after += w * h_v
+            yield attr, h_before - h_after, details
+
+    def _tables(self, rows: np.ndarray, cols: List[int]):
+        return contingency_tables(self.enc, rows, cols), first_occurrence(
+            self.enc, rows, cols
+        )
+
+    def partition(self, rows: np.ndarray, attr: str):
+        j = self.col[attr]
+        codes = self.enc.X[rows, j]
+        # ordenação estável preserva a ordem original das linhas dentro de cada filho
+        order = np.argsort(codes, kind="stable")
+        sizes = np.bincount(codes + 1, minlength=self.enc.n_values(j) + 1)
+        bounds = np.cumsum(sizes)
+        for v in range(self.enc.n_values(j)):
+            if sizes[v + 1] == 0:
+                continue
+            yield self.enc.categories[j][v], rows[order[bounds[v] : bounds[v + 1]]]
+
+
+_BACKENDS = {"pandas": _FrameBackend, "codes": _CodesBackend}
+
+
+def _better(attr: str, ig: float, best_attr: Optional[str], best_ig: float) -> bool:
+    """Critério de escolha do atributo: maior IG; empate (isclose) -> menor nome."""
+    return ig > best_ig or (
+        math.isclose(ig, best_ig, rel_tol=1e-12)
+        and (best_attr is None or attr < best_attr)
+    )
+
+
+# ---------------------------
+# Estado incremental (partial_fit)
+# ---------------------------
+
+
+def _ordered(counts: Dict[str, int], first: Dict[str, int]) -> Dict[str, int]:
+    """Ordem de value_counts: contagem decrescente, depois ordem de aparição."""
+    return {c: counts[c] for c in sorted(counts, key=lambda c: (-counts[c], first[c]))}
+
+
+class _IncStats:
+    """Contagens de um nó mantidas pelo partial_fit (estilo ID5R).
+
+    Guarda a distribuição de classes e, para cada atributo candidato do nó, a tabela
+    valor -> classe -> contagem, além da primeira linha em que cada par apareceu (para
+    reproduzir os desempates do fit em lote). `rows` são as linhas que terminam neste nó:
+    todas, se folha; as de valor ausente no atributo do split, se nó interno.
+    """
+
+    __slots__ = ("features", "cols", "counts", "first", "tables", "tfirst", "rows")
+
+    def __init__(self, features: List[str], col: Dict[str, int]):
+        self.features = features
+        self.cols = [col[a] for a in features]
+        self.counts: Dict[str, int] = {}
+        self.first: Dict[str, int] = {}
+        self.tables: List[Dict[Any, Dict[str, int]]] = [{} for _ in features]
+        self.tfirst: List[Dict[Any, Dict[str, int]]] = [{} for _ in features]
+        self.rows: List[int] = []
+
+    def add(self, rid: int, row: Tuple, y: str) -> None:
+        self.counts[y] = self.counts.get(y, 0) + 1
+        self.first.setdefault(y, rid)
+        for table, tfirst, j in zip(self.tables, self.tfirst, self.cols):
+            v = row[j]
+            if pd.isna(v):
+                continue
+            t = table.setdefault(v, {})
+            t[y] = t.get(y, 0) + 1
+            tfirst.setdefault(v, {}).setdefault(y, rid)
+
+    def class_counts(self) -> Dict[str, int]:
+        return _ordered(self.counts, self.first)
+
+    def score(self, counts: Dict[str, int]):
+        """Mesmo cálculo de info_gain, a partir das tabelas guardadas (sem reler dados)."""
+        h_before = entropy(counts)
+        n_total = sum(counts.values())
+        for attr, table, tfirst in zip(self.features, self.tables, self.tfirst):
+            details: Dict[Any, Dict[str, Any]] = {}
+            h_after = 0.0
+            for v in sorted(table):
+                cc = _ordered(table[v], tfirst[v])
+                n_v = sum(cc.values())
+                h_v = entropy(cc)
+                w = n_v / n_total
+                details[v] = {"n": n_v, "class_counts": cc, "entropy": h_v, "weight": w}
+                h_after += w * h_v
+            yield attr, h_before - h_after, details
+
+
+# ---------------------------
+# Trace (logs didáticos)
+# ---------------------------
+
+
+def _fmt_attr(r: Dict[str, Any]) -> str:
+    lines = [f"\nAtributo '{r['attr']}': IG={r['ig']:.6f}"]
+    for v, d in r["details"].items():
+        lines.append(
+            f"  - {r['attr']} = {v} -> n={d['n']}, dist={d['class_counts']}, H={d['entropy']:.4f}, peso={d['weight']:.3f}"
+        )
+    return "\n".join(lines)
+
+
+_LEAF_REASONS = {
+    "pure": "Folha pura: classe={cls}",
+    "no_attrs": "Folha (sem atributos): classe majoritária={cls}",
+    "no_gain": "Folha (IG<=0): classe majoritária={cls}",
+}
+
+TERMINAL_FORMATS = {
+    "node": lambda r: (
+        "\n" + "-" * 80 + f"\nNó (profundidade={r['depth']})\n"
+        f"Amostras: {r['samples']} | Distribuição de classes: {r['counts']} | Entropia: {r['entropy']:.4f}"
+    ),
+    "leaf": lambda r: _LEAF_REASONS[r["reason"]].format(cls=r["cls"]),
+    "attr": _fmt_attr,
+    "split": lambda r: f"\n=> Escolhido split por '{r['attr']}' (IG={r['ig']:.6f})",
+    "child": lambda r: f"  Gerando filho para {r['attr']} = {r['value']} (n={r['n']})",
+}
+
+
 # ---------------------------
 # Estruturas da árvore ID3
 # ---------------------------
@@ -122,10 +426,8 @@ class ID3Node:
     entropy: float
     split_attr: Optional[str] = None
     split_ig: float = 0.0
-    # Para debug/log: ganhos testados neste nó
-    tested_attrs: List[Tuple[str, float, Dict[Any, Dict[str, Any]]]] = field(
-        default_factory=list
-    )
+    # Id do nó no registro de auditoria (-1 sem auditoria)
+    node_id: int = -1
     # Filhos: valor do atributo -> nó
     children: Dict[Any, "ID3Node"] = field(default_factory=dict)
     # Classe da folha (se folha)
@@ -134,14 +436,314 @@ class ID3Node:
     def is_leaf(self) -> bool:
         return self.predicted_class is not None
 
+    def edges(self) -> List[Tuple[Any, "ID3Node"]]:
+        return list(self.children.items())
+
 
 class ID3DecisionTree:
-    def __init__(self, target: str):
+    """Árvore ID3.
+
+    engine:
+      - "pandas": contagens com groupby/value_counts sobre cópias do DataFrame (original);
+      - "codes": codifica a tabela uma vez em inteiros e conta com np.bincount sobre
+        vetores de índices. Produz a mesma árvore, com custo muito menor em tabelas largas.
+
+    trace: destino dos eventos do build (common.trace). Padrão: nenhum (fit silencioso);
+    TerminalTrace(TERMINAL_FORMATS) reproduz os logs didáticos.
+
+    order: ordem de expansão dos nós, sem recursão ("depth" = pré-ordem, como antes;
+    "breadth" = nível a nível).
+
+    audit: guarda os ganhos de todos os atributos testados em cada nó em `audit_`
+    (common.audit.SplitAudit, uma linha por ramo). Desligado, nada é registrado.
+
+    max_features: avalia em cada nó só um sorteio dos atributos restantes
+    (common.forest.FeatureSampler, semente `random_state`); None = todos. É o sorteio
+    por nó das florestas aleatórias (common.forest.RandomForest).
+
+    executor: common.parallel.NodeExecutor que avalia os atributos dos nós grandes em
+    paralelo (processos no engine pandas, threads no codes); None = em série.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        engine: str = "pandas",
+        trace=None,
+        order: str = "depth",
+        audit: bool = False,
+        max_features: Any = None,
+        random_state: Any = None,
+        executor: Optional[NodeExecutor] = None,
+    ):
+        if engine not in _BACKENDS:
+            raise ValueError(
+                f"engine inválido: {engine!r} (use um de {sorted(_BACKENDS)})"
+            )
         self.target = target
+        self.engine = engine
+        self.trace = trace if trace is not None else NULL_TRACE
+        self.order = order
+        self.audit = audit
+        self.audit_: Optional[SplitAudit] = None
+        self.max_features = max_features
+        self.random_state = random_state
+        self._sampler = (
+            None if max_features is None else FeatureSampler(max_features, random_state)
+        )
+        self.executor = executor
         self.root: Optional[ID3Node] = None
+        self.features: List[str] = []
+        self._flat: Optional[TreeArrays] = None
+        # função de predição por linha gerada em código (compiled_predictor)
+        self._row_fn: Optional[Tuple[TreeArrays, Callable[[Mapping[str, Any]], Any]]] = None
+        # Estado do partial_fit (None enquanto a árvore não for incremental)
+        self._inc: Optional[Dict[int, _IncStats]] = None
+        self._rows: List[Tuple] = []
+        self._labels: List[str] = []
+        self._col: Dict[str, int] = {}
 
     def fit(self, df: pd.DataFrame, features: List[str]) -> None:
-        self.root = self._build(df, features, depth=0)
+        self.features = list(features)
+        self._flat = None
+        self._inc = None
+        self.audit_ = SplitAudit() if self.audit else None
+        if self._sampler is not None:
+            self._sampler.reset()
+        backend = _BACKENDS[self.engine](df, features, self.target, self.executor)
+        self.root = grow(
+            (backend.data, features, 0, None),
+            lambda task: self._expand(backend, *task),
+            self._attach,
+            order=self.order,
+        )
+
+    @staticmethod
+    def _attach(parent: ID3Node, value: Any, child: ID3Node) -> None:
+        parent.children[value] = child
+
+    # -------------------
+    # Atualização incremental (ID5R)
+    # -------------------
+
+    def partial_fit(
+        self, df: pd.DataFrame, features: Optional[List[str]] = None
+    ) -> None:
+        """Acrescenta exemplos rotulados sem retreinar a árvore inteira.
+
+        Na primeira chamada faz um fit em lote e passa a manter, em cada nó, as contagens
+        de classes e de (valor × classe) por atributo. Nas seguintes, cada linha nova só
+        atualiza as contagens ao longo do seu caminho e reavalia o melhor atributo desses
+        nós — custo proporcional à profundidade, não ao tamanho da base. Apenas as
+        subárvores cujo atributo escolhido muda (ou folhas que passam a ter split) são
+        reconstruídas, a partir das linhas guardadas nelas. O resultado é a mesma árvore
+        de um fit em lote sobre todos os dados vistos, na mesma ordem.
+        """
+        if self._sampler is not None:
+            raise ValueError("partial_fit não suporta max_features (sorteio por nó).")
+        if self.root is None:
+            feats = features or [c for c in df.columns if c != self.target]
+            self.fit(df, feats)
+            self._rows, self._labels = [], []
+            self._inc = {}
+            self._col = {a: j for j, a in enumerate(self.features)}
+            rids = self._store_rows(df)
+            self._route(self.root, self.features, rids)
+            return
+        if self._inc is None:
+            raise ValueError(
+                "partial_fit só continua árvores iniciadas com partial_fit (não com fit)."
+            )
+        self._flat = None
+        for rid in self._store_rows(df):
+            self._update(rid)
+
+    def _store_rows(self, df: pd.DataFrame) -> List[int]:
+        start = len(self._rows)
+        self._rows.extend(df[self.features].itertuples(index=False, name=None))
+        self._labels.extend(df[self.target].astype(str).tolist())
+        return list(range(start, len(self._rows)))
+
+    def _route(self, node: ID3Node, features: List[str], rids: List[int]) -> None:
+        """Cria as estatísticas de uma subárvore distribuindo `rids` (em ordem) por ela."""
+        inc = self._inc
+        inc[id(node)] = _IncStats(features, self._col)
+        for n in iter_preorder(node):
+            if not n.is_leaf():
+                rest = [a for a in inc[id(n)].features if a != n.split_attr]
+                for ch in n.children.values():
+                    inc[id(ch)] = _IncStats(rest, self._col)
+        for rid in rids:
+            row, y = self._rows[rid], self._labels[rid]
+            n = node
+            while True:
+                st = inc[id(n)]
+                st.add(rid, row, y)
+                if n.is_leaf():
+                    st.rows.append(rid)
+                    break
+                v = row[self._col[n.split_attr]]
+                if pd.isna(v) or v not in n.children:
+                    st.rows.append(rid)
+                    break
+                n = n.children[v]
+
+    def _decide(self, st: _IncStats):
+        """Reaplica os critérios de _expand sobre as contagens guardadas.
+
+        Retorna (counts, entropia, tested, melhor_atributo, melhor_ig, motivo_de_folha).
+        """
+        counts = st.class_counts()
+        h = entropy(counts)
+        if h == 0.0:
+            return counts, h, [], None, 0.0, "pure"
+        if not st.features:
+            return counts, h, [], None, 0.0, "no_attrs"
+        tested = list(st.score(counts))
+        best_attr, best_ig = None, -1.0
+        for attr, ig, _ in tested:
+            if _better(attr, ig, best_attr, best_ig):
+                best_attr, best_ig = attr, ig
+        if best_attr is None or best_ig <= 0.0:
+            return counts, h, tested, None, 0.0, "no_gain"
+        return counts, h, tested, best_attr, best_ig, None
+
+    def _update(self, rid: int) -> None:
+        row, y = self._rows[rid], self._labels[rid]
+        parent: Optional[ID3Node] = None
+        key: Any = None
+        node = self.root
+        while True:
+            st = self._inc[id(node)]
+            st.add(rid, row, y)
+            counts, h, tested, best_attr, best_ig, reason = self._decide(st)
+            if best_attr != node.split_attr:
+                # o melhor atributo mudou: só esta subárvore é reconstruída
+                self._regrow(parent, key, node, rid)
+                return
+            node.samples = sum(counts.values())
+            node.class_counts = counts
+            node.entropy = h
+            if node.is_leaf():
+                node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
+                st.rows.append(rid)
+                return
+            node.split_ig = float(best_ig)
+            v = row[self._col[node.split_attr]]
+            if pd.isna(v):
+                st.rows.append(rid)
+                return
+            child = node.children.get(v)
+            if child is None:
+                # valor novo neste nó: novo ramo (mantém a ordem ordenada do groupby)
+                child = self._grow_rows([rid], st.features, node.split_attr, node.depth + 1)
+                node.children[v] = child
+                node.children = dict(sorted(node.children.items(), key=lambda kv: kv[0]))
+                return
+            parent, key, node = node, v, child
+
+    def _grow_rows(
+        self, rids: List[int], features: List[str], drop: Optional[str], depth: int
+    ) -> ID3Node:
+        """Fit em lote de uma subárvore sobre as linhas guardadas `rids`."""
+        feats = [a for a in features if a != drop]
+        frame = pd.DataFrame.from_records(
+            [self._rows[i] for i in rids], columns=self.features
+        )
+        frame[self.target] = [self._labels[i] for i in rids]
+        backend = _BACKENDS[self.engine](frame, feats, self.target, self.executor)
+        sub = grow(
+            (backend.data, feats, depth, None),
+            lambda task: self._expand(backend, *task),
+            self._attach,
+            order=self.order,
+        )
+        self._route(sub, feats, rids)
+        return sub
+
+    def _regrow(
+        self, parent: Optional[ID3Node], key: Any, node: ID3Node, rid: int
+    ) -> None:
+        features = self._inc[id(node)].features
+        rids: List[int] = [rid]
+        for n in iter_preorder(node):
+            rids.extend(self._inc.pop(id(n)).rows)
+        rids.sort()
+        sub = self._grow_rows(rids, features, None, node.depth)
+        if parent is None:
+            self.root = sub
+        else:
+            parent.children[key] = sub
+
+    # -------------------
+    # Predição em lote
+    # -------------------
+
+    def compile(self) -> TreeArrays:
+        """Emite a árvore no núcleo em vetores NumPy (common.tree; cacheado até o
+        próximo fit/partial_fit)."""
+        assert self.root is not None
+        if self._flat is None:
+            self._flat = compile_nodes(
+                self.root, self.features, "entropy", stats=("split_ig",)
+            )
+        return self._flat
+
+    def save(self, path: str) -> None:
+        """Grava a árvore no formato binário de common.model_io."""
+        save_tree(
+            self.compile(),
+            path,
+            {"algorithm": "id3", "target": self.target, "engine": self.engine},
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "ID3DecisionTree":
+        """Abre um modelo salvo com save(); com mmap=True os vetores ficam mapeados do
+        arquivo. `root` passa a ser uma vista (NodeView) sobre eles: predição, regras e
+        exportações funcionam sem reconstruir os nós, mas não partial_fit."""
+        tree, meta = load_tree(path, mmap=mmap, algorithm="id3")
+        model = cls(meta["target"], engine=meta["engine"])
+        model.features = list(tree.features)
+        model.root = tree.root
+        model._flat = tree
+        return model
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.compile().classes
+
+    def compiled_predictor(
+        self, cache_dir: Optional[str] = None
+    ) -> Callable[[Mapping[str, Any]], Any]:
+        """Função predict_row(row) gerada em Python para a árvore atual
+        (common.codegen), em cache no disco pelo hash da árvore."""
+        tree = self.compile()
+        if self._row_fn is None or self._row_fn[0] is not tree:
+            self._row_fn = (
+                tree,
+                build_predictor(tree, cache_dir=cache_dir),
+            )
+        return self._row_fn[1]
+
+    def predict_row(self, row: Mapping[str, Any]) -> Any:
+        """Classe prevista para uma linha (dict atributo -> valor), pela função gerada:
+        mesmo resultado de predict, sem montar DataFrame nem percorrer os vetores."""
+        return self.compiled_predictor()(row)
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """Distribuição de classes (colunas na ordem de `classes_`) por linha.
+
+        Todas as linhas descem juntas, um nível por passo; um valor sem ramo no nó
+        (categoria desconhecida ou ausente) para no próprio nó e usa sua distribuição.
+        """
+        flat = self.compile()
+        return flat.predict_proba(flat.encode(df))
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """Classe prevista por linha (classe majoritária do nó onde a linha parou)."""
+        flat = self.compile()
+        return flat.predict(flat.encode(df))
 
     # -------------------
     # Regras (base de regras)
@@ -158,188 +760,141 @@ class ID3DecisionTree:
           - support: float (n/N_total)
           - confidence: float (count(predicted_class)/n)
         """
-        assert self.root is not None
-
-        rules: List[Dict[str, Any]] = []
-        N_total = max(1, self.root.samples)
+        return list(self.iter_rules())
 
-        def dfs(node: ID3Node, conditions: List[Tuple[str, str, Any]]):
-            if node.is_leaf():
-                n = node.samples
-                cc = node.class_counts
-                # Usa lambda para evitar ambiguidade de tipos no linter
-                y = node.predicted_class or (
-                    max(cc, key=lambda k: cc[k]) if cc else "?"
-                )
-                hits = cc.get(y, 0) if cc else 0
-                confidence = (hits / n) if n > 0 else 0.0
-                support = (n / N_total) if N_total > 0 else 0.0
-                rules.append(
-                    {
-                        "conditions": list(conditions),
-                        "predicted_class": y,
-                        "n": n,
-                        "class_counts": cc,
-                        "support": support,
-                        "confidence": confidence,
-                        "hits": hits,
-                    }
-                )
-                return
-            # nó interno
-            split_attr = node.split_attr
-            for val, ch in node.children.items():
-                cond = (split_attr or "?", "=", val)
-                dfs(ch, conditions + [cond])
-
-        dfs(self.root, [])
-        return rules
+    def iter_rules(self, copy: bool = True) -> Iterator[Dict[str, Any]]:
+        """Regras de extract_rules uma a uma (common.export.iter_rules)."""
+        assert self.root is not None
+        return iter_rules(
+            self.root, lambda node, val: (node.split_attr or "?", "=", val), copy
+        )
 
     def export_rules_txt(self, out_path: str) -> None:
+        """Escreve as regras no arquivo à medida que são geradas."""
         assert self.root is not None
-        rules = self.extract_rules()
-        lines: List[str] = []
-        lines.append(f"# Base de regras (ID3) — alvo: {self.target}")
-        lines.append(f"# Total de amostras de treino: {self.root.samples}")
-        for i, r in enumerate(rules, start=1):
-            conds = (
-                " E ".join([f"{a} {op} {v}" for (a, op, v) in r["conditions"]])
-                or "(sempre)"
-            )
-            cls = r["predicted_class"]
-            n = r["n"]
-            sup = r["support"] * 100.0
-            conf = r["confidence"] * 100.0
-            dist = ", ".join(f"{k}:{v}" for k, v in r["class_counts"].items())
-            lines.append(
-                f"Regra {i}: SE {conds} ENTÃO {self.target} = {cls} "
-                f"(n={n}, suporte={sup:.2f}%, confiança={conf:.2f}%, dist=[{dist}])"
-            )
+        lines = rule_lines(
+            self.iter_rules(copy=False),
+            "Base de regras (ID3)",
+            self.target,
+            self.root.samples,
+        )
         os.makedirs(os.path.dirname(out_path), exist_ok=True)
         with open(out_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines) + "\n")
-
-    def _build(self, df: pd.DataFrame, features: List[str], depth: int) -> ID3Node:
-        counts = class_distribution(df, self.target)
+            write_lines(f, lines)
+
+    def _candidates(self, features: List[str]) -> List[str]:
+        """Atributos avaliados no nó: todos, ou o sorteio de max_features."""
+        return features if self._sampler is None else self._sampler(features)
+
+    def _expand(self, backend, data, features: List[str], depth: int, announce):
+        """Cria o nó de `data` e devolve as tarefas dos filhos (sem recursão)."""
+        tr = self.trace
+        if announce is not None and tr.enabled:
+            tr.emit("child", **announce)
+        counts = backend.class_counts(data)
         node_entropy = entropy(counts)
         node = ID3Node(
             depth=depth,
-            samples=len(df),
+            samples=backend.size(data),
             class_counts=counts,
             entropy=node_entropy,
         )
+        audit = self.audit_
+        if audit is not None:
+            node.node_id = audit.new_node()
 
         # Log: estado do nó
-        print("\n" + "-" * 80)
-        path_str = f"Nó (profundidade={depth})"
-        print(path_str)
-        print(
-            f"Amostras: {node.samples} | Distribuição de classes: {counts} | Entropia: {node_entropy:.4f}"
-        )
+        if tr.enabled:
+            tr.emit(
+                "node",
+                depth=depth,
+                samples=node.samples,
+                counts=counts,
+                entropy=node_entropy,
+            )
 
         # Critérios de parada
         if node_entropy == 0.0:
             # puro
             node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
-            print(f"Folha pura: classe={node.predicted_class}")
-            return node
+            if tr.enabled:
+                tr.emit("leaf", reason="pure", cls=node.predicted_class)
+            return node, []
         if not features:
             # sem atributos restantes -> maioria
             node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
-            print(f"Folha (sem atributos): classe majoritária={node.predicted_class}")
-            return node
+            if tr.enabled:
+                tr.emit("leaf", reason="no_attrs", cls=node.predicted_class)
+            return node, []
 
         # Avalia IG de cada atributo categórico restante
         best_attr = None
         best_ig = -1.0
-        best_details: Dict[Any, Dict[str, Any]] = {}
-        for attr in features:
-            ig, details = info_gain(df, attr, self.target)
-            node.tested_attrs.append((attr, ig, details))
-            print(f"\nAtributo '{attr}': IG={ig:.6f}")
-            # Mostra detalhes por valor
-            for v, d in details.items():
-                print(
-                    f"  - {attr} = {v} -> n={d['n']}, dist={d['class_counts']}, H={d['entropy']:.4f}, peso={d['weight']:.3f}"
-                )
-            if ig > best_ig or (
-                math.isclose(ig, best_ig, rel_tol=1e-12)
-                and (best_attr is None or attr < best_attr)
-            ):
-                best_attr, best_ig, best_details = attr, ig, details
+        for attr, ig, details in backend.score(data, self._candidates(features)):
+            if audit is not None:
+                audit.add_branches(node.node_id, attr, ig, details)
+            if tr.enabled:
+                tr.emit("attr", attr=attr, ig=ig, details=details)
+            # mesmo critério do partial_fit (_decide), para as árvores coincidirem
+            if _better(attr, ig, best_attr, best_ig):
+                best_attr, best_ig = attr, ig
 
         # Se IG é zero (ou negativa por numérico), vira folha pela maioria
         if best_attr is None or best_ig <= 0.0:
             node.predicted_class = max(counts.items(), key=lambda kv: kv[1])[0]
-            print(f"Folha (IG<=0): classe majoritária={node.predicted_class}")
-            return node
+            if tr.enabled:
+                tr.emit("leaf", reason="no_gain", cls=node.predicted_class)
+            return node, []
 
         node.split_attr = best_attr
         node.split_ig = float(best_ig)
-        print(f"\n=> Escolhido split por '{best_attr}' (IG={best_ig:.6f})")
+        if tr.enabled:
+            tr.emit("split", attr=best_attr, ig=best_ig)
 
         # Divide e cria filhos; remove atributo escolhido do conjunto
         remaining = [a for a in features if a != best_attr]
-        for v, df_child in df.groupby(best_attr):
-            print(f"  Gerando filho para {best_attr} = {v} (n={len(df_child)})")
-            child = self._build(
-                df_child.drop(columns=[best_attr]), remaining, depth + 1
-            )
-            node.children[v] = child
+        tasks = []
+        for v, child_data in backend.partition(data, best_attr):
+            announce = None
+            if tr.enabled:
+                announce = dict(attr=best_attr, value=v, n=backend.size(child_data))
+            tasks.append((v, (child_data, remaining, depth + 1, announce)))
 
-        return node
+        return node, tasks
 
     # -------------------
     # Exportações/plots
     # -------------------
 
-    def export_dot(self) -> str:
+    def iter_dot(self) -> Iterator[str]:
         assert self.root is not None
-        lines: List[str] = [
-            "digraph ID3 {",
-            "  node [shape=box, style=rounded, fontsize=10];",
-        ]
-        _id_counter = [0]
-
-        def next_id() -> int:
-            _id_counter[0] += 1
-            return _id_counter[0]
-
-        def escape(s: str) -> str:
-            return str(s).replace("\n", "\\n").replace('"', '\\"')
 
         def label_for(node: ID3Node) -> str:
             dist_str = ", ".join(f"{k}:{v}" for k, v in node.class_counts.items())
             if node.is_leaf():
-                return escape(
+                return dot_escape(
                     f"Leaf\nN={node.samples}\nH={node.entropy:.3f}\nDist:[{dist_str}]\nClass={node.predicted_class}"
                 )
             else:
-                return escape(
+                return dot_escape(
                     f"N={node.samples} H={node.entropy:.3f}\nDist:[{dist_str}]\nSplit: {node.split_attr}\nIG={node.split_ig:.3f}"
                 )
 
-        def walk(node: ID3Node) -> int:
-            nid = next_id()
-            lines.append(f'  n{nid} [label="{label_for(node)}"];')
-            if not node.is_leaf():
-                for val, ch in node.children.items():
-                    cid = walk(ch)
-                    lines.append(f'  n{nid} -> n{cid} [label="{escape(val)}"];')
-            return nid
+        return dot_lines(
+            self.root, "ID3", label_for, lambda node, val: dot_escape(val)
+        )
 
-        walk(self.root)
-        lines.append("}")
-        return "\n".join(lines)
+    def export_dot(self) -> str:
+        return "\n".join(self.iter_dot())
 
-    def plot_png(self, out_path: str) -> None:
-        assert self.root is not None
+    def write_dot(self, out_path: str) -> None:
+        """DOT escrito direto no arquivo, linha a linha."""
+        with open(out_path, "w", encoding="utf-8") as f:
+            write_lines(f, self.iter_dot(), end="")
 
-        # Layout simples: posiciona nós por profundidade e ordem em DFS usando largura de subárvore
-        def subtree_leaves(node: ID3Node) -> int:
-            if node.is_leaf() or not node.children:
-                return 1
-            return sum(subtree_leaves(ch) for ch in node.children.values())
+    def _drawing(self) -> TreeDrawing:
+        """Layout da árvore (common.render) com os textos de cada nó e aresta."""
+        assert self.root is not None
 
         def annotate(node: ID3Node) -> str:
             dist_str = ", ".join(f"{k}:{v}" for k, v in node.class_counts.items())
@@ -347,77 +902,14 @@ class ID3DecisionTree:
                 return f"Leaf\nN={node.samples}\nH={node.entropy:.3f}\n[{dist_str}]\nClass={node.predicted_class}"
             return f"N={node.samples} H={node.entropy:.3f}\n[{dist_str}]\nSplit: {node.split_attr}\nIG={node.split_ig:.3f}"
 
-        x_gap = 1.0
-        y_gap = 1.5
-
-        def assign_pos(
-            node: ID3Node, depth: int, x_start: float
-        ) -> Tuple[float, float, float]:
-            width = subtree_leaves(node)
-            # posição x central do nó
-            x_center = x_start + (width - 1) * x_gap / 2.0
-            y = -depth * y_gap
-            positions[id(node)] = (x_center, y)
-            # recursão
-            cur_x = x_start
-            for ch in node.children.values():
-                ch_width = subtree_leaves(ch)
-                assign_pos(ch, depth + 1, cur_x)
-                cur_x += (ch_width) * x_gap
-            return x_center, y, width
-
-        positions: Dict[int, Tuple[float, float]] = {}
-        assign_pos(self.root, 0, 0.0)
-
-        # Função para percorrer nós (usada para dimensionar figura)
-        def walk_nodes(node: ID3Node):
-            yield node
-            for ch in node.children.values():
-                yield from walk_nodes(ch)
-
-        # Desenho
-        fig_h = max(3, (max(n.depth for n in walk_nodes(self.root)) + 1) * 1.8)
-        fig_w = max(6, subtree_leaves(self.root) * 1.2)
-        fig, ax = plt.subplots(figsize=(fig_w, fig_h))
-        ax.axis("off")
-
-        # Links primeiro
-        def draw_edges(node: ID3Node):
-            x0, y0 = positions[id(node)]
-            for val, ch in node.children.items():
-                x1, y1 = positions[id(ch)]
-                ax.plot([x0, x1], [y0 - 0.1, y1 + 0.1], color="#555", linewidth=1)
-                # rótulo da aresta
-                mx, my = (x0 + x1) / 2.0, (y0 + y1) / 2.0
-                ax.text(
-                    mx,
-                    my,
-                    str(val),
-                    fontsize=8,
-                    ha="center",
-                    va="center",
-                    bbox=dict(fc="white", ec="none", alpha=0.7),
-                )
-                draw_edges(ch)
-
-        def draw_nodes(node: ID3Node):
-            x, y = positions[id(node)]
-            text = annotate(node)
-            bbox_props = dict(
-                boxstyle="round,pad=0.3",
-                fc="#E8F0FE" if not node.is_leaf() else "#E8F5E9",
-                ec="#90A4AE",
-            )
-            ax.text(x, y, text, fontsize=8, ha="center", va="center", bbox=bbox_props)
-            for ch in node.children.values():
-                draw_nodes(ch)
+        return layout_tree(self.root, annotate, lambda node, val: str(val), y_gap=1.5)
 
-        draw_edges(self.root)
-        draw_nodes(self.root)
-        plt.tight_layout()
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        fig.savefig(out_path, dpi=160)
-        plt.close(fig)
+    def plot_png(self, out_path: str) -> None:
+        draw_png(self._drawing(), out_path, internal_color="#E8F0FE")
+
+    def plot_svg(self, out_path: str) -> None:
+        """SVG escrito direto no arquivo, sem matplotlib (árvores grandes)."""
+        write_svg(self._drawing(), out_path, internal_color="#E8F0FE")
 
 
 # ---------------------------
@@ -440,6 +932,43 @@ def main():
     parser.add_argument(
         "--no_dot", action="store_true", help="Não salvar DOT da árvore"
     )
+    parser.add_argument(
+        "--engine",
+        choices=sorted(_BACKENDS),
+        default="pandas",
+        help="Backend de contagem: pandas (groupby) ou codes (np.bincount sobre códigos)",
+    )
+    parser.add_argument(
+        "--quiet", action="store_true", help="Não exibir os cálculos por nó"
+    )
+    parser.add_argument(
+        "--trace_jsonl",
+        default=None,
+        help="Grava os eventos do build em JSONL (um registro por linha) em vez de imprimir",
+    )
+    parser.add_argument(
+        "--save_model",
+        default=None,
+        help="Grava a árvore treinada no formato binário (common.model_io)",
+    )
+    parser.add_argument(
+        "--forest",
+        type=int,
+        default=None,
+        help="Treina também uma floresta aleatória com este número de árvores e mostra a acurácia out-of-bag",
+    )
+    parser.add_argument(
+        "--n_jobs",
+        type=int,
+        default=None,
+        help="Processos para a floresta de --forest (padrão: núcleos disponíveis; 1 = em série)",
+    )
+    parser.add_argument(
+        "--node_jobs",
+        type=int,
+        default=None,
+        help="Avalia em paralelo os atributos candidatos dos nós grandes com este número de trabalhadores (padrão: em série)",
+    )
     args = parser.parse_args()
 
     csv_path = args.data
@@ -465,28 +994,62 @@ def main():
     for f in features:
         print(f"- {f} -> valores: {sorted(df[f].dropna().unique().tolist())}")
 
-    tree = ID3DecisionTree(target=target)
-    tree.fit(df, features)
+    trace = make_trace(TERMINAL_FORMATS, quiet=args.quiet, jsonl_path=args.trace_jsonl)
+    tree = ID3DecisionTree(
+        target=target,
+        engine=args.engine,
+        trace=trace,
+        executor=NodeExecutor(args.node_jobs) if args.node_jobs else None,
+    )
+    try:
+        tree.fit(df, features)
+    finally:
+        trace.close()
+        if tree.executor is not None:
+            tree.executor.close()
 
     # Exporta DOT e PNG
     out_dir = os.path.dirname(__file__)
     if not args.no_dot:
-        dot_text = tree.export_dot()
         dot_path = os.path.join(out_dir, "tree_id3.dot")
-        with open(dot_path, "w", encoding="utf-8") as f:
-            f.write(dot_text)
+        tree.write_dot(dot_path)
         print(f"\nDOT salvo em: {dot_path}")
 
     if not args.no_png:
         png_path = os.path.join(out_dir, "tree_id3.png")
-        tree.plot_png(png_path)
-        print(f"PNG salvo em: {png_path}")
+        try:
+            tree.plot_png(png_path)
+            print(f"PNG salvo em: {png_path}")
+        except PngTooLargeError as e:
+            svg_path = os.path.join(out_dir, "tree_id3.svg")
+            tree.plot_svg(svg_path)
+            print(f"{e}\nSVG salvo em: {svg_path}")
 
     # Exporta base de regras
     rules_path = os.path.join(out_dir, "rules_id3.txt")
     tree.export_rules_txt(rules_path)
     print(f"Regras salvas em: {rules_path}")
 
+    if args.save_model:
+        tree.save(args.save_model)
+        print(f"Modelo salvo em: {args.save_model}")
+
+    if args.forest:
+        # bagging + sorteio de atributos por nó, árvores em paralelo (common.forest)
+        forest = RandomForest(
+            ID3DecisionTree,
+            target,
+            n_estimators=args.forest,
+            oob_score=True,
+            n_jobs=args.n_jobs,
+            engine=args.engine,
+        ).fit(df, features)
+        oob = forest.oob_score_
+        print(
+            f"Floresta aleatória ({args.forest} árvores): acurácia out-of-bag "
+            + ("indisponível" if oob is None else f"{oob:.4f}")
+        )
+
 
 if __name__ == "__main__":
     main()